@@ -0,0 +1,365 @@
+# This file is used to define the backends which perform the elastic analysis of a building
+# All backends have the same interface: analyze(building, for_drift_only, for_period_only, update_seismic_force)
+# stores the period, story drifts and member forces in building.analysis_results, which are then used by
+# building.read_modal_period, building.read_story_drift and ElasticOutput.
+# Different backends can be used in different phases of the design, e.g., a fast backend in the optimization loops
+# and OpenSees for the final verification of optimal and construction designs.
+
+import numpy as np
+import scipy.linalg
+
+from help_functions import search_section_property
+from help_functions import superpose_gravity_earthquake
+from elastic_analysis import ElasticAnalysis
+from elastic_solver import NativeElasticAnalysis
+from elastic_output import read_member_force
+from analysis_cache import hash_analysis_input
+from analysis_cache import AnalysisCache
+from analysis_cache import ANALYSIS_CACHE
+from global_variables import SECTION_DATABASE
+from global_variables import ACCIDENTAL_TORSION
+from global_variables import SUPERPOSE_GRAVITY_EARTHQUAKE
+from global_variables import ELASTIC_ANALYSIS_BACKEND
+from global_variables import ELASTIC_ANALYSIS_CACHE
+from global_variables import ANALYSIS_CACHE_DIRECTORY
+
+
+# #########################################################################
+#                Define constants used by the stand-in backend            #
+# #########################################################################
+
+# Young's modulus of steel (ksi)
+ELASTIC_MODULUS = 29000
+
+# Gravity constant (inch/s^2)
+GRAVITY = 386.4
+
+
+# #########################################################################
+#                     Define the interface of backends                    #
+# #########################################################################
+
+class AnalysisError(Exception):
+    """
+    This class is the exception raised when a backend cannot provide the analysis results (e.g., the results to be
+    replayed are not recorded). It is caught by SeismicDesignEngine such that the design is terminated.
+    """
+    pass
+
+
+class AnalysisBackend(object):
+    """
+    This class defines the interface of all elastic analysis backends:
+    (1) analyze the building and store the results in building.analysis_results
+    (2) a name which is used to identify the results of the backend (e.g., in the analysis cache)
+    """
+
+    name = None
+
+    def analyze(self, building, for_drift_only=False, for_period_only=False, update_seismic_force=False):
+        """
+        This method is used to perform the elastic analysis.
+        :param building: a class defined in "building_information.py" file
+        :param for_drift_only: a boolean variable.
+                               True means we only perform the elastic analysis under GravityEarthquake loads.
+                               Otherwise, all load types (dead, live, earthquake) will be considered.
+        :param for_period_only: a boolean variable.
+                                True means we only perform the eigen value analysis to obtain the period
+                                Otherwise, all load types will be considered.
+        :param update_seismic_force: a boolean variable.
+                                     True means the modal period is computed first and the seismic forces are
+                                     updated before the load cases are analyzed.
+                                     False means the seismic forces stored in building are used.
+        :return: a dictionary which is building.analysis_results
+        """
+        raise NotImplementedError
+
+
+# #########################################################################
+#                    Define backends which run the analysis               #
+# #########################################################################
+
+class OpenSeesBackend(AnalysisBackend):
+    """
+    This class writes .tcl files and runs OpenSees (elastic_analysis.py). The results are read from the OpenSees
+    output files once the analysis is completed.
+    """
+
+    name = 'OpenSees'
+
+    def analyze(self, building, for_drift_only=False, for_period_only=False, update_seismic_force=False):
+        ElasticAnalysis(building, for_drift_only, for_period_only, update_seismic_force)
+        building.analysis_results = self.collect_results(building, for_drift_only, for_period_only,
+                                                         update_seismic_force)
+        return building.analysis_results
+
+    def collect_results(self, building, for_drift_only, for_period_only, update_seismic_force):
+        """
+        This method is used to read the analysis results from OpenSees output files.
+        :return: a dictionary which has the same format as building.analysis_results
+        """
+        results = {}
+        if for_period_only or update_seismic_force:
+            period = np.loadtxt(building.directory['building elastic model'] / 'EigenAnalysis' / 'Periods.out', ndmin=1)
+            results['EigenValue'] = {'period': period}
+        if for_period_only:
+            return results
+        if for_drift_only:
+            load_types = ['GravityEarthquake']
+        elif SUPERPOSE_GRAVITY_EARTHQUAKE:
+            load_types = ['DeadLoad', 'LiveLoad', 'EarthquakeLoad']
+        else:
+            load_types = ['DeadLoad', 'LiveLoad', 'EarthquakeLoad', 'GravityEarthquake']
+        for load_type in load_types:
+            results[load_type] = {'story drift': building.read_story_drift_file(load_type)}
+            if not for_drift_only:
+                results[load_type]['column force'], results[load_type]['beam force'] \
+                    = read_member_force(building, load_type)
+        # Construct the results under gravity and earthquake loads by superposition
+        if 'GravityEarthquake' not in results:
+            if update_seismic_force:
+                building.elf_parameters['modal period'] = results['EigenValue']['period'][0]
+                building.compute_seismic_force()
+            earthquake_factor = building.seismic_force_for_drift['base shear'] \
+                / building.seismic_force_for_strength['base shear']
+            results['GravityEarthquake'] = {}
+            for quantity in results['DeadLoad']:
+                results['GravityEarthquake'][quantity] = superpose_gravity_earthquake(
+                    results['DeadLoad'][quantity], results['LiveLoad'][quantity], results['EarthquakeLoad'][quantity],
+                    building.elf_parameters['SDS'], earthquake_factor)
+        return results
+
+
+class NativeBackend(AnalysisBackend):
+    """
+    This class solves the same frame model in-process using NumPy/SciPy (elastic_solver.py).
+    """
+
+    name = 'Native'
+
+    def analyze(self, building, for_drift_only=False, for_period_only=False, update_seismic_force=False):
+        NativeElasticAnalysis(building, for_drift_only, for_period_only, update_seismic_force)
+        return building.analysis_results
+
+
+class StandInBackend(AnalysisBackend):
+    """
+    This class is a deterministic local stand-in which approximates the frame using hand calculation methods.
+    It is intended for testing the design procedure without OpenSees and finite element analysis:
+    (1) story stiffness of each story is estimated from the column and beam stiffness (shear building)
+    (2) period is obtained from the eigen value analysis of the shear building
+    (3) lateral loads are distributed to members using portal method, and P-Delta is included by amplifying
+        the lateral responses by 1/(1 - stability coefficient)
+    (4) gravity loads: beams are fixed-ended, and the unbalanced moments at exterior joints are distributed to the
+        columns using one cycle of moment distribution
+    The results have the same format as the other backends but are only approximate.
+    """
+
+    name = 'StandIn'
+
+    def analyze(self, building, for_drift_only=False, for_period_only=False, update_seismic_force=False):
+        self.assign_section_property(building)
+        building.analysis_results = {}
+        if for_period_only or update_seismic_force:
+            period = self.modal_period(building)
+            building.analysis_results['EigenValue'] = {'period': period}
+            building.elf_parameters['modal period'] = period[0]
+            if for_period_only:
+                return building.analysis_results
+            building.compute_seismic_force()
+        if for_drift_only:
+            load_types = ['GravityEarthquake']
+        else:
+            load_types = ['DeadLoad', 'LiveLoad', 'EarthquakeLoad', 'GravityEarthquake']
+        for load_type in load_types:
+            building.analysis_results[load_type] = self.analyze_load(building, load_type)
+        return building.analysis_results
+
+    def assign_section_property(self, building):
+        # Obtain the geometry and moments of inertia of members (one frame, units: kips, inches)
+        self.number_of_story = building.geometry['number of story']
+        self.number_of_bay = building.geometry['number of X bay']
+        self.story_height = np.diff(np.ravel(building.geometry['floor height'])) * 12
+        self.bay_width = building.geometry['X bay width'] * 12
+        inertia = {}
+        for size in set(building.member_size['beam'] + building.member_size['interior column']
+                        + building.member_size['exterior column']):
+            inertia[size] = search_section_property(size, SECTION_DATABASE)['Ix']
+        self.beam_inertia = np.array([inertia[size] for size in building.member_size['beam']])
+        self.exterior_column_inertia = np.array([inertia[size] for size in building.member_size['exterior column']])
+        self.interior_column_inertia = np.array([inertia[size] for size in building.member_size['interior column']])
+
+    def story_stiffness(self):
+        # Lateral stiffness of each story: K = 24E / (h^2 * (1/sum(Ic/h) + 1/sum(Ib/L)))
+        column_stiffness = (2*self.exterior_column_inertia + (self.number_of_bay-1)*self.interior_column_inertia) \
+            / self.story_height
+        beam_stiffness = self.number_of_bay * self.beam_inertia / self.bay_width
+        return 24 * ELASTIC_MODULUS / self.story_height**2 / (1/column_stiffness + 1/beam_stiffness)
+
+    def modal_period(self, building):
+        """
+        This method is used to compute the first mode period of the shear building.
+        :param building: a class defined in "building_information.py" file
+        :return: an array which includes the first mode period
+        """
+        story_stiffness = self.story_stiffness()
+        n = self.number_of_story
+        stiffness = np.zeros([n+1, n+1])
+        for story in range(n):
+            stiffness[story:story+2, story:story+2] += story_stiffness[story] * np.array([[1.0, -1.0], [-1.0, 1.0]])
+        mass = np.array(building.gravity_loads['floor weight'], dtype=float) \
+            / building.geometry['number of X LFRS'] / GRAVITY
+        eigen_value = scipy.linalg.eigh(stiffness[1:, 1:], np.diag(mass), eigvals_only=True, subset_by_index=[0, 0])
+        return 2*np.pi/np.sqrt(eigen_value)
+
+    def analyze_load(self, building, load_type):
+        """
+        This method is used to compute the story drifts and member end forces under one load type.
+        The member end forces are in global coordinates and have the same layout as the OpenSees recorders.
+        :param building: a class defined in "building_information.py" file
+        :param load_type: a string: 'DeadLoad', 'LiveLoad', 'EarthquakeLoad', or 'GravityEarthquake'
+        :return: a dictionary which includes 'story drift', 'column force', and 'beam force'
+        """
+        # Determine the gravity load factors and lateral story forces (identical to "Define*Loads2DModel.tcl")
+        n = self.number_of_story
+        if load_type == 'DeadLoad':
+            dead_factor, live_factor, lateral_force = 1.0, 0.0, np.zeros(n)
+        elif load_type == 'LiveLoad':
+            dead_factor, live_factor, lateral_force = 0.0, 1.0, np.zeros(n)
+        elif load_type == 'EarthquakeLoad':
+            dead_factor, live_factor = 0.0, 0.0
+            lateral_force = np.array(building.seismic_force_for_strength['lateral story force'], dtype=float)
+        else:
+            dead_factor, live_factor = 1.2 + 0.2*building.elf_parameters['SDS'], 0.5
+            lateral_force = np.array(building.seismic_force_for_drift['lateral story force'], dtype=float)
+        lateral_force = np.ravel(lateral_force) / building.geometry['number of X LFRS'] * ACCIDENTAL_TORSION
+        # Beam uniform load (convert the unit from lb/ft to kip/inch) and leaning column load at each floor level
+        beam_load = (dead_factor*np.array(building.gravity_loads['beam dead load'], dtype=float)
+                     + live_factor*np.array(building.gravity_loads['beam live load'], dtype=float)) * 0.001/12
+        leaning_load = dead_factor*np.array(building.gravity_loads['leaning column dead load'], dtype=float) \
+            + live_factor*np.array(building.gravity_loads['leaning column live load'], dtype=float)
+        L = self.bay_width
+        h = self.story_height
+
+        # Story shear, gravity load above each story, and P-Delta amplification
+        story_shear = np.cumsum(lateral_force[::-1])[::-1]
+        story_gravity = np.cumsum((beam_load*L*self.number_of_bay + leaning_load)[::-1])[::-1]
+        story_stiffness = self.story_stiffness()
+        amplification = 1 / (1 - story_gravity / (story_stiffness*h))
+        story_drift = story_shear / (story_stiffness*h) * amplification
+
+        # Portal method: exterior columns carry half of the shear of interior columns
+        exterior_shear = story_shear * amplification / (2*self.number_of_bay)
+        # Inflection point is at 2/3 of the first story height and mid-height of other stories (from the bottom)
+        inflection_height = h / 2
+        inflection_height[0] = 2*h[0] / 3
+        # Beam end moments and shears from equilibrium of exterior joints
+        beam_moment = exterior_shear * (h - inflection_height)
+        beam_moment[:-1] += exterior_shear[1:] * inflection_height[1:]
+        beam_shear = 2*beam_moment / L
+        exterior_axial = np.cumsum(beam_shear[::-1])[::-1]
+
+        # Gravity loads: fixed end moments of beams distributed to exterior columns
+        fixed_end_moment = beam_load * L**2 / 12
+        column_below = self.exterior_column_inertia / h
+        column_above = np.append(column_below[1:], 0.0)
+        distribution = fixed_end_moment / (column_below + column_above + self.beam_inertia / L)
+        # End moments of the left exterior column: carry-over factor is 1/2
+        gravity_top_moment = -distribution * column_below
+        gravity_bottom_moment = np.zeros(n)
+        gravity_bottom_moment[1:] = -distribution[:-1] * column_above[:-1]
+        gravity_bottom_moment, gravity_top_moment = gravity_bottom_moment + gravity_top_moment/2, \
+            gravity_top_moment + gravity_bottom_moment/2
+        gravity_axial = np.cumsum((beam_load*L/2)[::-1])[::-1]
+
+        column_force = np.zeros([n, self.number_of_bay+1, 6])
+        beam_force = np.zeros([n, self.number_of_bay, 6])
+        for column in range(self.number_of_bay+1):
+            exterior = column == 0 or column == self.number_of_bay
+            shear = exterior_shear if exterior else 2*exterior_shear
+            bottom_moment = shear * inflection_height
+            top_moment = shear * (h - inflection_height)
+            axial = gravity_axial if exterior else 2*gravity_axial
+            if column == 0:
+                bottom_moment = bottom_moment + gravity_bottom_moment
+                top_moment = top_moment + gravity_top_moment
+                axial = axial - exterior_axial
+            elif column == self.number_of_bay:
+                bottom_moment = bottom_moment - gravity_bottom_moment
+                top_moment = top_moment - gravity_top_moment
+                axial = axial + exterior_axial
+            column_shear = -(bottom_moment + top_moment) / h
+            column_force[:, column, :] = np.column_stack([column_shear, axial, bottom_moment,
+                                                          -column_shear, -axial, top_moment])
+        for bay in range(self.number_of_bay):
+            beam_force[:, bay, :] = np.column_stack([np.zeros(n), beam_load*L/2 - beam_shear,
+                                                     fixed_end_moment - beam_moment, np.zeros(n),
+                                                     beam_load*L/2 + beam_shear, -fixed_end_moment - beam_moment])
+        return {'story drift': story_drift.reshape(-1, 1),
+                'column force': column_force.reshape(n, -1),
+                'beam force': beam_force.reshape(n, -1)}
+
+
+# #########################################################################
+#                Define a backend which reuses stored results             #
+# #########################################################################
+
+class CachedBackend(AnalysisBackend):
+    """
+    This class obtains the results from an analysis cache (analysis_cache.py):
+    (1) the results are returned if the same analysis of the same backend is found in the cache
+    (2) otherwise, the analysis is performed by the given backend and its results are stored in the cache
+    When no backend is given, the results recorded in the cache are replayed and any missing analysis is an error.
+    """
+
+    def __init__(self, backend=None, cache=ANALYSIS_CACHE, name=None):
+        """
+        This function is used to initialize the backend.
+        :param backend: a class defined in this file which performs the analysis. None means replay only.
+        :param cache: a class defined in "analysis_cache.py" file
+        :param name: a string which is the name of the backend whose results are replayed (only used when no backend
+                     is given)
+        """
+        self.backend = backend
+        self.cache = cache
+        self.name = backend.name if backend is not None else name
+
+    def analyze(self, building, for_drift_only=False, for_period_only=False, update_seismic_force=False):
+        key = hash_analysis_input(building, for_drift_only, for_period_only, update_seismic_force, self.name)
+        results = self.cache.get(key)
+        if results is None:
+            if self.backend is None:
+                raise AnalysisError('no recorded %s analysis results for building %s' % (self.name, building.UID))
+            results = self.backend.analyze(building, for_drift_only, for_period_only, update_seismic_force)
+            self.cache.put(key, results)
+        building.analysis_results = results
+        return building.analysis_results
+
+
+# #########################################################################
+#                 Define a function to obtain the backend                 #
+# #########################################################################
+
+# Backends which perform the analysis
+BACKENDS = {'OpenSees': OpenSeesBackend, 'Native': NativeBackend, 'StandIn': StandInBackend}
+
+
+def get_analysis_backend(name=None):
+    """
+    This function is used to create the backend given its name.
+    The backend is wrapped by the analysis cache if ELASTIC_ANALYSIS_CACHE is True.
+    :param name: a string: 'OpenSees', 'Native', 'StandIn', or 'Replay'. None means ELASTIC_ANALYSIS_BACKEND is used.
+    :return: a class defined in this file
+    """
+    if name is None:
+        name = ELASTIC_ANALYSIS_BACKEND
+    if name == 'Replay':
+        # Replay the OpenSees results recorded in the on-disk analysis cache
+        return CachedBackend(cache=AnalysisCache(directory=ANALYSIS_CACHE_DIRECTORY), name='OpenSees')
+    if name not in BACKENDS:
+        raise ValueError('wrong elastic analysis backend %s! Please use one of %s or Replay!'
+                         % (name, ', '.join(BACKENDS)))
+    backend = BACKENDS[name]()
+    if ELASTIC_ANALYSIS_CACHE:
+        backend = CachedBackend(backend)
+    return backend
@@ -0,0 +1,171 @@
+# This file is used to define a cache of elastic analysis results
+# The results (period, story drifts and member forces) are stored with a key which is the hash of all analysis inputs:
+# geometry, gravity loads, ELF parameters, seismic forces, and member sizes.
+# Identical designs revisited during the design procedure are thus not re-analyzed.
+# The cache is used by the CachedBackend defined in "analysis_backend.py".
+
+import collections
+import copy
+import hashlib
+import numpy as np
+import os
+import pickle
+import tempfile
+
+from global_variables import ELASTIC_ANALYSIS_BACKEND
+from global_variables import ELASTIC_SOLVER_PROFILE
+from global_variables import SUPERPOSE_GRAVITY_EARTHQUAKE
+from global_variables import CONDENSED_DRIFT_MODEL
+from global_variables import ANALYSIS_CACHE_SIZE
+from global_variables import ANALYSIS_CACHE_DIRECTORY
+from global_variables import ANALYSIS_CACHE_DISK_LIMIT
+from global_variables import ACCIDENTAL_TORSION
+from global_variables import PERIOD_FOR_DRIFT_LIMIT
+from global_variables import RBS_STIFFNESS_FACTOR
+from global_variables import SECTION_DATABASE
+
+
+# #########################################################################
+#                  Define constants used to hash analysis inputs          #
+# #########################################################################
+
+# Version of the analysis code and the format of cached results
+# Please increase it whenever the analysis (e.g., a solver fix) or the format of results changes, such that the results
+# stored on disk by previous versions are not used.
+CACHE_VERSION = 1
+
+# Digest of the section database: the section properties used in the analysis are determined by the member sizes
+SECTION_DATABASE_DIGEST = hashlib.sha1(SECTION_DATABASE.to_csv(index=False).encode()).hexdigest()
+
+
+# #########################################################################
+#                  Define a function to hash analysis inputs              #
+# #########################################################################
+
+def hash_analysis_input(building, for_drift_only, for_period_only, update_seismic_force,
+                        backend=ELASTIC_ANALYSIS_BACKEND):
+    """
+    This function is used to compute the key of an elastic analysis.
+    :param building: a class defined in "building_information.py" file
+    :param for_drift_only: a boolean variable. Same as the one used in ElasticAnalysis.
+    :param for_period_only: a boolean variable. Same as the one used in ElasticAnalysis.
+    :param update_seismic_force: a boolean variable. Same as the one used in ElasticAnalysis.
+    :param backend: a string which is the name of the backend performing the analysis (analysis_backend.py)
+    :return: a string which is the hexadecimal digest of all inputs
+    """
+    def normalize(value):
+        # Convert the arrays and dictionaries such that identical inputs always have identical representation
+        if isinstance(value, dict):
+            return sorted((key, normalize(item)) for key, item in value.items())
+        if isinstance(value, (list, tuple)):
+            return [normalize(item) for item in value]
+        if isinstance(value, str):
+            return value
+        return np.asarray(value).tolist()
+
+    # The modal period is an analysis result rather than an input
+    elf_parameters = {key: value for key, value in building.elf_parameters.items() if key != 'modal period'}
+    analysis_input = [building.geometry, building.gravity_loads, elf_parameters, building.member_size,
+                      [for_drift_only, for_period_only, update_seismic_force],
+                      [backend, ELASTIC_SOLVER_PROFILE, SUPERPOSE_GRAVITY_EARTHQUAKE,
+                       CONDENSED_DRIFT_MODEL],
+                      [ACCIDENTAL_TORSION, PERIOD_FOR_DRIFT_LIMIT, RBS_STIFFNESS_FACTOR, SECTION_DATABASE_DIGEST],
+                      CACHE_VERSION]
+    # The seismic forces are inputs unless they are computed from the modal period during the analysis
+    if not for_period_only and not update_seismic_force:
+        analysis_input.append([building.seismic_force_for_strength, building.seismic_force_for_drift])
+    return hashlib.sha1(repr(normalize(analysis_input)).encode()).hexdigest()
+
+
+# #########################################################################
+#              Define a class to store elastic analysis results           #
+# #########################################################################
+
+class AnalysisCache(object):
+    """
+    This class stores the elastic analysis results using an in-memory LRU cache and an optional on-disk store.
+    It includes the following methods:
+    (1) get the results from memory or disk
+    (2) put the results into memory and disk
+    (3) evict the least recently used files when the disk store exceeds the size limit
+    """
+
+    def __init__(self, size=ANALYSIS_CACHE_SIZE, directory=ANALYSIS_CACHE_DIRECTORY,
+                 disk_limit=ANALYSIS_CACHE_DISK_LIMIT):
+        """
+        This function is used to initialize the cache.
+        :param size: an integer which denotes the number of results kept in memory
+        :param directory: a string or pathlib.Path which denotes the folder of on-disk store. None means no disk store.
+        :param disk_limit: an integer which denotes the maximum size (byte) of all files in on-disk store
+        """
+        self.size = size
+        self.directory = directory
+        self.disk_limit = disk_limit
+        self.memory = collections.OrderedDict()
+        self.hit = 0
+        self.miss = 0
+        if self.directory is not None and not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+    def get(self, key):
+        """
+        This method is used to obtain the results with the given key.
+        :param key: a string obtained from hash_analysis_input function
+        :return: a dictionary which has the same format as building.analysis_results. None if key is not found.
+        """
+        results = None
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            results = self.memory[key]
+        elif self.directory is not None and os.path.exists(os.path.join(self.directory, key + '.pickle')):
+            file_name = os.path.join(self.directory, key + '.pickle')
+            with open(file_name, 'rb') as file:
+                results = pickle.load(file)
+            # Update the access time which is used for eviction
+            os.utime(file_name)
+            self.put_memory(key, results)
+        if results is None:
+            self.miss += 1
+            return None
+        self.hit += 1
+        return copy.deepcopy(results)
+
+    def put(self, key, results):
+        """
+        This method is used to store the results with the given key.
+        :param key: a string obtained from hash_analysis_input function
+        :param results: a dictionary which has the same format as building.analysis_results
+        """
+        results = copy.deepcopy(results)
+        self.put_memory(key, results)
+        if self.directory is not None:
+            # Write to a temporary file in the same folder and then rename it (atomic replacement)
+            # Thus other processes sharing the folder never read a partially written file
+            with tempfile.NamedTemporaryFile('wb', dir=self.directory, suffix='.tmp', delete=False) as file:
+                try:
+                    pickle.dump(results, file)
+                except BaseException:
+                    file.close()
+                    os.remove(file.name)
+                    raise
+            os.replace(file.name, os.path.join(self.directory, key + '.pickle'))
+            self.evict_disk()
+
+    def put_memory(self, key, results):
+        self.memory[key] = results
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.size:
+            self.memory.popitem(last=False)
+
+    def evict_disk(self):
+        # Remove the least recently used files until the total size is within the limit
+        files = [os.path.join(self.directory, file) for file in os.listdir(self.directory) if file.endswith('.pickle')]
+        files.sort(key=os.path.getmtime)
+        total_size = sum(os.path.getsize(file) for file in files)
+        while files and total_size > self.disk_limit:
+            total_size -= os.path.getsize(files[0])
+            os.remove(files.pop(0))
+
+
+# Cache shared by all analyses in current process
+ANALYSIS_CACHE = AnalysisCache()
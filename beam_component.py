@@ -56,6 +56,21 @@ class Beam(object):
         self.compute_demand_capacity_ratio()
         self.calculate_hinge_parameters(steel)
 
+    def update_demand(self, shear_demand, moment_demand_left, moment_demand_right, steel):
+        """
+        This method is used to update the demands of an existing beam (same section and length) and repeat all checks
+        which depend on the demands, so the beam is identical to a new beam created using these demands.
+        :param shear_demand: a float number denoting the shear demand.
+        :param moment_demand_left: a float number denoting the moment demand at left end.
+        :param moment_demand_right: a float number denoting the moment demand at right end.
+        :param steel: a class defined in "steel_material.py" file.
+        """
+        self.demand = {'shear': shear_demand, 'moment left': moment_demand_left, 'moment right': moment_demand_right}
+        self.flag = None
+        self.check_shear_strength(steel)
+        self.check_flexural_strength(steel)
+        self.compute_demand_capacity_ratio()
+
     def initialize_reduced_beam_section(self):
         """
         This method is used to initialize RBS dimensions.
@@ -6,6 +6,9 @@ import copy
 import numpy as np
 import os
 import pandas as pd
+import pathlib
+import shutil
+import tempfile
 
 from help_functions import determine_Fa_coefficient
 from help_functions import determine_Fv_coefficient
@@ -20,11 +23,19 @@ from help_functions import search_member_size
 from help_functions import search_section_property
 from help_functions import decrease_member_size
 from help_functions import increase_member_size
+from help_functions import search_sufficient_member_size
 from help_functions import constructability_helper
+from help_functions import superpose_gravity_earthquake
+from recorder_reader import read_last_records
+from recorder_reader import read_consolidated_record
+from recorder_reader import consolidated_column_map
 from global_variables import SECTION_DATABASE
 from global_variables import COLUMN_DATABASE
 from global_variables import BEAM_DATABASE
 from global_variables import PERIOD_FOR_DRIFT_LIMIT
+from global_variables import CONSOLIDATED_RECORDER
+from global_variables import SUPERPOSE_GRAVITY_EARTHQUAKE
+from global_variables import ELASTIC_SCRATCH_DIRECTORY
 
 
 # #########################################################################
@@ -76,6 +87,8 @@ class Building(object):
         self.member_size = {}
         self.elastic_response = {}
         self.construction_size = {}
+        # Results of the in-process elastic analysis (empty when OpenSees recorder files are used)
+        self.analysis_results = {}
 
         # Call defined methods to achieve the goal of the class
         self.define_directory()
@@ -94,7 +107,14 @@ class Building(object):
         # Define path to folder where the building data (.csv) are saved
         building_data_directory = self.base_directory / 'BuildingData' / self.UID
         # Define path to folder where the generated elastic analysis OpenSees model is saved
-        building_elastic_model_directory = self.base_directory / 'BuildingElasticModels' / self.UID
+        # A scratch folder is created for the current run if the scratch directory is specified
+        if ELASTIC_SCRATCH_DIRECTORY is None:
+            building_elastic_model_directory = self.base_directory / 'BuildingElasticModels' / self.UID
+            self.scratch_directory = None
+        else:
+            building_elastic_model_directory = pathlib.Path(tempfile.mkdtemp(prefix=self.UID + '_',
+                                                                             dir=ELASTIC_SCRATCH_DIRECTORY))
+            self.scratch_directory = building_elastic_model_directory
         # Define path to folder where the generated nonlinear analysis OpenSees model is saved
         building_nonlinear_model_directory = self.base_directory / 'BuildingNonlinearModels' / self.UID
         # Store all necessary directories into a dictionary
@@ -104,15 +124,24 @@ class Building(object):
                           'building elastic model': building_elastic_model_directory,
                           'building nonlinear model': building_nonlinear_model_directory}
 
+    def cleanup(self):
+        """
+        This method is used to remove the scratch folder of elastic analysis models (see ELASTIC_SCRATCH_DIRECTORY).
+        The copies of this building (e.g., the construction design) share the same folder, thus it shall be called
+        only when no elastic analysis of this building and its copies is performed afterwards.
+        :return: None. Nothing is removed if the models are saved in BuildingElasticModels.
+        """
+        if self.scratch_directory is not None:
+            shutil.rmtree(self.scratch_directory, ignore_errors=True)
+            self.scratch_directory = None
+
     def read_geometry(self):
         """
         This method is used to read the building geometry information from .csv files:
-        (1) Change the working directory to the folder where .csv data are stored
-        (2) Open the .csv file and save all relevant information to the object itself
+        (1) Open the .csv file in the folder where .csv data are stored
+        (2) Save all relevant information to the object itself
         """
-        os.chdir(self.directory['building data'])
-        with open('Geometry.csv', 'r') as csvfile:
-            geometry_data = pd.read_csv(csvfile, header=0)
+        geometry_data = pd.read_csv(os.path.join(self.directory['building data'], 'Geometry.csv'), header=0)
 
         # Each variable is a scalar
         number_of_story = geometry_data.loc[0, 'number of story']
@@ -329,32 +358,64 @@ class Building(object):
         parameters.
         :return: the first mode period stored in self.elf_parameters
         """
-        # Change the working directory to the folder where the eigen value analysis results are stored
+        # Use the period from the in-process eigen value analysis if it is available
+        if 'EigenValue' in self.analysis_results:
+            self.elf_parameters['modal period'] = self.analysis_results['EigenValue']['period'][0]
+            return
+        # The folder where the eigen value analysis results are stored
         path_modal_period = self.directory['building elastic model'] / 'EigenAnalysis'
-        os.chdir(path_modal_period)
         # Save the first mode period in elf_parameters
-        period = pd.read_csv('Periods.out', header=None)
+        period = pd.read_csv(path_modal_period / 'Periods.out', header=None)
         self.elf_parameters['modal period'] = np.asscalar((period.iloc[0, 0]))
 
 
-    def read_story_drift(self):
+    def read_story_drift(self, for_drift_only=False):
         """
         This method is used to read the story drifts from OpenSees elastic analysis results and stored it as attribute
         The load case for story drift is the combination of dead, live, and earthquake loads.
+        :param for_drift_only: a boolean variable which is identical to that used in ElasticAnalysis.
+                               True means GravityEarthquake load case is analyzed even if SUPERPOSE_GRAVITY_EARTHQUAKE
+                               is True (only used when the drifts are read from OpenSees output files).
         :return: an [story*1] array which includes the story drifts for each story.
         """
-        # Change the working directory to the folder where story drifts are stored
-        path_story_drift = self.directory['building elastic model'] / 'GravityEarthquake' / 'StoryDrifts'
-        os.chdir(path_story_drift)
-        # Save all story drifts in an array
-        story_drift = np.zeros([self.geometry['number of story'], 1])
-        for story in range(self.geometry['number of story']):
-            file_name = 'Story' + str(story+1) + '.out'
-            read_data = np.loadtxt(file_name)
-            story_drift[story] = read_data[-1, -1]
+        # Use the story drifts from the in-process elastic analysis if they are available
+        if 'GravityEarthquake' in self.analysis_results:
+            self.elastic_response = {'story drift': self.analysis_results['GravityEarthquake']['story drift']}
+            return
+        # Obtain the story drifts by superposition if GravityEarthquake load case is not analyzed (see ElasticAnalysis)
+        if SUPERPOSE_GRAVITY_EARTHQUAKE and not for_drift_only:
+            drift = {}
+            for load_type in ['DeadLoad', 'LiveLoad', 'EarthquakeLoad']:
+                drift[load_type] = self.read_story_drift_file(load_type)
+            story_drift = superpose_gravity_earthquake(drift['DeadLoad'], drift['LiveLoad'], drift['EarthquakeLoad'],
+                                                       self.elf_parameters['SDS'],
+                                                       self.seismic_force_for_drift['base shear']
+                                                       / self.seismic_force_for_strength['base shear'])
+        else:
+            story_drift = self.read_story_drift_file('GravityEarthquake')
         # Assign the story drifts results into class attribute
         self.elastic_response = {'story drift': story_drift}
 
+    def read_story_drift_file(self, load_type):
+        """
+        This method is used to read the story drifts under a certain load type from OpenSees output files.
+        :param load_type: a string which denotes the load type (the name of output folder)
+        :return: an [story*1] array which includes the story drifts for each story.
+        """
+        # Read the final record of each story (time and drift)
+        path_story_drift = self.directory['building elastic model'] / load_type / 'StoryDrifts'
+        if not os.path.exists(path_story_drift):
+            raise FileNotFoundError('Story drifts under %s are not found in %s' % (load_type, path_story_drift))
+        # Drifts of all stories and roof are saved in one file when the consolidated recorder is used
+        if CONSOLIDATED_RECORDER:
+            return read_consolidated_record(path_story_drift / 'StoryDrifts.out',
+                                            consolidated_column_map(self.geometry['number of story'], 1),
+                                            self.geometry['number of story'] + 2)
+        file_names = [path_story_drift / ('Story' + str(story+1) + '.out')
+                      for story in range(self.geometry['number of story'])]
+        story_drift = read_last_records(file_names, 2)[:, -1:]
+        return story_drift
+
     def optimize_member_for_drift(self):
         """
         This method is used to decrease the member size such that the design is most economic.
@@ -364,9 +425,19 @@ class Building(object):
         target_story = np.where(self.elastic_response['story drift'] ==
                                 np.min(self.elastic_response['story drift']))[0][0]
         # Update the interior column size in target story
-        self.member_size['interior column'][target_story] = \
-            decrease_member_size(self.element_candidate['interior column']['story %s' % (target_story+1)],
-                                 self.member_size['interior column'][target_story])
+        interior_size = decrease_member_size(self.element_candidate['interior column']['story %s' % (target_story+1)],
+                                             self.member_size['interior column'][target_story])
+        self.resize_member_for_drift(target_story, interior_size)
+
+    def resize_member_for_drift(self, target_story, interior_size):
+        """
+        This method is used to assign the interior column size in one story and update the beam and exterior column
+        sizes in the same story accordingly.
+        :param target_story: a scalar to denote which story shall be updated (from 0 to total story # - 1).
+        :param interior_size: a string which denotes the interior column size
+        :return: update self.member_size
+        """
+        self.member_size['interior column'][target_story] = interior_size
         # Compute the section property of the interior column size
         reference_property = search_section_property(self.member_size['interior column'][target_story],
                                                      SECTION_DATABASE)
@@ -382,27 +453,39 @@ class Building(object):
                                            SECTION_DATABASE)
         self.member_size['exterior column'][target_story] = exterior_size
 
-    def upscale_column(self, target_story, type_column):
+    def upscale_column(self, target_story, type_column, required_property=None):
         """
         This method is used to increase  column size which might be necessary when column strength is not sufficient
         or strong column weak beam is not satisfied.
         :param target_story: a scalar to denote which story column shall be increased (from 0 to total story # - 1).
         :param type_column: a string denoting whether it is an exterior column or interior column
+        :param required_property: a dictionary which includes the required section properties (see
+                                  "design_helper.py"). None means the size is increased one step upward.
         :return: update the column size stored in self.member_size
         """
-        temp_size = increase_member_size(self.element_candidate[type_column]['story %s' % (target_story+1)],
-                                         self.member_size[type_column][target_story])
+        candidate = self.element_candidate[type_column]['story %s' % (target_story+1)]
+        if required_property is None:
+            temp_size = increase_member_size(candidate, self.member_size[type_column][target_story])
+        else:
+            temp_size = search_sufficient_member_size(candidate, self.member_size[type_column][target_story],
+                                                      required_property, SECTION_DATABASE)
         self.member_size[type_column][target_story] = temp_size
 
 
-    def upscale_beam(self, target_floor):
+    def upscale_beam(self, target_floor, required_property=None):
         """
         This method is used to increase beam size which might be necessary when beam strength is not sufficient
         :param target_floor: a scalar to denote which floor beam shall be improved. (from 0 to total story # - 1)
+        :param required_property: a dictionary which includes the required section properties (see
+                                  "design_helper.py"). None means the size is increased one step upward.
         :return: update the beam size stored in self.member_size
         """
-        temp_size = increase_member_size(self.element_candidate['beam']['floor level %s' % (target_floor+2)],
-                                         self.member_size['beam'][target_floor])
+        candidate = self.element_candidate['beam']['floor level %s' % (target_floor+2)]
+        if required_property is None:
+            temp_size = increase_member_size(candidate, self.member_size['beam'][target_floor])
+        else:
+            temp_size = search_sufficient_member_size(candidate, self.member_size['beam'][target_floor],
+                                                      required_property, SECTION_DATABASE)
         self.member_size['beam'][target_floor] = temp_size
 
 
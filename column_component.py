@@ -61,6 +61,28 @@ class Column(object):
         self.compute_demand_capacity_ratio()
         self.calculate_hinge_parameters(steel)
 
+    def update_demand(self, axial_demand, shear_demand, moment_demand_bot, moment_demand_top, steel):
+        """
+        This method is used to update the demands of an existing column (same section and unbraced length) and repeat
+        all checks which depend on the demands, so the column is identical to a new column created using these demands.
+        :param axial_demand: a float number which describes axial demand.
+        :param shear_demand: a float number which describes shear demand.
+        :param moment_demand_bot: a float number which describes moment demand at bottom of column.
+        :param moment_demand_top: a float number which describes moment demand at top of column.
+        :param steel: a class defined in "steel_material.py" file.
+        """
+        self.demand = {'axial': axial_demand, 'shear': shear_demand,
+                       'moment bottom': moment_demand_bot, 'moment top': moment_demand_top}
+        self.flag = None
+        # The web limit depends on axial demand and the flexural strength depends on moment gradient (Cb)
+        self.check_web(steel)
+        self.check_axial_strength(steel)
+        self.check_shear_strength(steel)
+        self.check_flexural_strength(steel)
+        self.check_combined_loads()
+        self.compute_demand_capacity_ratio()
+        self.calculate_hinge_parameters(steel)
+
     def check_flange(self, steel):
         """
         This method is used to check whether the flange is satisfied with highly ductile requirement, as specified in
@@ -9,14 +9,45 @@ import pandas as pd
 from column_component import Column
 from beam_component import Beam
 from connection_part import Connection
+from global_variables import STRONG_COLUMN_WEAK_BEAM_RATIO
+from global_variables import CAPACITY_MARGIN
+from global_variables import UPPER_LOWER_COLUMN_Zx
+from global_variables import INCREMENTAL_REBUILD
+from global_variables import REBUILD_TOLERANCE
 
 
-def create_column_set(building, elastic_demand, steel):
+def is_member_unchanged(previous_member, section_size, demand, tolerance=REBUILD_TOLERANCE):
+    """
+    This function is used to determine whether a column (or beam) created previously can be reused in incremental
+    rebuild. It is reused only if it was feasible, its size is identical, and each demand changes within the tolerance
+    of its own previous value. The reused member is then updated using the current demands (see update_demand).
+    :param previous_member: a class defined in "column_component.py" or "beam_component.py" file. None means no member.
+    :param section_size: a string which denotes the current member size.
+    :param demand: a dictionary which includes the current demands (same keys as previous_member.demand).
+    :param tolerance: a scalar which denotes the relative change of demands regarded as unchanged.
+    :return: a boolean variable. True means the previous member can be reused.
+    """
+    if previous_member is None or previous_member.section['section size'] != section_size:
+        return False
+    if not previous_member.flag:
+        return False
+    # Each demand is compared on its own scale (axial forces, shear forces, and moments have different units)
+    # The connections next to a reused member are reused as well, so their checks use demands within the tolerance
+    for key in demand:
+        if abs(demand[key] - previous_member.demand[key]) > tolerance * abs(previous_member.demand[key]):
+            return False
+    return True
+
+
+def create_column_set(building, elastic_demand, steel, previous_set=None):
     """
     This function is used to create a set of columns for the entire building.
     :param building: a class defined in "building_information.py" file.
     :param elastic_demand: a class defined in "elastic_output.py" file.
     :param steel: a class defined in "steel_material.py" file.
+    :param previous_set: a set of columns created previously for the same building. When INCREMENTAL_REBUILD is True,
+                         the unchanged columns (see is_member_unchanged) are updated and reused instead of being
+                         re-created. The columns in previous_set are modified, so it should not be used afterwards.
     :return: a M*N list where M represents the number of story and N represents the number of columns per story.
             Each element is an object of the class Column defined in "column_component.py" file.
     """
@@ -36,9 +67,18 @@ def create_column_set(building, elastic_demand, steel):
             else:
                 column_type = 'interior column'
             length = (building.geometry['floor height'][story + 1] - building.geometry['floor height'][story]).item()
-            # Build instance for each column member
-            temp_column = Column(building.member_size[column_type][story], axial_demand, shear_demand, moment_bottom,
-                                 moment_top, length, length, steel)
+            demand = {'axial': axial_demand, 'shear': shear_demand,
+                      'moment bottom': moment_bottom, 'moment top': moment_top}
+            if INCREMENTAL_REBUILD and previous_set is not None and \
+                    is_member_unchanged(previous_set[story][column_no], building.member_size[column_type][story],
+                                        demand):
+                # Reuse the section properties but repeat the checks using the current demands
+                temp_column = previous_set[story][column_no]
+                temp_column.update_demand(axial_demand, shear_demand, moment_bottom, moment_top, steel)
+            else:
+                # Build instance for each column member
+                temp_column = Column(building.member_size[column_type][story], axial_demand, shear_demand,
+                                     moment_bottom, moment_top, length, length, steel)
             one_story_columns.append(temp_column)
             # Check the flag of each column
             if not temp_column.check_flag():
@@ -48,12 +88,15 @@ def create_column_set(building, elastic_demand, steel):
     return column_set, not_feasible_column
 
 
-def create_beam_set(building, elastic_demand, steel):
+def create_beam_set(building, elastic_demand, steel, previous_set=None):
     """
     This function is used to create a set of beams for the entire building.
     :param building: a class defined in "building_information.py" file.
     :param elastic_demand: a class defined in "elastic_output.py" file.
     :param steel: a class defined in "steel_material.py" file.
+    :param previous_set: a set of beams created previously for the same building. When INCREMENTAL_REBUILD is True,
+                         the unchanged beams (see is_member_unchanged) are updated and reused instead of being
+                         re-created. The beams in previous_set are modified, so it should not be used afterwards.
     :return: a M*N list where M represents the number of story and N represents the number of bays per story.
             Each element is an object of the class Beam defined in "beam_component.py" file.
     """
@@ -67,9 +110,16 @@ def create_beam_set(building, elastic_demand, steel):
             shear_demand = abs(elastic_demand.dominate_load['beam shear'][story, 2 * bay])
             moment_left = elastic_demand.dominate_load['beam moment'][story, 2 * bay]
             moment_right = elastic_demand.dominate_load['beam moment'][story, 2 * bay + 1]
-            # Build instance for each beam member
-            temp_beam = Beam(building.member_size['beam'][story], length,
-                             shear_demand, moment_left, moment_right, steel)
+            demand = {'shear': shear_demand, 'moment left': moment_left, 'moment right': moment_right}
+            if INCREMENTAL_REBUILD and previous_set is not None and \
+                    is_member_unchanged(previous_set[story][bay], building.member_size['beam'][story], demand):
+                # Reuse the section properties but repeat the checks using the current demands
+                temp_beam = previous_set[story][bay]
+                temp_beam.update_demand(shear_demand, moment_left, moment_right, steel)
+            else:
+                # Build instance for each beam member
+                temp_beam = Beam(building.member_size['beam'][story], length,
+                                 shear_demand, moment_left, moment_right, steel)
             one_story_beams.append(temp_beam)
             # Check the flag of each beam
             if not temp_beam.check_flag():
@@ -79,13 +129,19 @@ def create_beam_set(building, elastic_demand, steel):
     return beam_set, not_feasible_beam
 
 
-def create_connection_set(building, column_set, beam_set, steel):
+def create_connection_set(building, column_set, beam_set, steel, previous_set=None, previous_column_set=None,
+                          previous_beam_set=None):
     """
     This function is used to create a set of joint connections for the entire building.
     :param building: a class defined in "building_information.py" file.
     :param column_set: a set of columns with M*N dimensions.
     :param beam_set: a set of beams with M*N dimensions.
     :param steel: a class defined in "steel_material.py" file.
+    :param previous_set: a set of connections created previously using previous_column_set and previous_beam_set.
+                         When INCREMENTAL_REBUILD is True, a feasible connection is reused if all columns and beams
+                         connected to it are identical to the previous ones (i.e., they are reused as well).
+    :param previous_column_set: a set of columns used to create previous_set.
+    :param previous_beam_set: a set of beams used to create previous_set.
     :return: a M*N list where M represents the number of story and N represents the number of connections per story.
             Each element is an object of the class Connection defined in "connection_part.py" file.
     """
@@ -94,9 +150,28 @@ def create_connection_set(building, column_set, beam_set, steel):
     connection_set = []
     # Record which connection [story#, column#] is not feasible.
     not_feasible_connection = []
+    incremental = INCREMENTAL_REBUILD and previous_set is not None
+
+    def is_connection_unchanged(story, connection_no):
+        # Check the columns above and below the joint and the beams on both sides
+        if not previous_set[story][connection_no].flag:
+            return False
+        for column_story in [story, story + 1]:
+            if column_story < building.geometry['number of story'] and \
+                    column_set[column_story][connection_no] is not previous_column_set[column_story][connection_no]:
+                return False
+        for bay in [connection_no - 1, connection_no]:
+            if 0 <= bay < building.geometry['number of X bay'] and \
+                    beam_set[story][bay] is not previous_beam_set[story][bay]:
+                return False
+        return True
+
     for story in range(building.geometry['number of story']):
         one_story_connection = []
         for connection_no in range(building.geometry['number of X bay']+1):
+            if incremental and is_connection_unchanged(story, connection_no):
+                one_story_connection.append(previous_set[story][connection_no])
+                continue
             dead_load = building.gravity_loads['beam dead load'][story]  # Unit: lb/ft
             live_load = building.gravity_loads['beam live load'][story]  # Unit: lb/ft
             span = building.geometry['X bay width']  # Unit: ft
@@ -156,6 +231,104 @@ def create_connection_set(building, column_set, beam_set, steel):
     return connection_set, not_feasible_connection
 
 
+def update_design_set(building, elastic_demand, steel, column_set, beam_set, connection_set):
+    """
+    This function is used to re-create the column, beam, and connection sets after the member sizes or the demands
+    are updated. When INCREMENTAL_REBUILD is True, only the changed members and the connections next to them are
+    re-created and re-checked.
+    :param building: a class defined in "building_information.py" file.
+    :param elastic_demand: a class defined in "elastic_output.py" file.
+    :param steel: a class defined in "steel_material.py" file.
+    :param column_set: a set of columns created previously.
+    :param beam_set: a set of beams created previously.
+    :param connection_set: a set of connections created previously.
+    :return: the updated column_set, beam_set, and connection_set
+    """
+    new_column_set, _ = create_column_set(building, elastic_demand, steel, column_set)
+    new_beam_set, _ = create_beam_set(building, elastic_demand, steel, beam_set)
+    new_connection_set, _ = create_connection_set(building, new_column_set, new_beam_set, steel, connection_set,
+                                                  column_set, beam_set)
+    return new_column_set, new_beam_set, new_connection_set
+
+
+def required_column_property(column, margin=CAPACITY_MARGIN):
+    """
+    This function is used to estimate the section properties required by a column whose strength is not sufficient.
+    The axial, shear, and flexural strengths are assumed to be proportional to A, d*tw, and Zx, respectively.
+    :param column: a class defined in "column_component.py" file.
+    :param margin: a scalar which amplifies the required section properties.
+    :return: a dictionary which includes the required section properties.
+             None if the column only fails the width-to-thickness checks.
+    """
+    ratio = column.demand_capacity_ratio
+    required_property = {}
+    if not column.is_feasible['axial strength']:
+        required_property['A'] = column.section['A'] * ratio['axial'] * margin
+    if not column.is_feasible['shear strength']:
+        required_property['Aw'] = column.section['d'] * column.section['tw'] * ratio['shear'] * margin
+    if not column.is_feasible['flexural strength']:
+        required_property['Zx'] = column.section['Zx'] * ratio['flexural'] * margin
+    if not column.is_feasible['combined strength']:
+        # AISC Specifications Eq. H1-1 using the nominal strengths (resistance factor is 0.9)
+        axial_ratio = 0.9 * ratio['axial']
+        flexural_ratio = 0.9 * ratio['flexural']
+        if axial_ratio <= 0.2:
+            combination = axial_ratio + 8/9 * flexural_ratio
+        else:
+            combination = axial_ratio/2 + flexural_ratio
+        required_property['A'] = max(required_property.get('A', 0), column.section['A'] * combination * margin)
+        required_property['Zx'] = max(required_property.get('Zx', 0), column.section['Zx'] * combination * margin)
+    if not required_property:
+        return None
+    return required_property
+
+
+def required_beam_property(beam, margin=CAPACITY_MARGIN):
+    """
+    This function is used to estimate the section properties required by a beam whose strength is not sufficient.
+    The shear and flexural strengths are assumed to be proportional to d*tw and Zx, respectively.
+    :param beam: a class defined in "beam_component.py" file.
+    :param margin: a scalar which amplifies the required section properties.
+    :return: a dictionary which includes the required section properties.
+             None if the beam only fails the width-to-thickness checks.
+    """
+    ratio = beam.demand_capacity_ratio
+    required_property = {}
+    if not beam.is_feasible['shear strength']:
+        required_property['Aw'] = beam.section['d'] * beam.section['tw'] * ratio['shear'] * margin
+    if not beam.is_feasible['flexural strength']:
+        required_property['Zx'] = beam.section['Zx'] * ratio['flexural'] * margin
+    if not required_property:
+        return None
+    return required_property
+
+
+def required_scwb_property(connection, target_column, other_column, margin=CAPACITY_MARGIN, upper_column=False):
+    """
+    This function is used to estimate the section properties required by the column to be upscaled when the strong
+    column weak beam criterion is not satisfied. The contribution of each column to Mpc is assumed to be proportional
+    to its Zx.
+    :param connection: a class defined in "connection_part.py" file.
+    :param target_column: a class defined in "column_component.py" file, which denotes the column to be upscaled.
+    :param other_column: a class defined in "column_component.py" file, which denotes the other column connected to
+                         the joint. None for the roof connections.
+    :param margin: a scalar which amplifies the required section properties.
+    :param upper_column: a boolean variable which denotes whether the target column is above the joint.
+                         The upper column is only upscaled until it is not significantly smaller than the lower column,
+                         such that the remaining deficiency is assigned to the lower column as in one-step upscaling.
+    :return: a dictionary which includes the required section properties.
+    """
+    total_Zx = target_column.section['Zx']
+    if other_column is not None:
+        total_Zx += other_column.section['Zx']
+    # The margin amplifies the deficiency of Mpc rather than the entire Mpc of the joint
+    deficiency = STRONG_COLUMN_WEAK_BEAM_RATIO * connection.moment['Mpb'] - connection.moment['Mpc']
+    required_Zx = target_column.section['Zx'] + deficiency * margin * total_Zx / connection.moment['Mpc']
+    if upper_column and other_column is not None:
+        required_Zx = min(required_Zx, UPPER_LOWER_COLUMN_Zx * other_column.section['Zx'])
+    return {'Zx': required_Zx}
+
+
 def save_python_files(building, column_set, beam_set, connection_set, constructability):
     """
     This function is used to save all the python files which include the design results.
@@ -171,18 +344,18 @@ def save_python_files(building, column_set, beam_set, connection_set, constructa
 
     # Nonlinear model generation may require information for building, beam/column hinge, and panel zone thickness.
     # Store the building class to "building.pkl"
-    with open(prefix + 'building.pkl', 'wb') as output_file:
+    with open(building.directory['building data'] / (prefix + 'building.pkl'), 'wb') as output_file:
         pickle.dump(building, output_file)
 
     # Store the construction beam set
-    with open(prefix + 'beam_set.pkl', 'wb') as output_file:
+    with open(building.directory['building data'] / (prefix + 'beam_set.pkl'), 'wb') as output_file:
         pickle.dump(beam_set, output_file)
 
     # Store the construction column set
-    with open(prefix + 'column_set.pkl', 'wb') as output_file:
+    with open(building.directory['building data'] / (prefix + 'column_set.pkl'), 'wb') as output_file:
         pickle.dump(column_set, output_file)
 
-    with open(prefix + 'connection_set.pkl', 'wb') as output_file:
+    with open(building.directory['building data'] / (prefix + 'connection_set.pkl'), 'wb') as output_file:
         pickle.dump(connection_set, output_file)
 
 
@@ -205,7 +378,7 @@ def save_design_size(building, constructability):
                                                          building.construction_size['interior column'],
                                                          building.construction_size['beam']]),
                                    columns=['exterior column', 'interior column', 'beam'])
-    member_size.to_csv(prefix+'Size.csv', sep=',', index=False)
+    member_size.to_csv(building.directory['building data'] / (prefix + 'Size.csv'), sep=',', index=False)
 
 
 def save_design_drifts(building, constructability):
@@ -217,7 +390,7 @@ def save_design_drifts(building, constructability):
     """
     prefix = 'Construction' if constructability else 'Optimal'
     design_drift = pd.DataFrame(data=building.elastic_response['story drift'], columns=['story drift'])
-    design_drift.to_csv(prefix+'Drift.csv', sep=',', index=False)
+    design_drift.to_csv(building.directory['building data'] / (prefix + 'Drift.csv'), sep=',', index=False)
 
 
 def store_doubler_plate_thickness(building, connection_set, constructability):
@@ -238,7 +411,7 @@ def store_doubler_plate_thickness(building, connection_set, constructability):
         for col in range(building.geometry['number of X bay'] + 1):
             name = header[col]
             doubler_plate.loc[row, name] = connection_set[row][col].doubler_plate_thickness
-    doubler_plate.to_csv(prefix+'DoublerPlate.csv', sep=',', index=False)
+    doubler_plate.to_csv(building.directory['building data'] / (prefix + 'DoublerPlate.csv'), sep=',', index=False)
 
 
 def store_strong_column_weak_beam_ratio(building, connection_set, constructability):
@@ -263,7 +436,8 @@ def store_strong_column_weak_beam_ratio(building, connection_set, constructabili
             else:
                 column_beam_ratio.loc[row, name] = \
                     connection_set[row][col].moment['Mpc'] / connection_set[row][col].moment['Mpb']
-    column_beam_ratio.to_csv(prefix+'ColumnBeamRatio.csv', sep=',', index=False)
+    column_beam_ratio.to_csv(building.directory['building data'] / (prefix + 'ColumnBeamRatio.csv'), sep=',',
+                             index=False)
 
 
 def store_column_demand_to_capacity_ratios(building, column_set, constructability):
@@ -282,7 +456,8 @@ def store_column_demand_to_capacity_ratios(building, column_set, constructabilit
         for story in range(0, building.geometry['number of story']):
             for bay in range(0, building.geometry['number of X bay'] + 1):
                 column_DC[story][bay] = column_set[story][bay].demand_capacity_ratio[force]
-        file_name = prefix + 'Column' + force[0].upper() + force[1:] + 'DCRatio.csv'
+        file_name = building.directory['building data'] / (prefix + 'Column' + force[0].upper() + force[1:]
+                                                           + 'DCRatio.csv')
         pd.DataFrame(columns=header, data=column_DC).to_csv(file_name, sep=',', index=False)
 
 
@@ -302,7 +477,8 @@ def store_beam_demand_to_capacity_ratios(building, beam_set, constructability):
         for story in range(0, building.geometry['number of story']):
             for bay in range(0, building.geometry['number of X bay']):
                 beam_DC[story][bay] = beam_set[story][bay].demand_capacity_ratio[force]
-        file_name = prefix + 'Beam' + force[0].upper() + force[1:] + 'DCRatio.csv'
+        file_name = building.directory['building data'] / (prefix + 'Beam' + force[0].upper() + force[1:]
+                                                           + 'DCRatio.csv')
         pd.DataFrame(columns=header, data=beam_DC).to_csv(file_name, sep=',', index=False)
 
 
@@ -2,10 +2,28 @@
 # Developed by GUAN, XINGQUAN @ UCLA in June 2018
 # Updated in Sept. 2018
 
+import numpy as np
 import os
+import re
 import shutil
-
+import sys
+
+from help_functions import determine_k_coeficient
+from help_functions import calculate_seismic_force
+from help_functions import tcl_section_property
+from opensees_session import get_opensees_session
+from opensees_runner import run_opensees
+from opensees_runner import OpenSeesError
+from opensees_runner import run_opensees_batch
+from global_variables import SECTION_DATABASE
 from global_variables import ACCIDENTAL_TORSION
+from global_variables import PERIOD_FOR_DRIFT_LIMIT
+from global_variables import SUPERPOSE_GRAVITY_EARTHQUAKE
+from global_variables import PERSISTENT_OPENSEES_SESSION
+from global_variables import PARALLEL_LOAD_CASE
+from global_variables import ELASTIC_SOLVER_PROFILE
+from global_variables import CONSOLIDATED_RECORDER
+
 
 # #########################################################################
 #              Generate OpenSees model (write .tcl files)                 #
@@ -30,11 +48,12 @@ class ElasticAnalysis(object):
     (14) gravity live load
     (15) earthquake load
     (16) gravity and earthquake loads combination
-    (17) copy baseline .tcl files
-    (18) run OpenSees.exe
+    (17) seismic forces based on the period from eigen value analysis (optional)
+    (18) copy baseline .tcl files and generate the main model file
+    (19) run OpenSees.exe (optionally each load case is run in parallel)
     """
 
-    def __init__(self, building, for_drift_only=False, for_period_only=False):
+    def __init__(self, building, for_drift_only=False, for_period_only=False, update_seismic_force=False):
         """
         This function is used to call all methods to write .tcl files required for an elastic analysis OpenSees model.
         :param building: a class defined in "building_information.py" file
@@ -44,11 +63,21 @@ class ElasticAnalysis(object):
         :param for_period_only: a boolean variable.
                                 True means we only perform the eigen value analysis to obtain the period
                                 Otherwise, all load types will be considered.
+        :param update_seismic_force: a boolean variable.
+                                     True means the eigen value analysis is performed first and the seismic forces are
+                                     computed from the modal period in the same OpenSees run. The period and forces
+                                     can be synchronized afterwards using building.read_modal_period and
+                                     building.compute_seismic_force.
+                                     False means the seismic forces stored in building are used.
         """
-        # Change the working directory to folder where .tcl files will be saved
-        if not os.path.exists(building.directory['building elastic model']):
-            os.makedirs(building.directory['building elastic model'])
-        os.chdir(building.directory['building elastic model'])
+        self.update_seismic_force = update_seismic_force and not for_period_only
+
+        # Folder where .tcl files will be saved. The working directory of the process is not changed.
+        self.directory = building.directory['building elastic model']
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        # Results will be read from OpenSees output files rather than in-process analysis results
+        building.analysis_results = {}
 
         # Call methods to write .tcl files for the building
         self.write_nodes(building)
@@ -67,15 +96,24 @@ class ElasticAnalysis(object):
             self.write_gravity_dead_load(building)
             self.write_gravity_live_load(building)
             self.write_earthquake_load(building)
-            self.write_gravity_earthquake_load(building)
+            if self.update_seismic_force:
+                self.write_seismic_force(building)
+            if SUPERPOSE_GRAVITY_EARTHQUAKE and not for_drift_only:
+                # Remove the GravityEarthquake outputs of previous analysis, drifts will be obtained by superposition
+                shutil.rmtree(self.directory / 'GravityEarthquake', ignore_errors=True)
+            else:
+                self.write_gravity_earthquake_load(building)
         self.copy_baseline_files(building, for_drift_only, for_period_only)
 
         # Call method to run OpenSees.exe for performing elastic analysis
-        self.run_OpenSees_program()
+        if PARALLEL_LOAD_CASE and not for_period_only:
+            self.run_load_cases_in_parallel(building)
+        else:
+            self.run_OpenSees_program()
 
     def write_nodes(self, building):
         # Create a .tcl file and write the node information
-        with open('DefineNodes2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineNodes2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define all nodes \n")  # Introduce the file usage
             tclfile.write("# Units: inch \n\n\n")  # Explain the units
 
@@ -138,7 +176,7 @@ class ElasticAnalysis(object):
 
     def write_fixities(self, building):
         # Create a .tcl file to write boundary for the model
-        with open('DefineFixities2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineFixities2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define the fixity at all column bases \n\n\n")
             tclfile.write("# Defining fixity at column base \n")
             for j in range(1, building.geometry['number of X bay']+2):
@@ -149,7 +187,7 @@ class ElasticAnalysis(object):
 
     def write_floor_constraint(self, building):
         # Create a .tcl file to write floor constrain, i.e., equal DOF
-        with open('DefineFloorConstraint2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineFloorConstraint2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define floor constraint \n\n")
             tclfile.write("set\tConstrainDOF\t1;\t# Nodes at same floor level have identical lateral displacement \n\n")
             # Constraint starts from floor level 2
@@ -166,11 +204,12 @@ class ElasticAnalysis(object):
 
     def write_beam(self, building):
         # Create a .tcl file to write beam elements
-        with open('DefineBeams2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineBeams2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define beam elements \n\n\n")
             tclfile.write("# Define beam section sizes \n")
             for i in range(2, building.geometry['number of story']+2):
-                tclfile.write("set\tBeamLevel%i\t[SectionProperty %s]; \n" % (i, building.member_size['beam'][i-2]))
+                section_property = tcl_section_property(building.member_size['beam'][i-2], SECTION_DATABASE)
+                tclfile.write("set\tBeamLevel%i\t%s; \n" % (i, section_property))
             tclfile.write("\n\n# Define beams \n")
             for i in range(2, building.geometry['number of story']+2):
                 tclfile.write("# Level %i\n" % i)
@@ -197,22 +236,22 @@ class ElasticAnalysis(object):
 
     def write_column(self, building):
         # Create a .tcl file to define all column elements
-        with open('DefineColumns2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineColumns2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define columns \n\n\n")
 
             # Define exterior column sizes
             tclfile.write("# Define exterior column section sizes \n")
             for i in range(1, building.geometry['number of story']+1):
-                tclfile.write("set\tExteriorColumnStory%i\t[SectionProperty %s]; \n"
-                              % (i, building.member_size['exterior column'][i-1]))
+                section_property = tcl_section_property(building.member_size['exterior column'][i-1], SECTION_DATABASE)
+                tclfile.write("set\tExteriorColumnStory%i\t%s; \n" % (i, section_property))
 
             tclfile.write("\n\n")
 
             # Define interior column sizes
             tclfile.write("# Define interior column section sizes \n")
             for i in range(1, building.geometry['number of story']+1):
-                tclfile.write("set\tInteriorColumnStory%i\t[SectionProperty %s]; \n"
-                              % (i, building.member_size['interior column'][i-1]))
+                section_property = tcl_section_property(building.member_size['interior column'][i-1], SECTION_DATABASE)
+                tclfile.write("set\tInteriorColumnStory%i\t%s; \n" % (i, section_property))
 
             tclfile.write("\n\n# Define columns\n")
             for i in range(1, building.geometry['number of story']+1):
@@ -252,7 +291,7 @@ class ElasticAnalysis(object):
 
     def write_leaning_column_spring(self, building):
         # Create a .tcl file to write all rotational springs for leaning column
-        with open('DefineLeaningColumnSpring.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineLeaningColumnSpring.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define column hinges \n\n")
             for i in range(2, building.geometry['number of story']+2):
                 # Spring below the floor level i
@@ -280,7 +319,7 @@ class ElasticAnalysis(object):
 
     def write_mass(self, building):
         # Create a .tcl file to write nodal mass
-        with open('DefineMasses2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineMasses2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define all nodal masses \n\n")
 
             # Write values for floor weights, tributary mass ratio, and nodal mass
@@ -306,7 +345,7 @@ class ElasticAnalysis(object):
 
     def write_all_recorder(self):
         # Create a .tcl file to write all recorders for output
-        with open('DefineAllRecorders2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineAllRecorders2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define all recorders \n\n\n")  # File explanation
             tclfile.write("# Setting up main folders for different load scenarios\n")
             tclfile.write("set\tbaseDir\t[pwd]\n")  # OpenSees base directory
@@ -338,10 +377,25 @@ class ElasticAnalysis(object):
 
     def write_story_drift_recorder(self, building):
         # Create a .tcl file to write story drift recorder for output
-        with open('DefineStoryDriftRecorders2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineStoryDriftRecorders2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define story drift recorders\n\n\n")
             tclfile.write("cd\t$baseDir/$dataDir/StoryDrifts\n\n")
 
+            # Write one recorder for all stories and roof: columns are time, drift of each story, and roof drift
+            if CONSOLIDATED_RECORDER:
+                tclfile.write("recorder\tDrift\t-file")
+                tclfile.write("\t$baseDir/$dataDir/StoryDrifts/StoryDrifts.out")
+                tclfile.write("\t-time\t-iNode")
+                for i in range(1, building.geometry['number of story']+1):
+                    tclfile.write("\t%i%i%i" % (1, i, 1))  # node at bottom of current story
+                tclfile.write("\t%i%i%i" % (1, 1, 1))
+                tclfile.write("\t-jNode")
+                for i in range(1, building.geometry['number of story']+1):
+                    tclfile.write("\t%i%i%i" % (1, i+1, 1))  # node at top of current story
+                tclfile.write("\t%i%i%i" % (1, building.geometry['number of story']+1, 1))
+                tclfile.write("\t-dof\t1\t-perpDirn\t2; \n")
+                return
+
             # Write the story drift recorder for each story
             for i in range(1, building.geometry['number of story']+1):
                 tclfile.write("recorder\tDrift\t-file")
@@ -360,9 +414,19 @@ class ElasticAnalysis(object):
 
     def write_node_displacement_recorder(self, building):
         # Create a .tcl file to write node displacement recorder for output
-        with open('DefineNodeDisplacementRecorders2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineNodeDisplacementRecorders2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define node displacement recorders\n\n\n")
             tclfile.write("cd\t$baseDir/$dataDir/NodeDisplacements\n\n")
+            # Write one recorder for nodes at all floor levels
+            if CONSOLIDATED_RECORDER:
+                tclfile.write("recorder\tNode\t-file")
+                tclfile.write("\tNodeDisplacements.out")
+                tclfile.write("\t-time\t-node")
+                for i in range(1, building.geometry['number of story']+2):
+                    for j in range(1, building.geometry['number of X bay']+2):
+                        tclfile.write("\t%i%i%i" % (j, i, 1))
+                tclfile.write("\t-dof\t1\t2\t3\tdisp; \n")
+                return
             # Write the node displacement recorder for node at each floor level
             for i in range(1, building.geometry['number of story']+2):
                 tclfile.write("recorder\tNode\t-file")
@@ -374,11 +438,20 @@ class ElasticAnalysis(object):
 
     def write_beam_force_recorder(self, building):
         # Create a .tcl file to write beam force recorder for output
-        with open('DefineGlobalBeamForceRecorders2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineGlobalBeamForceRecorders2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define global beam force recorders\n\n\n")
             tclfile.write("cd\t$baseDir/$dataDir/GlobalBeamForces\n\n")
 
             tclfile.write("# Beam element global force recorders\n")
+            # Write one recorder for beams at all floor levels (from level 2 to roof)
+            if CONSOLIDATED_RECORDER:
+                tclfile.write("recorder\tElement\t-file\tGlobalXBeamForces.out")
+                tclfile.write("\t-time\t-ele")
+                for i in range(2, building.geometry['number of story']+2):
+                    for j in range(1, building.geometry['number of X bay']+1):
+                        tclfile.write("\t%i%i%i%i%i%i%i" % (2, j, i, 1, j+1, i, 1))
+                tclfile.write("\tforce; \n")
+                return
             for i in range(2, building.geometry['number of story']+2):
                 tclfile.write("recorder\tElement\t-file\tGlobalXBeamForcesLevel%i.out" % i)
                 tclfile.write("\t-time\t-ele")
@@ -388,11 +461,20 @@ class ElasticAnalysis(object):
 
     def write_column_force_recorder(self, building):
         # Create a .tcl file to write column force recorder for output
-        with open('DefineGlobalColumnForceRecorders2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineGlobalColumnForceRecorders2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define global column force recorders\n\n\n")
             tclfile.write("cd\t$baseDir/$dataDir/GlobalColumnForces\n\n")
 
             tclfile.write("# X-Direction frame column element global force recorders\n")
+            # Write one recorder for columns in all stories
+            if CONSOLIDATED_RECORDER:
+                tclfile.write("recorder\tElement\t-file\tGlobalColumnForces.out")
+                tclfile.write("\t-time\t-ele")
+                for i in range(1, building.geometry['number of story']+1):
+                    for j in range(1, building.geometry['number of X bay']+2):
+                        tclfile.write("\t%i%i%i%i%i%i%i" % (3, j, i, 1, j, i+1, 1))
+                tclfile.write("\tforce;\n")
+                return
             for i in range(1, building.geometry['number of story']+1):
                 tclfile.write("recorder\tElement\t-file\tGlobalColumnForcesStory%i.out" % i)
                 tclfile.write("\t-time\t-ele")
@@ -402,7 +484,7 @@ class ElasticAnalysis(object):
 
     def write_gravity_dead_load(self, building):
         # Create a .tcl file that writes the gravity dead load on the model
-        with open('DefineGravityDeadLoads2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineGravityDeadLoads2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define gravity dead loads\n\n\n")
 
             # Assign the beam dead load values
@@ -437,13 +519,7 @@ class ElasticAnalysis(object):
 
             # Assign the lateral load values caused by earthquake
             # Please note this is used to verify the strength -> use seismic_force_for_strength
-            tclfile.write("# Assign lateral load values caused by earthquake (kip)\n")
-            tclfile.write("set\tLateralLoad\t[list")
-            for i in range(building.geometry['number of story']):
-                tclfile.write("\t%f"
-                              % (building.seismic_force_for_strength['lateral story force'][i] \
-                                 /building.geometry['number of X LFRS'] * ACCIDENTAL_TORSION))
-            tclfile.write("];\n\n\n")
+            self.write_lateral_load(tclfile, building, for_drift=False)
 
             # Define the load pattern in OpenSees
             tclfile.write("# Define uniform loads on beams\n")
@@ -473,7 +549,7 @@ class ElasticAnalysis(object):
 
     def write_gravity_live_load(self, building):
         # Create a .tcl file to write live load
-        with open('DefineGravityLiveLoads2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineGravityLiveLoads2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define gravity live loads\n\n\n")
 
             # Assign the beam dead load values
@@ -508,13 +584,7 @@ class ElasticAnalysis(object):
 
             # Assign the lateral load values caused by earthquake
             # This is used to compute the required strength -> use seismic_force_for_strength
-            tclfile.write("# Assign lateral load values caused by earthquake (kip)\n")
-            tclfile.write("set\tLateralLoad\t[list")
-            for i in range(building.geometry['number of story']):
-                tclfile.write("\t%f"
-                              % (building.seismic_force_for_strength['lateral story force'][i]
-                                 / building.geometry['number of X LFRS'] * ACCIDENTAL_TORSION))
-            tclfile.write("];\n\n\n")
+            self.write_lateral_load(tclfile, building, for_drift=False)
 
             # Define the load pattern in OpenSees
             tclfile.write("# Define uniform loads on beams\n")
@@ -544,7 +614,7 @@ class ElasticAnalysis(object):
 
     def write_earthquake_load(self, building):
         # Create a .tcl file to write earthquake load
-        with open('DefineEarthquakeLaterLoads2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineEarthquakeLaterLoads2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define gravity live loads\n\n\n")
 
             # Assign the beam dead load values
@@ -579,13 +649,7 @@ class ElasticAnalysis(object):
 
             # Assign the lateral load values caused by earthquake
             # This is used to compute the required strength -> use seismic_force_for_strength
-            tclfile.write("# Assign lateral load values caused by earthquake (kip)\n")
-            tclfile.write("set\tLateralLoad\t[list")
-            for i in range(building.geometry['number of story']):
-                tclfile.write("\t%f"
-                              % (building.seismic_force_for_strength['lateral story force'][i]
-                                 / building.geometry['number of X LFRS'] * ACCIDENTAL_TORSION))
-            tclfile.write("];\n\n\n")
+            self.write_lateral_load(tclfile, building, for_drift=False)
 
             # Define the load pattern in OpenSees
             tclfile.write("# Define uniform loads on beams\n")
@@ -604,7 +668,7 @@ class ElasticAnalysis(object):
     def write_gravity_earthquake_load(self, building):
         # Create a .tcl file to write the combination of earthquake and gravity loads
         # This load case is used to calculate story drift
-        with open('DefineGravityEarthquakeLoads2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineGravityEarthquakeLoads2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define gravity live loads\n\n\n")
 
             # Assign the beam dead load values
@@ -638,13 +702,7 @@ class ElasticAnalysis(object):
             tclfile.write("\n")
 
             # Assign the lateral load values caused by earthquake
-            tclfile.write("# Assign lateral load values caused by earthquake (kip)\n")
-            tclfile.write("set\tLateralLoad\t[list")
-            for i in range(building.geometry['number of story']):
-                tclfile.write("\t%f"
-                              % (building.seismic_force_for_drift['lateral story force'][i]
-                                 / building.geometry['number of X LFRS'] * ACCIDENTAL_TORSION))
-            tclfile.write("];\n\n\n")
+            self.write_lateral_load(tclfile, building, for_drift=True)
 
             # Define the load pattern in OpenSees
             tclfile.write("# Load combinations:\n"
@@ -682,42 +740,264 @@ class ElasticAnalysis(object):
 
             tclfile.write("# puts \"Gravity and earthquake loads defined\"")
 
+    def write_lateral_load(self, tclfile, building, for_drift):
+        """
+        This method is used to write the lateral load values caused by earthquake into a load .tcl file.
+        :param tclfile: an opened .tcl file
+        :param building: a class defined in "building_information.py" file
+        :param for_drift: a boolean variable. True means the seismic force for drift is used.
+                          False means the seismic force for strength is used.
+        """
+        tclfile.write("# Assign lateral load values caused by earthquake (kip)\n")
+        if self.update_seismic_force:
+            # Lateral loads are computed in OpenSees based on the modal period
+            tclfile.write("source\tDefineSeismicForce2DModel.tcl\n")
+            tclfile.write("set\tLateralLoad\t$LateralLoadFor%s;\n\n\n" % ('Drift' if for_drift else 'Strength'))
+            return
+        if for_drift:
+            seismic_force = building.seismic_force_for_drift
+        else:
+            seismic_force = building.seismic_force_for_strength
+        tclfile.write("set\tLateralLoad\t[list")
+        for i in range(building.geometry['number of story']):
+            tclfile.write("\t%f"
+                          % (seismic_force['lateral story force'][i]
+                             / building.geometry['number of X LFRS'] * ACCIDENTAL_TORSION))
+        tclfile.write("];\n\n\n")
+
+    def write_seismic_force(self, building):
+        # Create a .tcl file to compute the seismic story forces from the period obtained in eigen value analysis
+        # The calculation is identical to "compute_seismic_force" method defined in "building_information.py"
+        with open(self.directory / 'DefineSeismicForce2DModel.tcl', 'w') as tclfile:
+            tclfile.write("# Define seismic story forces based on modal period (ASCE 7-10 Section 12.8)\n\n\n")
+
+            # Seismic response coefficient: same as "calculate_Cs_coefficient" in "help_functions.py"
+            tclfile.write("# Seismic response coefficient (Equations 12.8-2 to 12.8-6)\n")
+            tclfile.write("proc SeismicResponseCoefficient {T forDrift} {\n")
+            for name in ['SDS', 'SD1', 'S1', 'TL', 'R', 'Ie']:
+                tclfile.write("\tset\t%s\t%r;\n" % (name, float(np.ravel(building.elf_parameters[name])[0])))
+            tclfile.write("\tset\tCs\t[expr $SDS/($R/$Ie)];\n")
+            tclfile.write("\tif {$T <= $TL} {\n")
+            tclfile.write("\t\tset\tCsUpper\t[expr $SD1/($T*($R/$Ie))];\n")
+            tclfile.write("\t} else {\n")
+            tclfile.write("\t\tset\tCsUpper\t[expr $SD1*$TL/($T**2*($R/$Ie))];\n")
+            tclfile.write("\t}\n")
+            tclfile.write("\tif {$Cs > $CsUpper} {set Cs $CsUpper}\n")
+            tclfile.write("\tif {!$forDrift} {\n")
+            tclfile.write("\t\tset\tCsLower\t[expr max(0.044*$SDS*$Ie, 0.01)];\n")
+            tclfile.write("\t\tif {$Cs < $CsLower} {set Cs $CsLower}\n")
+            tclfile.write("\t}\n")
+            tclfile.write("\tif {$S1 >= 0.6} {\n")
+            tclfile.write("\t\tset\tCsLower\t[expr 0.5*$S1/($R/$Ie)];\n")
+            tclfile.write("\t\tif {$Cs < $CsLower} {set Cs $CsLower}\n")
+            tclfile.write("\t}\n")
+            tclfile.write("\treturn $Cs\n")
+            tclfile.write("}\n\n")
+
+            # Period for strength is bounded by CuTa, period for drift depends on PERIOD_FOR_DRIFT_LIMIT
+            tclfile.write("# Determine the periods for strength and drift\n")
+            tclfile.write("set\tModalPeriod\t[lindex $Tlist 0];\n")
+            tclfile.write("set\tUpperPeriod\t%r;\n" % float(np.ravel(building.elf_parameters['period'])[0]))
+            tclfile.write("set\tPeriodForStrength\t[expr min($ModalPeriod, $UpperPeriod)];\n")
+            if PERIOD_FOR_DRIFT_LIMIT:
+                tclfile.write("set\tPeriodForDrift\t[expr min($ModalPeriod, $UpperPeriod)];\n")
+            else:
+                tclfile.write("set\tPeriodForDrift\t$ModalPeriod;\n")
+            tclfile.write("set\tCsForStrength\t[SeismicResponseCoefficient $PeriodForStrength 0];\n")
+            tclfile.write("set\tCsForDrift\t[SeismicResponseCoefficient $PeriodForDrift 1];\n\n")
+
+            # Lateral force per unit Cs: the vertical distribution does not depend on modal period since k is
+            # determined using CuTa
+            k = determine_k_coeficient(building.elf_parameters['period'])
+            lateral_story_force, _ = calculate_seismic_force(np.sum(building.gravity_loads['floor weight']),
+                                                             building.gravity_loads['floor weight'],
+                                                             building.geometry['floor height'], k)
+            unit_force = np.ravel(lateral_story_force) / building.geometry['number of X LFRS'] * ACCIDENTAL_TORSION
+            for load in ['Strength', 'Drift']:
+                tclfile.write("set\tLateralLoadFor%s\t[list" % load)
+                for i in range(building.geometry['number of story']):
+                    tclfile.write("\t[expr $CsFor%s*%r]" % (load, float(unit_force[i])))
+                tclfile.write("];\n")
+            tclfile.write("\n# puts \"Seismic forces defined\"")
+
+    def write_model(self):
+        # Create the main .tcl file: the model is defined only once and each load pattern is applied in sequence
+        # The model is reset to its initial state and the load pattern is removed before the next load type
+        model_files = ['DefineVariables.tcl', 'DefineFunctionsAndProcedures.tcl', 'DefineNodes2DModel.tcl',
+                       'DefineFixities2DModel.tcl', 'DefineFloorConstraint2DModel.tcl', 'DefineBeams2DModel.tcl',
+                       'DefineColumns2DModel.tcl', 'DefineLeaningColumnSpring.tcl', 'DefineMasses2DModel.tcl']
+        load_files = {'DeadLoad': 'DefineGravityDeadLoads2DModel.tcl',
+                      'LiveLoad': 'DefineGravityLiveLoads2DModel.tcl',
+                      'EarthquakeLoad': 'DefineEarthquakeLaterLoads2DModel.tcl',
+                      'GravityEarthquake': 'DefineGravityEarthquakeLoads2DModel.tcl'}
+        load_pattern_tags = {'DeadLoad': 101, 'LiveLoad': 102, 'EarthquakeLoad': 103, 'GravityEarthquake': 104}
+        with open(self.directory / 'Model.tcl', 'w') as tclfile:
+            tclfile.write("# Define analysis series\n")
+            tclfile.write("set AnalysisLoadType [list EigenValue DeadLoad LiveLoad EarthquakeLoad GravityEarthquake]")
+            tclfile.write("\n\n")
+
+            tclfile.write("# Define model builder\n")
+            tclfile.write("model BasicBuilder -ndm 2 -ndf 3\n\n")
+            tclfile.write("# Define the model (variables, procedures, nodes, elements, and masses) once\n")
+            for file in model_files:
+                tclfile.write("source %s\n" % file)
+            tclfile.write("\n")
+
+            tclfile.write("# Loop over all the analysis types\n")
+            tclfile.write("foreach LoadType $AnalysisLoadType {\n\n")
+            tclfile.write("puts \"Analysis type is $LoadType\"\n\n")
+            tclfile.write("# Perform eigen value analysis\n")
+            tclfile.write("if {$LoadType == \"EigenValue\"} {\n")
+            tclfile.write("\tsource EigenValueAnalysis.tcl\n")
+            tclfile.write("\t}\n\n")
+            for load_type, file in load_files.items():
+                tclfile.write("# Apply %s, perform the analysis, and reset the model\n" % load_type)
+                tclfile.write("if {$LoadType == \"%s\"} {\n" % load_type)
+                tclfile.write("\tsource DefineAllRecorders2DModel.tcl\n")
+                tclfile.write("\tsource %s\n" % file)
+                tclfile.write("\tsource PerformLoadsAnalysis.tcl\n")
+                tclfile.write("\tremove recorders\n")
+                tclfile.write("\tremove loadPattern %i\n" % load_pattern_tags[load_type])
+                tclfile.write("\twipeAnalysis\n")
+                tclfile.write("\treset\n")
+                tclfile.write("\tsetTime 0.0\n")
+                tclfile.write("\t}\n\n")
+            tclfile.write("# Create a blank line among different analysis\n")
+            tclfile.write("puts \" \"\n")
+            tclfile.write("}\n\n")
+            tclfile.write("# Clear the memory\n")
+            tclfile.write("wipe all\n")
+
+    def write_loads_analysis(self):
+        # Create a .tcl file to define the static analysis for the linear solver profile
+        # The loads are applied in a single step. The stiffness is factorized only once (modified Newton with initial
+        # stiffness) and the P-Delta effect is included by iterating on the residual forces.
+        if ELASTIC_SOLVER_PROFILE != 'linear':
+            sys.stderr.write('Error: wrong elastic solver profile!\nPlease use "linear" or "incremental"!')
+            sys.exit(2)
+        with open(self.directory / 'PerformLoadsAnalysis.tcl', 'w') as tclfile:
+            tclfile.write("# This file will be used to apply the loads using a single load step \n")
+            tclfile.write("# Units: kips, inches, seconds \n\n\n")
+
+            tclfile.write("constraints\tPlain;\t# How it handles boundary conditions\n")
+            tclfile.write("numberer\tRCM;\t# Renumber dof's to minimize band-width\n")
+            tclfile.write("system\tBandSPD;\t# Symmetric positive definite banded system\n")
+            tclfile.write("test\tNormDispIncr\t1.0e-10\t50;\t# Convergence test for P-Delta iterations\n")
+            tclfile.write("algorithm\tModifiedNewton\t-initial;\t# Factorize the initial stiffness only once\n")
+            tclfile.write("integrator\tLoadControl\t1.0;\t# Apply all loads in one step\n")
+            tclfile.write("analysis\tStatic;\n")
+            tclfile.write("analyze\t1;\n\n")
+
+            tclfile.write("# Maintain constant loads and reset time to zero\n")
+            tclfile.write("loadConst\t-time\t0.0\n")
+            tclfile.write("puts \"$LoadType Performed Successfully\"")
+
     def copy_baseline_files(self, building, for_drift_only, for_period_only):
         """
         Some .tcl files are fixed, i.e., no need to change for different OpenSees models.
         Therefore, just copy these .tcl files from the baseline folder
         """
         # define a list which includes all baseline files' names
-        file_list = ['Database.csv', 'DefineFunctionsAndProcedures.tcl', 'DefineVariables.tcl',
-                     'EigenValueAnalysis.tcl', 'Model.tcl', 'PerformLoadsAnalysis.tcl']
-        # Change the working directory to the folder where baseline .tcl files are stored
-        os.chdir(building.directory['baseline files elastic'])
+        file_list = ['DefineFunctionsAndProcedures.tcl', 'DefineVariables.tcl', 'EigenValueAnalysis.tcl']
+        # The baseline analysis file applies the loads in several increments using Newton algorithm
+        if ELASTIC_SOLVER_PROFILE == 'incremental':
+            file_list.append('PerformLoadsAnalysis.tcl')
         # Copy all baseline .tcl files to building model directory
         for file in file_list:
-            target_file = building.directory['building elastic model'] / file
-            shutil.copyfile(file, target_file)
-        # Remember to change the working directory to building model directory
-        os.chdir(building.directory['building elastic model'])
+            shutil.copyfile(building.directory['baseline files elastic'] / file, self.directory / file)
+        # Generate "Model.tcl" which builds the model once for all load types
+        self.write_model()
+        if ELASTIC_SOLVER_PROFILE != 'incremental':
+            self.write_loads_analysis()
         # Revise "Model.tcl" file if we only want to obtain drifts
         # Firstly read all content in "Model.tcl", then revise the content, and store it back to "Model.tcl"
         old_string = '[list EigenValue DeadLoad LiveLoad EarthquakeLoad GravityEarthquake]'
         new_string_for_drift = '[list GravityEarthquake]'
+        if self.update_seismic_force:
+            # The eigen value analysis should be performed before the loads are applied
+            new_string_for_drift = '[list EigenValue GravityEarthquake]'
         if for_drift_only:
-            with open('Model.tcl', 'r') as file:
+            with open(self.directory / 'Model.tcl', 'r') as file:
                 content = file.read()
             new_content = content.replace(old_string, new_string_for_drift)
-            with open('Model.tcl', 'w') as file:
+            with open(self.directory / 'Model.tcl', 'w') as file:
+                file.write(new_content)
+        # Revise "Model.tcl" file if GravityEarthquake load case is obtained by superposition
+        new_string_for_superposition = '[list EigenValue DeadLoad LiveLoad EarthquakeLoad]'
+        if SUPERPOSE_GRAVITY_EARTHQUAKE and not for_drift_only and not for_period_only:
+            with open(self.directory / 'Model.tcl', 'r') as file:
+                content = file.read()
+            new_content = content.replace(old_string, new_string_for_superposition)
+            with open(self.directory / 'Model.tcl', 'w') as file:
                 file.write(new_content)
         # Revise "Model.tcl" file if we only want to obtain period
         new_string_for_period = '[list EigenValue]'
         if for_period_only:
-            with open('Model.tcl', 'r') as file:
+            with open(self.directory / 'Model.tcl', 'r') as file:
                 content = file.read()
             new_content = content.replace(old_string, new_string_for_period)
-            with open('Model.tcl', 'w') as file:
+            with open(self.directory / 'Model.tcl', 'w') as file:
                 file.write(new_content)
 
 
+    def run_load_cases_in_parallel(self, building):
+        """
+        This method is used to run the load cases in "Model.tcl" concurrently, each of which is run in its own
+        subdirectory model (LoadCases/<load type>). Once all load cases are completed, the output folders are moved to
+        building model directory, where they are read by building.read_story_drift and ElasticOutput.
+        :param building: a class defined in "building_information.py" file
+        """
+        model_directory = self.directory
+        # Obtain the load types defined in "Model.tcl"
+        with open(self.directory / 'Model.tcl', 'r') as file:
+            content = file.read()
+        analysis_string = re.search(r'set AnalysisLoadType (\[list [^\]]*\])', content).group(1)
+        load_types = analysis_string[len('[list '):-1].split()
+        # Define the analysis series for each load case
+        # The seismic forces depend on the period: thus the eigen value analysis is performed in every load case.
+        # Otherwise, the eigen value analysis is run as an independent case.
+        analysis_series = {}
+        for load_type in load_types:
+            if load_type == 'EigenValue':
+                if not self.update_seismic_force:
+                    analysis_series[load_type] = [load_type]
+            elif self.update_seismic_force:
+                analysis_series[load_type] = ['EigenValue', load_type]
+            else:
+                analysis_series[load_type] = [load_type]
+        # Create the subdirectory model for each load case: all .tcl files are identical except "Model.tcl"
+        case_directories = []
+        for load_type, series in analysis_series.items():
+            case_directory = model_directory / 'LoadCases' / load_type
+            shutil.rmtree(case_directory, ignore_errors=True)
+            os.makedirs(case_directory)
+            for file in os.listdir(model_directory):
+                if file.endswith('.tcl') or file.endswith('.csv'):
+                    shutil.copyfile(model_directory / file, case_directory / file)
+            with open(case_directory / 'Model.tcl', 'w') as file:
+                file.write(content.replace(analysis_string, '[list %s]' % ' '.join(series)))
+            case_directories.append(case_directory)
+        # Run all load cases concurrently and wait for their completion
+        run_opensees_batch(case_directories)
+        # Move the outputs of each load case to building model directory
+        output_folder = {'EigenValue': 'EigenAnalysis'}
+        moved_folders = []
+        for load_type, series in analysis_series.items():
+            for analysis_type in series:
+                folder = output_folder.get(analysis_type, analysis_type)
+                if folder in moved_folders:
+                    continue
+                if not os.path.exists(model_directory / 'LoadCases' / load_type / folder):
+                    raise FileNotFoundError('Output of %s is not found in %s' %
+                                            (analysis_type, model_directory / 'LoadCases' / load_type))
+                shutil.rmtree(model_directory / folder, ignore_errors=True)
+                shutil.move(str(model_directory / 'LoadCases' / load_type / folder), str(model_directory / folder))
+                moved_folders.append(folder)
+
     def run_OpenSees_program(self):
         # This method is used to run the "RunModel.bat" file. OpenSees.exe program is thus run.
-        os.system('OpenSees Model.tcl')
\ No newline at end of file
+        if PERSISTENT_OPENSEES_SESSION:
+            if not get_opensees_session().run(self.directory):
+                raise OpenSeesError('OpenSees session failed to run Model.tcl in %s' % self.directory)
+        else:
+            run_opensees(self.directory)
\ No newline at end of file
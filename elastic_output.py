@@ -2,9 +2,13 @@
 # Developed by GUAN, XINGQUAN @ UCLA in Aug. 2018
 # Updated on Sept. 28 2018
 
-import os
 import numpy as np
 
+from recorder_reader import read_last_records
+from recorder_reader import read_consolidated_record
+from recorder_reader import consolidated_column_map
+from global_variables import CONSOLIDATED_RECORDER
+
 # #########################################################################
 #           Define a list of load sequence as global constant             #
 # #########################################################################
@@ -64,33 +68,13 @@ class ElasticOutput(object):
         :return: a dictionary which contains load demands under three load scenarios
         """
         for load_type in LOAD_TYPE:
-            # Define the directory where the column force output is stored
-            path_output = building.directory['building elastic model'] / load_type / 'GlobalColumnForces'
-            os.chdir(path_output)
-            # Initialize a matrix to store all column component forces: axial, shear and moment.
-            column_load = np.zeros([building.geometry['number of story'], (building.geometry['number of X bay']+1)*6])
-            # Read output txt files
-            for story in range(0, building.geometry['number of story']):
-                # Define the output txt file name
-                file_name = 'GlobalColumnForcesStory' + str(story+1) + '.out'
-                read_data = np.loadtxt(file_name)
-                column_load[story, :] = read_data[-1, 1:]
-            # Store column forces into different load cases
-            self.raw_column_load[load_type] = column_load
-
-            # Define the directory where the beam force is stored
-            path_output = building.directory['building elastic model'] / load_type / 'GlobalBeamForces'
-            os.chdir(path_output)
-            #  Initialize a matrix to store all beam component forces: axial, shear and moment
-            beam_load = np.zeros([building.geometry['number of story'], building.geometry['number of X bay']*6])
-            # Read beam load from output txt files
-            for story in range(0, building.geometry['number of story']):
-                # Define output txt file name
-                file_name = 'GlobalXBeamForcesLevel' + str(story+2) + '.out'
-                read_data = np.loadtxt(file_name)
-                beam_load[story, :] = read_data[-1, 1:]
-            # Store beam forces based on load scenario
-            self.raw_beam_load[load_type] = beam_load
+            # Use the forces from the in-process elastic analysis if they are available
+            if load_type in building.analysis_results:
+                self.raw_column_load[load_type] = building.analysis_results[load_type]['column force']
+                self.raw_beam_load[load_type] = building.analysis_results[load_type]['beam force']
+                continue
+            # Read the forces from OpenSees output files
+            self.raw_column_load[load_type], self.raw_beam_load[load_type] = read_member_force(building, load_type)
 
     def extract_column_load(self):
         # Extract axial force, shear force, and moment from the variable obtained in the previous step
@@ -228,3 +212,39 @@ class ElasticOutput(object):
                     else:
                         dominate_load[force][m, n] = temp_2
         self.dominate_load = dominate_load
+
+
+# #########################################################################
+#          Define a function to read member forces from output files      #
+# #########################################################################
+
+def read_member_force(building, load_type):
+    """
+    This function is used to read the global member forces under a certain load type from OpenSees output files.
+    :param building: user-defined class in "building_information.py" file
+    :param load_type: a string which denotes the load type (the name of output folder)
+    :return: two matrices which include the column forces and beam forces (axial, shear and moment at both ends)
+    """
+    # Forces of all stories (or floor levels) are saved in one file when the consolidated recorder is used
+    if CONSOLIDATED_RECORDER:
+        path_output = building.directory['building elastic model'] / load_type
+        column_load = read_consolidated_record(path_output / 'GlobalColumnForces' / 'GlobalColumnForces.out',
+                                               consolidated_column_map(building.geometry['number of story'],
+                                                                       (building.geometry['number of X bay']+1)*6))
+        beam_load = read_consolidated_record(path_output / 'GlobalBeamForces' / 'GlobalXBeamForces.out',
+                                             consolidated_column_map(building.geometry['number of story'],
+                                                                     building.geometry['number of X bay']*6))
+        return column_load, beam_load
+
+    # Read the final record of column forces in each story (time and forces of all columns)
+    path_output = building.directory['building elastic model'] / load_type / 'GlobalColumnForces'
+    file_names = [path_output / ('GlobalColumnForcesStory' + str(story+1) + '.out')
+                  for story in range(building.geometry['number of story'])]
+    column_load = read_last_records(file_names, (building.geometry['number of X bay']+1)*6 + 1)[:, 1:]
+
+    # Read the final record of beam forces at each floor level (time and forces of all beams)
+    path_output = building.directory['building elastic model'] / load_type / 'GlobalBeamForces'
+    file_names = [path_output / ('GlobalXBeamForcesLevel' + str(story+2) + '.out')
+                  for story in range(building.geometry['number of story'])]
+    beam_load = read_last_records(file_names, building.geometry['number of X bay']*6 + 1)[:, 1:]
+    return column_load, beam_load
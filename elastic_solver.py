@@ -0,0 +1,924 @@
+# This file is used to define an in-process elastic solver which replaces the OpenSees elastic analysis
+# The 2D frame model is identical to the one written by "elastic_analysis.py":
+# elastic beam-column elements, leaning column with pinned ends, rigid floor links (equalDOF), and P-Delta on columns
+# Units: kips, inches, seconds
+
+import collections
+import threading
+import numpy as np
+import scipy.linalg
+import scipy.sparse.linalg
+
+from help_functions import search_section_property
+from help_functions import superpose_gravity_earthquake
+from global_variables import SECTION_DATABASE
+from global_variables import ACCIDENTAL_TORSION
+from global_variables import CONDENSED_DRIFT_MODEL
+from global_variables import SUPERPOSE_GRAVITY_EARTHQUAKE
+from global_variables import LOW_RANK_UPDATE
+from global_variables import LOW_RANK_DOF_RATIO
+from global_variables import FACTORIZATION_CACHE_SIZE
+
+
+# #########################################################################
+#        Define constants identical to those in "DefineVariables.tcl"     #
+# #########################################################################
+
+# Young's modulus of steel (ksi)
+ELASTIC_MODULUS = 29000
+
+# Large area used for the leaning column (inch^2)
+AREA_RIGID = 1e9
+
+# Gravity constant (inch/s^2)
+GRAVITY = 386.4
+
+# Convergence tolerance and iteration limit for the P-Delta iteration
+PDELTA_TOLERANCE = 1e-10
+MAXIMUM_PDELTA_ITERATION = 50
+
+# Buildings taller than this number of stories use the Lanczos (sparse) eigen solver
+LANCZOS_STORY_THRESHOLD = 30
+
+# Load types analyzed by the native solver (same names as the OpenSees output folders)
+LOAD_TYPE = ['DeadLoad', 'LiveLoad', 'EarthquakeLoad', 'GravityEarthquake']
+
+# Factorized stiffness of the most recently analyzed buildings (key: building UID)
+# Each thread keeps its own cache because the low-rank update modifies the cached factorization in place
+FACTORIZATION_CACHE = threading.local()
+
+
+# #########################################################################
+#        Define a class to store and update the factorized stiffness      #
+# #########################################################################
+
+class StiffnessFactorization(object):
+    """
+    This class stores the factorized elastic stiffness of a frame model. It includes the following methods:
+    (1) factorize the stiffness of a base design (Cholesky decomposition)
+    (2) update the factorization when a few elements of a new design differ from the base design.
+        The stiffness of the new design is K = K0 + P*D*P^T, where P selects the DOFs connected to the changed
+        elements and D is the change of stiffness on those DOFs. Sherman-Morrison-Woodbury formula gives:
+        K^-1 = K0^-1 - K0^-1*P*(I + D*P^T*K0^-1*P)^-1*D*P^T*K0^-1
+    (3) solve the linear system for given right-hand sides
+    """
+
+    def __init__(self, model):
+        """
+        This function factorizes the elastic stiffness of the model, which becomes the base design.
+        :param model: a class defined as FrameModel
+        """
+        self.element_dof = model.element_dof.copy()
+        self.element_length = model.element_length.copy()
+        self.element_area = model.element_area.copy()
+        self.element_inertia = model.element_inertia.copy()
+        self.element_matrix = model.element_stiffness()
+        self.factor = scipy.linalg.cho_factor(model.assemble(self.element_matrix))
+        # Attributes for the low-rank update (None means the base design is analyzed)
+        self.update_dof = None
+        self.update_stiffness = None
+        self.update_solution = None
+        self.capacitance = None
+
+    def is_compatible(self, model):
+        # The base factorization can only be reused for the model with the same topology and geometry
+        return np.array_equal(self.element_dof, model.element_dof) \
+            and np.array_equal(self.element_length, model.element_length)
+
+    def update(self, model):
+        """
+        This method is used to update the factorization for the section properties of a new design.
+        :param model: a class defined as FrameModel
+        :return: a boolean variable. True means the update succeeds.
+                 False means too many DOFs are changed and the stiffness should be refactorized.
+        """
+        changed = np.where((self.element_area != model.element_area)
+                           | (self.element_inertia != model.element_inertia))[0]
+        if len(changed) == 0:
+            self.update_dof = None
+            return True
+        dof = np.unique(model.element_dof[changed])
+        dof = dof[dof >= 0]
+        if len(dof) > LOW_RANK_DOF_RATIO * model.number_of_dof:
+            return False
+        # Change of stiffness on the changed DOFs: D
+        position = np.full(model.number_of_dof+1, len(dof))
+        position[dof] = np.arange(len(dof))
+        local_dof = position[np.where(model.element_dof[changed] < 0, model.number_of_dof,
+                                      model.element_dof[changed])]
+        difference = model.element_stiffness()[changed] - self.element_matrix[changed]
+        stiffness = np.zeros([len(dof)+1, len(dof)+1])
+        np.add.at(stiffness, (np.broadcast_to(local_dof[:, :, np.newaxis], difference.shape),
+                              np.broadcast_to(local_dof[:, np.newaxis, :], difference.shape)), difference)
+        self.update_dof = dof
+        self.update_stiffness = stiffness[:-1, :-1]
+        # K0^-1*P and capacitance matrix (I + D*P^T*K0^-1*P)
+        selection = np.zeros([model.number_of_dof, len(dof)])
+        selection[dof, np.arange(len(dof))] = 1.0
+        self.update_solution = scipy.linalg.cho_solve(self.factor, selection)
+        self.capacitance = scipy.linalg.lu_factor(np.eye(len(dof))
+                                                  + self.update_stiffness @ self.update_solution[dof, :])
+        return True
+
+    def solve(self, right_hand_side):
+        """
+        This method is used to solve K*x = b for the current design.
+        :param right_hand_side: an array with dimension of [number of DOF, number of right-hand side]
+        :return: an array with the same dimension as right_hand_side
+        """
+        solution = scipy.linalg.cho_solve(self.factor, right_hand_side)
+        if self.update_dof is not None:
+            correction = scipy.linalg.lu_solve(self.capacitance, self.update_stiffness @ solution[self.update_dof])
+            solution = solution - self.update_solution @ correction
+        return solution
+
+
+def factorize_stiffness(model, key):
+    """
+    This function is used to obtain the factorized stiffness of a frame model. The factorization of the previous design
+    with the same key is updated using low-rank correction if possible. Otherwise, the stiffness is factorized.
+    :param model: a class defined as FrameModel
+    :param key: a string used to identify the building (building UID)
+    :return: a class defined as StiffnessFactorization
+    """
+    cache = get_factorization_cache()
+    if LOW_RANK_UPDATE and key in cache:
+        factorization = cache[key]
+        if factorization.is_compatible(model) and factorization.update(model):
+            cache.move_to_end(key)
+            return factorization
+    factorization = StiffnessFactorization(model)
+    if LOW_RANK_UPDATE:
+        cache[key] = factorization
+        cache.move_to_end(key)
+        while len(cache) > FACTORIZATION_CACHE_SIZE:
+            cache.popitem(last=False)
+    return factorization
+
+
+def get_factorization_cache():
+    """
+    This function is used to obtain the factorization cache of the current thread. The cached factorizations are never
+    shared between threads, so that one thread cannot update a factorization while another thread solves with it.
+    :return: an ordered dictionary (key: building UID, value: a class defined as StiffnessFactorization)
+    """
+    cache = getattr(FACTORIZATION_CACHE, 'cache', None)
+    if cache is None:
+        cache = collections.OrderedDict()
+        FACTORIZATION_CACHE.cache = cache
+    return cache
+
+
+# #########################################################################
+#             Define a class to assemble and solve the frame model        #
+# #########################################################################
+
+class FrameModel(object):
+    """
+    This class assembles the 2D elastic frame model used for elastic analysis. It includes the following methods:
+    (1) number the free degrees of freedom (DOFs)
+    (2) define beam, column, and leaning column elements
+    (3) assign section properties based on the member sizes
+    (4) assemble the global stiffness matrix and the P-Delta geometric forces
+    (5) form the load vector for a given load type
+    (6) solve all load cases with one factorization and recover story drifts and element end forces
+    (7) condense the model to one lateral DOF per floor (lateral stiffness and lumped floor masses)
+    (8) solve the eigen value problem and story drifts using the condensed model
+    (9) compute the sensitivities of story drifts and period with respect to section properties
+
+    DOF numbering:
+    All nodes at the same floor level share one lateral DOF (equalDOF in "DefineFloorConstraint2DModel.tcl").
+    Each frame node above the ground has its own vertical and rotational DOFs.
+    Each leaning column node above the ground has its own vertical DOF. The rotations at the ends of leaning column
+    elements are released because the rotational springs (K = 1e-9) carry no moment.
+    The rigid truss between frame and leaning column is not modeled since equalDOF already ties both lateral DOFs.
+    """
+
+    def __init__(self, building):
+        """
+        This function initializes the DOFs, elements, and section properties of the frame model.
+        :param building: a class defined in "building_information.py" file
+        """
+        self.UID = building.UID
+        self.number_of_story = building.geometry['number of story']
+        self.number_of_bay = building.geometry['number of X bay']
+        self.bay_width = building.geometry['X bay width'] * 12
+        self.floor_height = np.array(building.geometry['floor height'], dtype=float).flatten() * 12
+        self.story_height = np.diff(self.floor_height)
+
+        self.number_of_dof = 0
+        self.element_dof = None
+        self.element_length = None
+        self.element_cosine = None
+        self.element_sine = None
+        self.element_area = None
+        self.element_inertia = None
+        self.element_pdelta = None
+        self.beam_index = None
+        self.column_index = None
+        self.leaning_column_index = None
+
+        self.define_dof()
+        self.define_element()
+        self.assign_section_property(building.member_size)
+
+    def lateral_dof(self, level):
+        # Return the lateral DOF shared by all nodes at one floor level (level = 1 is ground)
+        return level - 2 if level >= 2 else -1
+
+    def frame_node_dof(self, column, level):
+        # Return the [X, Y, RotZ] DOFs of frame node "column level 1" (-1 denotes fixed DOF)
+        if level < 2:
+            return [-1, -1, -1]
+        vertical = self.number_of_story + 2*((level-2)*(self.number_of_bay+1) + (column-1))
+        return [self.lateral_dof(level), vertical, vertical + 1]
+
+    def leaning_node_dof(self, level):
+        # Return the [X, Y, RotZ] DOFs of leaning column node (rotation is released, thus marked as -1)
+        if level < 2:
+            return [-1, -1, -1]
+        vertical = self.number_of_story + 2*self.number_of_story*(self.number_of_bay+1) + (level-2)
+        return [self.lateral_dof(level), vertical, -1]
+
+    def define_dof(self):
+        # Lateral DOF per floor + vertical/rotation per frame node + vertical per leaning column node
+        self.number_of_dof = self.number_of_story * (2*(self.number_of_bay+1) + 2)
+
+    def define_element(self):
+        """
+        This method is used to define the element connectivity and geometry. Element order: beams, columns, and
+        leaning columns. The index of each element is stored in arrays with the same layout as the recorders.
+        """
+        element_dof = []
+        length = []
+        cosine = []
+        sine = []
+        pdelta = []
+        # Beams (Linear transformation): floor level 2 to roof, bay 1 to number of bays
+        self.beam_index = np.zeros([self.number_of_story, self.number_of_bay], dtype=int)
+        for i in range(2, self.number_of_story+2):
+            for j in range(1, self.number_of_bay+1):
+                self.beam_index[i-2, j-1] = len(element_dof)
+                element_dof.append(self.frame_node_dof(j, i) + self.frame_node_dof(j+1, i))
+                length.append(self.bay_width)
+                cosine.append(1.0)
+                sine.append(0.0)
+                pdelta.append(False)
+        # Columns (PDelta transformation): story 1 to top story, column 1 to number of bays + 1
+        self.column_index = np.zeros([self.number_of_story, self.number_of_bay+1], dtype=int)
+        for i in range(1, self.number_of_story+1):
+            for j in range(1, self.number_of_bay+2):
+                self.column_index[i-1, j-1] = len(element_dof)
+                element_dof.append(self.frame_node_dof(j, i) + self.frame_node_dof(j, i+1))
+                length.append(self.story_height[i-1])
+                cosine.append(0.0)
+                sine.append(1.0)
+                pdelta.append(True)
+        # Leaning columns (PDelta transformation, pinned at both ends)
+        self.leaning_column_index = np.zeros(self.number_of_story, dtype=int)
+        for i in range(1, self.number_of_story+1):
+            self.leaning_column_index[i-1] = len(element_dof)
+            element_dof.append(self.leaning_node_dof(i) + self.leaning_node_dof(i+1))
+            length.append(self.story_height[i-1])
+            cosine.append(0.0)
+            sine.append(1.0)
+            pdelta.append(True)
+        self.element_dof = np.array(element_dof, dtype=int)
+        self.element_length = np.array(length)
+        self.element_cosine = np.array(cosine)
+        self.element_sine = np.array(sine)
+        self.element_pdelta = np.array(pdelta)
+
+    def assign_section_property(self, member_size):
+        """
+        This method is used to assign the area and moment of inertia of each element based on member sizes.
+        :param member_size: a dictionary which includes the sizes of interior columns, exterior columns, and beams.
+        :return: update self.element_area and self.element_inertia
+        """
+        number_of_element = len(self.element_length)
+        self.element_area = np.zeros(number_of_element)
+        self.element_inertia = np.zeros(number_of_element)
+        # Search each distinct size only once
+        section_property = {}
+        for size in set(member_size['beam'] + member_size['interior column'] + member_size['exterior column']):
+            section = search_section_property(size, SECTION_DATABASE)
+            section_property[size] = (section['A'], section['Ix'])
+        for story in range(self.number_of_story):
+            area, inertia = section_property[member_size['beam'][story]]
+            self.element_area[self.beam_index[story, :]] = area
+            self.element_inertia[self.beam_index[story, :]] = inertia
+            for column in range(self.number_of_bay+1):
+                if 0 < column < self.number_of_bay:
+                    area, inertia = section_property[member_size['interior column'][story]]
+                else:
+                    area, inertia = section_property[member_size['exterior column'][story]]
+                self.element_area[self.column_index[story, column]] = area
+                self.element_inertia[self.column_index[story, column]] = inertia
+        # Leaning column: rigid axially, no flexural stiffness due to pinned ends
+        self.element_area[self.leaning_column_index] = AREA_RIGID
+        self.element_inertia[self.leaning_column_index] = 0.0
+
+    def transformation_matrix(self):
+        # Global to local transformation matrix for all elements: [number of element, 6, 6]
+        number_of_element = len(self.element_length)
+        transformation = np.zeros([number_of_element, 6, 6])
+        for node in [0, 3]:
+            transformation[:, node, node] = self.element_cosine
+            transformation[:, node, node+1] = self.element_sine
+            transformation[:, node+1, node] = -self.element_sine
+            transformation[:, node+1, node+1] = self.element_cosine
+            transformation[:, node+2, node+2] = 1.0
+        return transformation
+
+    def element_stiffness(self, area=None, inertia=None):
+        """
+        This method is used to compute the elastic element stiffness matrices in global coordinates.
+        :param area: an array of element areas. None means self.element_area is used.
+        :param inertia: an array of element moments of inertia. None means self.element_inertia is used.
+        :return: an array with dimension of [number of element, 6, 6]
+        """
+        if area is None:
+            area = self.element_area
+        if inertia is None:
+            inertia = self.element_inertia
+        L = self.element_length
+        EA = ELASTIC_MODULUS * area / L
+        EI = ELASTIC_MODULUS * inertia
+        local = np.zeros([len(L), 6, 6])
+        local[:, 0, 0] = local[:, 3, 3] = EA
+        local[:, 0, 3] = local[:, 3, 0] = -EA
+        local[:, 1, 1] = local[:, 4, 4] = 12*EI/L**3
+        local[:, 1, 4] = local[:, 4, 1] = -12*EI/L**3
+        local[:, 1, 2] = local[:, 2, 1] = local[:, 1, 5] = local[:, 5, 1] = 6*EI/L**2
+        local[:, 2, 4] = local[:, 4, 2] = local[:, 4, 5] = local[:, 5, 4] = -6*EI/L**2
+        local[:, 2, 2] = local[:, 5, 5] = 4*EI/L
+        local[:, 2, 5] = local[:, 5, 2] = 2*EI/L
+        transformation = self.transformation_matrix()
+        return np.einsum('eji,ejk,ekl->eil', transformation, local, transformation)
+
+    def assemble(self, element_matrix):
+        """
+        This method is used to assemble element matrices into the global matrix.
+        :param element_matrix: an array with dimension of [number of element, 6, 6]
+        :return: a dense array with dimension of [number of DOF, number of DOF]
+        """
+        n = self.number_of_dof
+        # Fixed DOFs are scattered into an extra row/column which is discarded afterwards
+        dof = np.where(self.element_dof < 0, n, self.element_dof)
+        rows = np.broadcast_to(dof[:, :, np.newaxis], element_matrix.shape)
+        columns = np.broadcast_to(dof[:, np.newaxis, :], element_matrix.shape)
+        matrix = np.zeros([n+1, n+1])
+        np.add.at(matrix, (rows, columns), element_matrix)
+        return matrix[:n, :n]
+
+    def assemble_force(self, element_force):
+        """
+        This method is used to assemble element end forces into the global force vectors.
+        :param element_force: an array with dimension of [number of element, 6, number of load case]
+        :return: an array with dimension of [number of DOF, number of load case]
+        """
+        dof = np.where(self.element_dof < 0, self.number_of_dof, self.element_dof)
+        force = np.zeros([self.number_of_dof+1, element_force.shape[-1]])
+        np.add.at(force, dof, element_force)
+        return force[:-1]
+
+    def element_displacement(self, displacement):
+        # Extract the global end displacements of each element: [number of element, 6, number of load case]
+        padded = np.vstack([displacement, np.zeros([1, displacement.shape[1]])])
+        return padded[np.where(self.element_dof < 0, self.number_of_dof, self.element_dof)]
+
+    def element_axial_force(self, displacement):
+        # Axial force (tension positive) of each element based on the axial deformation
+        local = np.einsum('eij,ejc->eic', self.transformation_matrix(), self.element_displacement(displacement))
+        return (ELASTIC_MODULUS * self.element_area / self.element_length)[:, np.newaxis] \
+            * (local[:, 3, :] - local[:, 0, :])
+
+    def geometric_force(self, displacement, axial_force):
+        """
+        This method is used to compute the element end forces due to the P-Delta geometric stiffness
+        (N/L on the transverse translations in local coordinates).
+        :param displacement: an array of nodal displacements with dimension of [number of DOF, number of load case]
+        :param axial_force: an array of element axial forces with dimension of [number of element, number of load case]
+        :return: an array with dimension of [number of element, 6, number of load case] in global coordinates
+        """
+        transformation = self.transformation_matrix()
+        local_displacement = np.einsum('eij,ejc->eic', transformation, self.element_displacement(displacement))
+        geometric = np.where(self.element_pdelta[:, np.newaxis], axial_force / self.element_length[:, np.newaxis],
+                             0.0)
+        local_force = np.zeros(local_displacement.shape)
+        local_force[:, 1, :] = geometric * (local_displacement[:, 1, :] - local_displacement[:, 4, :])
+        local_force[:, 4, :] = -local_force[:, 1, :]
+        return np.einsum('eji,ejc->eic', transformation, local_force)
+
+    def form_load(self, building, load_type):
+        """
+        This method is used to form the load vector for a given load type. The load values are identical to those
+        written in the "Define*Loads2DModel.tcl" files.
+        :param building: a class defined in "building_information.py" file
+        :param load_type: a string which is one of LOAD_TYPE
+        :return: load: nodal load vector including equivalent nodal loads of beam uniform loads
+                 fixed_end_force: an array [number of element, 6] of fixed end forces in global coordinates
+        """
+        # Determine the gravity load factors and lateral story forces for each load type
+        if load_type == 'DeadLoad':
+            dead_factor, live_factor, lateral_force = 1.0, 0.0, np.zeros(self.number_of_story)
+        elif load_type == 'LiveLoad':
+            dead_factor, live_factor, lateral_force = 0.0, 1.0, np.zeros(self.number_of_story)
+        elif load_type == 'EarthquakeLoad':
+            dead_factor, live_factor = 0.0, 0.0
+            lateral_force = np.array(building.seismic_force_for_strength['lateral story force'])
+        elif load_type == 'GravityEarthquake':
+            dead_factor, live_factor = 1.2 + 0.2*building.elf_parameters['SDS'], 0.5
+            lateral_force = np.array(building.seismic_force_for_drift['lateral story force'])
+        lateral_force = lateral_force / building.geometry['number of X LFRS'] * ACCIDENTAL_TORSION
+
+        load = np.zeros(self.number_of_dof)
+        fixed_end_force = np.zeros([len(self.element_length), 6])
+        for i in range(2, self.number_of_story+2):
+            # Be cautious: convert the unit from lb/ft to kip/inch
+            beam_load = (dead_factor*building.gravity_loads['beam dead load'][i-2]
+                         + live_factor*building.gravity_loads['beam live load'][i-2]) * 0.001/12
+            # Fixed end forces of a downward uniform load on horizontal beams
+            L = self.element_length[self.beam_index[i-2, :]]
+            fixed_end_force[self.beam_index[i-2, :], 1] = beam_load*L/2
+            fixed_end_force[self.beam_index[i-2, :], 2] = beam_load*L**2/12
+            fixed_end_force[self.beam_index[i-2, :], 4] = beam_load*L/2
+            fixed_end_force[self.beam_index[i-2, :], 5] = -beam_load*L**2/12
+            # Point loads on leaning column
+            leaning_load = dead_factor*building.gravity_loads['leaning column dead load'][i-2] \
+                + live_factor*building.gravity_loads['leaning column live load'][i-2]
+            load[self.leaning_node_dof(i)[1]] -= leaning_load
+            # Lateral load is applied on node "1 i 1"
+            load[self.lateral_dof(i)] += lateral_force[i-2]
+        # Equivalent nodal loads are the fixed end forces with opposite sign
+        load -= self.assemble_force(fixed_end_force[:, :, np.newaxis])[:, 0]
+        return load, fixed_end_force
+
+    def form_loads(self, building, load_types):
+        """
+        This method is used to form the load vectors of several load types.
+        :param building: a class defined in "building_information.py" file
+        :param load_types: a list of strings, each of them is one of LOAD_TYPE
+        :return: load: an array with dimension of [number of DOF, number of load case]
+                 fixed_end_force: an array with dimension of [number of element, 6, number of load case]
+        """
+        load = np.zeros([self.number_of_dof, len(load_types)])
+        fixed_end_force = np.zeros([len(self.element_length), 6, len(load_types)])
+        for case, load_type in enumerate(load_types):
+            load[:, case], fixed_end_force[:, :, case] = self.form_load(building, load_type)
+        return load, fixed_end_force
+
+    def solve(self, load):
+        """
+        This method is used to solve all load cases with P-Delta effect using a single factorization.
+        The elastic stiffness is factorized once and all load vectors are solved together. The P-Delta effect is
+        included by moving the geometric stiffness term to the right-hand side and updating the axial forces
+        iteratively until the displacements converge (identical to the converged Newton solution in OpenSees).
+        :param load: an array of nodal load vectors with dimension of [number of DOF, number of load case]
+        :return: displacement: an array with dimension of [number of DOF, number of load case]
+                 axial_force: an array of element axial forces with dimension of [number of element, number of case]
+        """
+        factorization = factorize_stiffness(self, self.UID)
+        displacement = factorization.solve(load)
+        for iteration in range(MAXIMUM_PDELTA_ITERATION):
+            axial_force = self.element_axial_force(displacement)
+            residual = load - self.assemble_force(self.geometric_force(displacement, axial_force))
+            new_displacement = factorization.solve(residual)
+            converged = np.all(np.linalg.norm(new_displacement - displacement, axis=0)
+                               <= PDELTA_TOLERANCE * np.linalg.norm(new_displacement, axis=0))
+            displacement = new_displacement
+            if converged:
+                break
+        return displacement, self.element_axial_force(displacement)
+
+    def recover_response(self, displacement, axial_force, fixed_end_force):
+        """
+        This method is used to compute story drifts and element end forces from the nodal displacements.
+        :param displacement: an array with dimension of [number of DOF, number of load case]
+        :param axial_force: element axial forces used in the geometric stiffness
+        :param fixed_end_force: fixed end forces with dimension of [number of element, 6, number of load case]
+        :return: a list of dictionaries (one per load case) which have the same quantities as the OpenSees recorders:
+                 'story drift': [story*1] array
+                 'column force': [story*((bay+1)*6)] array of global end forces of columns in each story
+                 'beam force': [story*(bay*6)] array of global end forces of beams at each floor level
+        """
+        # Global end forces of elements (including P-Delta shear and fixed end forces)
+        element_force = np.einsum('eij,ejc->eic', self.element_stiffness(), self.element_displacement(displacement)) \
+            + self.geometric_force(displacement, axial_force) + fixed_end_force
+        # Story drift is computed using the lateral displacement of column #1
+        floor_displacement = np.vstack([np.zeros([1, displacement.shape[1]]), displacement[:self.number_of_story]])
+        story_drift = np.diff(floor_displacement, axis=0) / self.story_height[:, np.newaxis]
+        response = []
+        for case in range(displacement.shape[1]):
+            response.append({'story drift': story_drift[:, [case]],
+                             'column force': element_force[self.column_index, :, case].reshape(
+                                 self.number_of_story, -1),
+                             'beam force': element_force[self.beam_index, :, case].reshape(
+                                 self.number_of_story, -1)})
+        return response
+
+    def analyze(self, building, load_types):
+        """
+        This method is used to perform the static analysis for several load types together.
+        :param building: a class defined in "building_information.py" file
+        :param load_types: a list of strings, each of them is one of LOAD_TYPE
+        :return: a dictionary whose keys are load types and values are the response dictionaries
+        """
+        load, fixed_end_force = self.form_loads(building, load_types)
+        displacement, axial_force = self.solve(load)
+        response = self.recover_response(displacement, axial_force, fixed_end_force)
+        return dict(zip(load_types, response))
+
+    def condensed_model(self, building):
+        """
+        This method is used to statically condense the frame and leaning column model to one lateral DOF per floor.
+        The condensed stiffness is the inverse of the lateral flexibility, which is obtained using the
+        (possibly low-rank updated) factorized stiffness.
+        :param building: a class defined in "building_information.py" file
+        :return: stiffness: a [story*story] array which is the lateral stiffness matrix
+                 mass: an array which includes the lateral mass of each floor level
+                 lateral_solution: a [DOF*story] array of displacements under unit lateral floor loads, which is used
+                                   to condense a load vector F: condensed load = stiffness * lateral_solution^T * F
+        """
+        n = self.number_of_story
+        unit_load = np.zeros([self.number_of_dof, n])
+        unit_load[np.arange(n), np.arange(n)] = 1.0
+        lateral_solution = factorize_stiffness(self, self.UID).solve(unit_load)
+        stiffness = np.linalg.inv(lateral_solution[:n, :])
+        return (stiffness + stiffness.T) / 2, self.lumped_mass(building), lateral_solution
+
+    def condensed_drift(self, building, load_type='GravityEarthquake'):
+        """
+        This method is used to compute story drifts using the condensed lateral model.
+        The P-Delta effect is included using the story geometric stiffness: -(total gravity load above)/(story height).
+        Since all columns in a story share the same lateral DOFs, this gives the same drifts as the full model.
+        :param building: a class defined in "building_information.py" file
+        :param load_type: a string which is one of LOAD_TYPE
+        :return: an [story*1] array which includes the story drifts for each story.
+        """
+        n = self.number_of_story
+        stiffness, mass, lateral_solution = self.condensed_model(building)
+        load, fixed_end_force = self.form_load(building, load_type)
+        condensed_load = stiffness @ (lateral_solution.T @ load)
+        # Gravity load at each floor level is the sum of vertical loads on frame and leaning column nodes
+        floor_gravity = np.zeros(n)
+        for i in range(2, n+2):
+            vertical_dof = [self.frame_node_dof(j, i)[1] for j in range(1, self.number_of_bay+2)]
+            vertical_dof.append(self.leaning_node_dof(i)[1])
+            floor_gravity[i-2] = -np.sum(load[vertical_dof])
+        story_gravity = np.cumsum(floor_gravity[::-1])[::-1]
+        # Story geometric stiffness
+        geometric_stiffness = np.zeros([n+1, n+1])
+        for story in range(n):
+            k = -story_gravity[story] / self.story_height[story]
+            geometric_stiffness[story:story+2, story:story+2] += k * np.array([[1.0, -1.0], [-1.0, 1.0]])
+        floor_displacement = np.append(0.0, np.linalg.solve(stiffness + geometric_stiffness[1:, 1:], condensed_load))
+        return (np.diff(floor_displacement) / self.story_height).reshape(-1, 1)
+
+    def member_group(self):
+        """
+        This method is used to find the elements of each member group in building.member_size.
+        :return: a dictionary whose keys are 'beam', 'interior column', and 'exterior column'.
+                 Each value is a list (one per story) of arrays of element indices.
+        """
+        group = {'beam': [], 'interior column': [], 'exterior column': []}
+        for story in range(self.number_of_story):
+            group['beam'].append(self.beam_index[story, :])
+            group['interior column'].append(self.column_index[story, 1:self.number_of_bay])
+            group['exterior column'].append(self.column_index[story, [0, self.number_of_bay]])
+        return group
+
+    def design_sensitivity(self, building):
+        """
+        This method is used to compute the sensitivities of story drifts (under GravityEarthquake loads) and the first
+        mode period with respect to the moment of inertia (Ix) and area (A) of each member group.
+        Adjoint method is used for story drifts: d(drift)/dp = -lambda^T * dK/dp * u, where K * lambda = d(drift)/du.
+        Since all columns in a story share the same lateral DOFs, the P-Delta geometric stiffness only depends on the
+        total gravity load of each story and does not change with section properties.
+        The period sensitivity is computed using the mode shape: d(omega^2)/dp = phi^T * dK/dp * phi / (phi^T*M*phi).
+        :param building: a class defined in "building_information.py" file
+        :return: a dictionary with keys 'story drift' and 'period'
+                 sensitivity['story drift'][member][quantity]: a [story*story] array, the entry [i, j] is
+                 the derivative of story drift i with respect to the quantity (Ix or A) of the member in story j
+                 sensitivity['period'][member][quantity]: an array, the entry j is the derivative of the period
+                 with respect to the quantity of the member in story j
+                 member: 'beam', 'interior column', or 'exterior column'; quantity: 'Ix' or 'A' (unit: inch)
+        """
+        n = self.number_of_story
+        stiffness, mass, lateral_solution = self.condensed_model(building)
+        # Displacements under GravityEarthquake loads (including P-Delta effect)
+        load, fixed_end_force = self.form_loads(building, ['GravityEarthquake'])
+        displacement, axial_force = self.solve(load)
+        # Story geometric stiffness on the lateral DOFs (total axial force of each story)
+        story_axial_force = np.array([np.sum(axial_force[np.append(self.column_index[story, :],
+                                                                   self.leaning_column_index[story]), 0])
+                                      for story in range(n)])
+        geometric_stiffness = np.zeros([n+1, n+1])
+        for story in range(n):
+            k = story_axial_force[story] / self.story_height[story]
+            geometric_stiffness[story:story+2, story:story+2] += k * np.array([[1.0, -1.0], [-1.0, 1.0]])
+        # Adjoint solutions: K * lambda = d(drift)/du, with loads only on lateral DOFs
+        drift_operator = (np.eye(n) - np.eye(n, k=-1)) / self.story_height[:, np.newaxis]
+        adjoint = lateral_solution @ stiffness @ np.linalg.solve(stiffness + geometric_stiffness[1:, 1:],
+                                                                 drift_operator.T)
+        # First mode shape of the condensed model and its full displacement vector
+        eigen_value, eigen_vector = scipy.linalg.eigh(stiffness, np.diag(mass), subset_by_index=[0, 0])
+        mode_shape = lateral_solution @ (stiffness @ eigen_vector)
+        modal_mass = eigen_vector[:, 0] @ (mass * eigen_vector[:, 0])
+        period = 2*np.pi/np.sqrt(eigen_value[0])
+        # Element stiffness derivatives with respect to unit A and unit Ix
+        number_of_element = len(self.element_length)
+        derivative = {'A': self.element_stiffness(np.ones(number_of_element), np.zeros(number_of_element)),
+                      'Ix': self.element_stiffness(np.zeros(number_of_element), np.ones(number_of_element))}
+        element_displacement = self.element_displacement(displacement)[:, :, 0]
+        element_adjoint = self.element_displacement(adjoint)
+        element_mode = self.element_displacement(mode_shape)[:, :, 0]
+        sensitivity = {'story drift': {}, 'period': {}}
+        for member, group in self.member_group().items():
+            sensitivity['story drift'][member] = {}
+            sensitivity['period'][member] = {}
+            for quantity in ['Ix', 'A']:
+                drift_sensitivity = np.zeros([n, n])
+                period_sensitivity = np.zeros(n)
+                for story in range(n):
+                    index = group[story]
+                    force = np.einsum('eij,ej->ei', derivative[quantity][index], element_displacement[index])
+                    drift_sensitivity[:, story] = -np.einsum('eis,ei->s', element_adjoint[index], force)
+                    modal_force = np.einsum('eij,ej->ei', derivative[quantity][index], element_mode[index])
+                    eigen_value_sensitivity = np.sum(element_mode[index] * modal_force) / modal_mass
+                    period_sensitivity[story] = -period / (2*eigen_value[0]) * eigen_value_sensitivity
+                sensitivity['story drift'][member][quantity] = drift_sensitivity
+                sensitivity['period'][member][quantity] = period_sensitivity
+        return sensitivity
+
+    def lumped_mass(self, building):
+        """
+        This method is used to compute the lateral mass of each floor, identical to "DefineMasses2DModel.tcl":
+        each frame node carries Floor weight * (1/number of LFRS) / (number of bay + 1) / g.
+        Masses along Y and RotZ are negligible and hence not included.
+        :param building: a class defined in "building_information.py" file
+        :return: an array which includes the lateral mass of each floor level (level 2 to roof)
+        """
+        floor_weight = np.array(building.gravity_loads['floor weight'], dtype=float)
+        nodal_mass = floor_weight / building.geometry['number of X LFRS'] / (self.number_of_bay+1) / GRAVITY
+        return nodal_mass * (self.number_of_bay+1)
+
+    def modal_period(self, building):
+        """
+        This method is used to compute the first mode period, identical to "EigenValueAnalysis.tcl".
+        The eigen value analysis is performed before any load is applied, thus no geometric stiffness is included.
+        :param building: a class defined in "building_information.py" file
+        :return: an array which includes the first mode period
+        """
+        stiffness, mass, lateral_solution = self.condensed_model(building)
+        if self.number_of_story > LANCZOS_STORY_THRESHOLD:
+            # Shift-invert Lanczos iteration around zero to find the smallest eigen value
+            eigen_value = scipy.sparse.linalg.eigsh(stiffness, k=1, M=np.diag(mass), sigma=0.0,
+                                                    which='LM', return_eigenvectors=False)
+        else:
+            eigen_value = scipy.linalg.eigh(stiffness, np.diag(mass), eigvals_only=True, subset_by_index=[0, 0])
+        return 2*np.pi/np.sqrt(eigen_value)
+
+
+# #########################################################################
+#          Define a class to perform elastic analysis in-process          #
+# #########################################################################
+
+class NativeElasticAnalysis(object):
+    """
+    This class performs the elastic analysis without generating .tcl files or running OpenSees.
+    It has the same interface as the class defined in "elastic_analysis.py" and includes the following steps:
+    (1) assemble the frame model using FrameModel class
+    (2) compute the modal period when for_period_only (or update_seismic_force) is True, and/or
+        analyze the model under all load types (or GravityEarthquake only when for_drift_only is True)
+    (3) store period, story drifts and element forces in building.analysis_results, which are then used by
+        building.read_modal_period, building.read_story_drift and ElasticOutput instead of the output files
+    """
+
+    def __init__(self, building, for_drift_only=False, for_period_only=False, update_seismic_force=False):
+        """
+        This function is used to perform the elastic analysis and store the results.
+        :param building: a class defined in "building_information.py" file
+        :param for_drift_only: a boolean variable.
+                               True means we only perform the elastic analysis under GravityEarthquake loads.
+                               Otherwise, all load types (dead, live, earthquake) will be considered.
+        :param for_period_only: a boolean variable.
+                                True means we only perform the eigen value analysis to obtain the period
+                                Otherwise, all load types will be considered.
+        :param update_seismic_force: a boolean variable.
+                                     True means the modal period is computed first and the seismic forces are
+                                     updated before the load cases are analyzed.
+                                     False means the seismic forces stored in building are used.
+        """
+        self.model = FrameModel(building)
+        if for_period_only or update_seismic_force:
+            # Store the period and update the ELF parameters directly
+            period = self.model.modal_period(building)
+            building.analysis_results = {'EigenValue': {'period': period}}
+            building.elf_parameters['modal period'] = period[0]
+            if for_period_only:
+                return
+            building.compute_seismic_force()
+        load_types = analysis_load_types(for_drift_only)
+        # Remove the load results of previous analysis (keep the period)
+        for load_type in LOAD_TYPE:
+            building.analysis_results.pop(load_type, None)
+        # Story drifts alone can be obtained using the condensed lateral model
+        if for_drift_only and CONDENSED_DRIFT_MODEL:
+            building.analysis_results['GravityEarthquake'] = {'story drift': self.model.condensed_drift(building)}
+            return
+        # All load types are solved together with a single factorization
+        building.analysis_results.update(self.model.analyze(building, load_types))
+        # Construct the results under gravity and earthquake loads by superposition
+        if 'GravityEarthquake' not in load_types:
+            superpose_analysis_results(building)
+
+
+def analysis_load_types(for_drift_only=False):
+    """
+    This function is used to determine the load types solved by the native solver.
+    :param for_drift_only: a boolean variable. True means only GravityEarthquake load case is analyzed.
+    :return: a list of load types (GravityEarthquake is excluded if it is obtained by superposition)
+    """
+    if for_drift_only:
+        return ['GravityEarthquake']
+    elif SUPERPOSE_GRAVITY_EARTHQUAKE:
+        return ['DeadLoad', 'LiveLoad', 'EarthquakeLoad']
+    else:
+        return LOAD_TYPE
+
+
+def superpose_analysis_results(building):
+    """
+    This function is used to construct the results under gravity and earthquake loads by superposition of the dead,
+    live, and earthquake load results stored in building.analysis_results.
+    :param building: a class defined in "building_information.py" file
+    :return: update building.analysis_results['GravityEarthquake']
+    """
+    earthquake_factor = building.seismic_force_for_drift['base shear'] \
+        / building.seismic_force_for_strength['base shear']
+    results = building.analysis_results
+    results['GravityEarthquake'] = {}
+    for quantity in results['DeadLoad']:
+        results['GravityEarthquake'][quantity] = superpose_gravity_earthquake(
+            results['DeadLoad'][quantity], results['LiveLoad'][quantity], results['EarthquakeLoad'][quantity],
+            building.elf_parameters['SDS'], earthquake_factor)
+
+
+# #########################################################################
+#         Define a function to analyze a batch of buildings together      #
+# #########################################################################
+
+class FrameModelBatch(object):
+    """
+    This class stacks the frame models of many buildings with identical topology. It includes the following methods:
+    (1) stack the element properties and transformation matrices of all buildings (building axis first)
+    (2) compute the element axial forces and the P-Delta geometric forces of all buildings together
+    (3) assemble the element end forces of all buildings into the global force vectors together
+    (4) solve all load cases of all buildings with P-Delta effect using stacked matrix products
+    All arrays have the building as the first dimension, so the operations above are vectorized across the batch.
+    """
+    def __init__(self, model_list):
+        """
+        This function initializes the stacked properties of the frame models.
+        :param model_list: a list of classes defined as FrameModel. All models should have identical topology.
+        """
+        for model in model_list[1:]:
+            if not np.array_equal(model.element_dof, model_list[0].element_dof):
+                raise ValueError('buildings in a batch elastic analysis must have identical topology')
+        self.number_of_dof = model_list[0].number_of_dof
+        # Fixed DOFs are scattered into an extra row which is discarded afterwards
+        self.element_dof = np.where(model_list[0].element_dof < 0, self.number_of_dof, model_list[0].element_dof)
+        self.element_pdelta = model_list[0].element_pdelta
+        self.element_length = np.array([model.element_length for model in model_list])
+        self.axial_stiffness = np.array([ELASTIC_MODULUS * model.element_area / model.element_length
+                                         for model in model_list])
+        self.transformation = np.array([model.transformation_matrix() for model in model_list])
+        # Stack the elastic stiffness matrices: [number of building, number of DOF, number of DOF]
+        self.stiffness = np.array([model.assemble(model.element_stiffness()) for model in model_list])
+        self.inverse_factor = None
+
+    def factorize(self):
+        """
+        This method is used to factorize the stiffness matrices of all buildings using batched Cholesky decomposition.
+        The inverse of each lower triangular factor is computed once, so that each solution afterwards only requires
+        two stacked matrix products: K^-1 * b = L^-T * (L^-1 * b).
+        """
+        lower_factor = np.linalg.cholesky(self.stiffness)
+        identity = np.broadcast_to(np.eye(self.number_of_dof), lower_factor.shape)
+        self.inverse_factor = np.linalg.solve(lower_factor, identity)
+
+    def solve_linear(self, right_hand_side):
+        # Solve K * x = b for all buildings: [number of building, number of DOF, number of load case]
+        if self.inverse_factor is None:
+            self.factorize()
+        return np.matmul(np.transpose(self.inverse_factor, (0, 2, 1)), np.matmul(self.inverse_factor, right_hand_side))
+
+    def local_displacement(self, displacement):
+        # Local end displacements of each element: [number of building, number of element, 6, number of load case]
+        padded = np.concatenate([displacement, np.zeros([displacement.shape[0], 1, displacement.shape[2]])], axis=1)
+        return np.einsum('beij,bejc->beic', self.transformation, padded[:, self.element_dof])
+
+    def element_axial_force(self, displacement):
+        # Axial force (tension positive) of each element: [number of building, number of element, number of load case]
+        local = self.local_displacement(displacement)
+        return self.axial_stiffness[:, :, np.newaxis] * (local[:, :, 3, :] - local[:, :, 0, :])
+
+    def geometric_force(self, displacement, axial_force):
+        # Element end forces due to the P-Delta geometric stiffness in global coordinates (same as FrameModel)
+        local_displacement = self.local_displacement(displacement)
+        geometric = np.where(self.element_pdelta[np.newaxis, :, np.newaxis],
+                             axial_force / self.element_length[:, :, np.newaxis], 0.0)
+        local_force = np.zeros(local_displacement.shape)
+        local_force[:, :, 1, :] = geometric * (local_displacement[:, :, 1, :] - local_displacement[:, :, 4, :])
+        local_force[:, :, 4, :] = -local_force[:, :, 1, :]
+        return np.einsum('beji,bejc->beic', self.transformation, local_force)
+
+    def assemble_force(self, element_force):
+        # Assemble element end forces of all buildings: [number of building, number of DOF, number of load case]
+        force = np.zeros([element_force.shape[0], self.number_of_dof+1, element_force.shape[-1]])
+        np.add.at(force, (slice(None), self.element_dof), element_force)
+        return force[:, :-1]
+
+    def solve(self, load):
+        """
+        This method is used to solve all load cases of all buildings with P-Delta effect (same iteration as
+        FrameModel.solve). The residual of all buildings is assembled and solved together in each iteration.
+        :param load: an array with dimension of [number of building, number of DOF, number of load case]
+        :return: displacement: an array with dimension of [number of building, number of DOF, number of load case]
+                 axial_force: an array with dimension of [number of building, number of element, number of load case]
+        """
+        displacement = self.solve_linear(load)
+        for iteration in range(MAXIMUM_PDELTA_ITERATION):
+            axial_force = self.element_axial_force(displacement)
+            residual = load - self.assemble_force(self.geometric_force(displacement, axial_force))
+            new_displacement = self.solve_linear(residual)
+            converged = np.all(np.linalg.norm(new_displacement - displacement, axis=1)
+                               <= PDELTA_TOLERANCE * np.linalg.norm(new_displacement, axis=1))
+            displacement = new_displacement
+            if converged:
+                break
+        return displacement, self.element_axial_force(displacement)
+
+
+def batch_elastic_analysis(building_list, for_drift_only=False, for_period_only=False):
+    """
+    This function is used to perform the elastic analysis of many buildings with identical topology together.
+    The stiffness and mass matrices of all buildings are stacked and solved by batched numpy.linalg routines:
+    (1) assemble the frame model of each building and stack them (FrameModelBatch)
+    (2) solve the eigen value problem of all condensed models using batched eigh
+    (3) factorize the stiffness matrices of all buildings using batched Cholesky decomposition
+    (4) solve all load cases of all buildings together (with P-Delta iteration vectorized across the buildings)
+    (5) store the results in building.analysis_results of each building (same as NativeElasticAnalysis)
+    :param building_list: a list of classes defined in "building_information.py" file.
+                          All buildings should have the same number of stories and bays.
+    :param for_drift_only: a boolean variable.
+                           True means we only perform the elastic analysis under GravityEarthquake loads.
+                           Otherwise, all load types (dead, live, earthquake) will be considered.
+    :param for_period_only: a boolean variable.
+                            True means we only perform the eigen value analysis to obtain the period
+                            Otherwise, all load types will be considered.
+    :return: a list of dictionaries, which are the analysis_results of each building
+    """
+    model_list = [FrameModel(building) for building in building_list]
+    batch = FrameModelBatch(model_list)
+    number_of_dof = model_list[0].number_of_dof
+    number_of_story = model_list[0].number_of_story
+
+    if for_period_only:
+        # Condense the stiffness to lateral DOFs: inverse of the lateral flexibility
+        unit_load = np.zeros([number_of_dof, number_of_story])
+        unit_load[np.arange(number_of_story), np.arange(number_of_story)] = 1.0
+        unit_load = np.broadcast_to(unit_load, (len(model_list),) + unit_load.shape)
+        flexibility = np.linalg.solve(batch.stiffness, unit_load)[:, :number_of_story, :]
+        condensed_stiffness = np.linalg.inv(flexibility)
+        # Generalized eigen value problem with diagonal mass: M^-1/2 * K * M^-1/2
+        mass = np.array([model.lumped_mass(building) for model, building in zip(model_list, building_list)])
+        scale = 1.0 / np.sqrt(mass)
+        normalized = condensed_stiffness * scale[:, :, np.newaxis] * scale[:, np.newaxis, :]
+        eigen_value = np.linalg.eigvalsh((normalized + np.transpose(normalized, (0, 2, 1))) / 2)
+        period = 2*np.pi/np.sqrt(eigen_value[:, :1])
+        for building, building_period in zip(building_list, period):
+            building.analysis_results['EigenValue'] = {'period': building_period}
+            building.elf_parameters['modal period'] = building_period[0]
+        return [building.analysis_results for building in building_list]
+
+    load_types = analysis_load_types(for_drift_only)
+    load = []
+    fixed_end_force = []
+    for model, building in zip(model_list, building_list):
+        building_load, building_fixed_end_force = model.form_loads(building, load_types)
+        load.append(building_load)
+        fixed_end_force.append(building_fixed_end_force)
+    displacement, axial_force = batch.solve(np.array(load))
+    # Recover the drifts and member forces of each building
+    for model, building, building_displacement, building_axial_force, building_fixed_end_force \
+            in zip(model_list, building_list, displacement, axial_force, fixed_end_force):
+        response = model.recover_response(building_displacement, building_axial_force, building_fixed_end_force)
+        for load_type in LOAD_TYPE:
+            building.analysis_results.pop(load_type, None)
+        building.analysis_results.update(dict(zip(load_types, response)))
+        # Construct the results under gravity and earthquake loads by superposition
+        if 'GravityEarthquake' not in load_types:
+            superpose_analysis_results(building)
+    return [building.analysis_results for building in building_list]
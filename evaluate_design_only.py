@@ -7,12 +7,12 @@ Developed by GUAN, XINGQUAN @ UCLA, April 29 2021
 # Please add all the imported modules in the part below
 import copy
 import numpy as np
-import os
 import pandas as pd
 import pathlib
 
 from building_information import Building
-from elastic_analysis import ElasticAnalysis
+from analysis_backend import get_analysis_backend
+from global_variables import VERIFICATION_ANALYSIS_BACKEND
 from elastic_output import ElasticOutput
 from global_variables import steel
 from global_variables import DRIFT_LIMIT
@@ -29,7 +29,7 @@ from design_helper import save_all_design_results
 # The building folder name
 building_id = 'Evaluate_11'
 # The directory path where the AutoSDA is.
-base_directory = pathlib.Path(os.getcwd())
+base_directory = pathlib.Path(__file__).resolve().parent
 # Whether the connection is RBS connection: True-> use RBS connection
 ADOPT_RBS_CONNECTION = True
 # Whether the doubler plate is allowed to be used: True-> permit to use doubler plate.
@@ -46,26 +46,25 @@ PASS_ALL_CHECK = True
 building = Building(building_id, base_directory)
 
 # Assign the member sizes from given files
-os.chdir(building.directory['building data'])
-member_sizes = pd.read_csv('TrialMemberSize.csv', header=0)
+member_sizes = pd.read_csv(building.directory['building data'] / 'TrialMemberSize.csv', header=0)
 building.member_size['exterior column'] = list(member_sizes['exterior column'])
 building.member_size['interior column'] = list(member_sizes['interior column'])
 building.member_size['beam'] = list(member_sizes['beam'])
 building.construction_size = copy.deepcopy(building.member_size)
 
-# Perform the EigenValue Analysis only to obtain the period
-_ = ElasticAnalysis(building, for_drift_only=False, for_period_only=True)
+# Perform the EigenValue Analysis and the elastic analysis using seismic forces based on modal period and CuTa
+# The evaluation of a given design uses the verification backend
+get_analysis_backend(VERIFICATION_ANALYSIS_BACKEND).analyze(building, for_drift_only=False, for_period_only=False,
+                                                            update_seismic_force=True)
+# Synchronize the modal period and seismic story forces with those used in the analysis
 building.read_modal_period()
-
-# Compute the seismic story forces based on modal period and CuTa
 building.compute_seismic_force()
 
-# Create an elastic analysis model for building instance above using "ElasticAnalysis" class
-_ = ElasticAnalysis(building, for_drift_only=False, for_period_only=False)
-
 # Read elastic analysis drift and force demands
 building.read_story_drift()
 elastic_demand = ElasticOutput(building)
+# All elastic analysis results are extracted: remove the scratch folder (if any)
+building.cleanup()
 
 ##########################################################################
 #                         Check Story Drift                              #
@@ -163,11 +162,5 @@ print('All evaluation results are displayed')
 ##########################################################################
 
 if PASS_ALL_CHECK:
-    # Change the working directory to building data
-    os.chdir(building.directory['building data'])
-
-    # Save all design results.
+    # Save all design results into the folder of building data.
     save_all_design_results(building, column_set, beam_set, connection_set, True)
-
-# Go back to base directory
-os.chdir(base_directory)
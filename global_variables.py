@@ -21,7 +21,8 @@ from steel_material import SteelMaterial
 steel = SteelMaterial(yield_stress=50, ultimate_stress=65, elastic_modulus=29000, Ry_value=1.1)  # Unit: ksi
 
 # Define path to where ElasticAnalysis tool base directory
-base_directory = pathlib.Path(os.getcwd())
+# It is the folder of this file such that the tool does not depend on the working directory of the process
+base_directory = pathlib.Path(__file__).resolve().parent
 
 
 ##########################################################################
@@ -48,6 +49,46 @@ IDENTICAL_SIZE_PER_STORY = 2
 # When SCWB is not satisfied, we need to use ratio to determine whether we should upscale upper column or lower column.
 UPPER_LOWER_COLUMN_Zx = 0.5
 
+# Define a boolean variable to determine how a member is upscaled when its strength (or SCWB) is not sufficient
+# True -> the required section properties are estimated from the demand to capacity ratios and the member jumps
+#         directly to the smallest candidate that satisfies them
+# False -> the member size is increased one step upward in the candidate list
+CAPACITY_TARGETED_SIZING = False
+
+# Define the margin applied on the required section properties in capacity-targeted sizing
+# A margin larger than 1.0 accounts for the demands attracted by the larger member
+CAPACITY_MARGIN = 1.05
+
+# Define a boolean variable to determine how the members failing the strength (or connection) checks are repaired
+# True -> all failing members are upscaled together in one round and the building is re-analyzed once per round.
+#         The rounds are repeated until all members are feasible.
+# False -> the members are upscaled one at a time and the building is re-analyzed after each upscale
+ROUND_BASED_REPAIR = False
+
+# Define the maximum number of rounds in round-based repair
+MAXIMUM_REPAIR_ROUND = 50
+
+# Define the maximum number of elastic analyses in each phase of the seismic design (see "seismic_design.py")
+# None means no limit. The design of the building is terminated (without exiting the program) once the budget of any
+# phase is exhausted, which caps the runtime of a batch of designs.
+ANALYSIS_BUDGET = {'drift optimization': None,
+                   'member strength': None,
+                   'connection': None,
+                   'construction connection': None,
+                   'construction verification': None,
+                   'optimal verification': None}
+
+# Define a boolean variable to determine how the column, beam, and connection objects are updated after each analysis
+# True -> a column (or beam) is re-created only if its size changes or its demands change beyond REBUILD_TOLERANCE,
+#         and a connection is re-created only if any column (or beam) connected to it is re-created
+# False -> all objects are re-created after each analysis
+INCREMENTAL_REBUILD = False
+
+# Define the relative change of demands regarded as unchanged in incremental rebuild
+# A member is only reused if each of its demands changes within this ratio (its checks are repeated using the current
+# demands), and the connections next to it are reused together with it
+REBUILD_TOLERANCE = 0.01
+
 # Define a coefficient that describes the accidental torsion
 # Imagine two special moment frames are symmetrically placed at the building perimeter
 # and the floor plan of the building is a regular shape (rectangle)
@@ -67,6 +108,14 @@ ACCIDENTAL_TORSION = 0.55/0.50
 # Please note this period is only for computing drift, not for computing required strength.
 PERIOD_FOR_DRIFT_LIMIT = True
 
+# Define a string to determine how the member sizes are reduced to approach the drift limit
+# 'linear' -> the interior column in the story with the smallest drift is decreased one step at a time until the
+#             drift limit is exceeded, then the last compliant sizes are restored
+# 'uniform' -> the interior columns in all stories are decreased by the same number of steps in the candidate lists,
+#              where the number of steps is determined using bisection
+# 'story' -> the 'uniform' bisection is followed by a bisection on each story (starting from the smallest drift)
+DRIFT_OPTIMIZATION = 'linear'
+
 # Define a scalar to denote the drift limit which is based on ASCE 7-16 Table 12.12-1
 DRIFT_LIMIT = 0.020
 
@@ -83,6 +132,106 @@ STRONG_COLUMN_WEAK_BEAM_RATIO = 1.0
 
 RBS_STIFFNESS_FACTOR = 1.10
 
+
+##########################################################################
+#                 User Defined Elastic Analysis Backend                  #
+##########################################################################
+
+# Variables defined in this section is used in "seismic_design.py" and "evaluate_design_only.py" files.
+
+# Define the program used to perform the elastic analysis (analysis_backend.py)
+# 'OpenSees' -> write .tcl files and run OpenSees (elastic_analysis.py)
+# 'Native' -> solve the same frame model in-process using NumPy/SciPy (elastic_solver.py)
+# 'StandIn' -> approximate the frame using portal method and shear building model (deterministic, for testing)
+# 'Replay' -> replay the OpenSees results recorded in ANALYSIS_CACHE_DIRECTORY (no analysis is performed)
+ELASTIC_ANALYSIS_BACKEND = 'OpenSees'
+
+# Define the backends used in different phases of the seismic design. None means ELASTIC_ANALYSIS_BACKEND is used.
+# DESIGN_ANALYSIS_BACKEND -> analyses in the optimization loops (drift, strength, and connection checks)
+# VERIFICATION_ANALYSIS_BACKEND -> final analyses of the optimal and construction designs, and evaluation of a design
+# For example, 'Native' can be used for the design and 'OpenSees' for the verification.
+DESIGN_ANALYSIS_BACKEND = None
+VERIFICATION_ANALYSIS_BACKEND = None
+
+# Define a boolean variable to determine whether the drift-only analysis uses the condensed lateral model
+# (one lateral DOF per floor) in the native backend. Member forces are not available from the condensed model,
+# thus the full model is always used when all load types are analyzed.
+CONDENSED_DRIFT_MODEL = True
+
+# Define a boolean variable to determine whether the native backend reuses the factorized stiffness of previous design
+# True -> update the previous factorization with Sherman-Morrison-Woodbury formula when only a few elements change
+# False -> always factorize the stiffness from scratch
+LOW_RANK_UPDATE = True
+
+# Define the ratio of changed DOFs to total DOFs beyond which the stiffness is factorized from scratch
+# (only used when LOW_RANK_UPDATE is True)
+LOW_RANK_DOF_RATIO = 0.25
+
+# Define the number of buildings whose factorized stiffness is kept in memory by the native backend
+FACTORIZATION_CACHE_SIZE = 16
+
+# Define a boolean variable to determine whether the GravityEarthquake load case is obtained by superposition
+# True -> when all load types are analyzed, story drifts and member forces under GravityEarthquake loads are
+#         combined from dead, live, and earthquake load cases. The separate analysis is skipped.
+#         Please note the P-Delta interaction between gravity loads and lateral displacements is neglected.
+# False -> GravityEarthquake load case is analyzed separately
+SUPERPOSE_GRAVITY_EARTHQUAKE = False
+
+# Define a boolean variable to determine whether the elastic analysis results are cached (analysis_cache.py)
+# The results recorded on disk by the OpenSees backend can be replayed using 'Replay' backend
+# True -> results of identical designs (same geometry, loads, ELF parameters, and member sizes) are reused
+# False -> every elastic analysis is performed
+ELASTIC_ANALYSIS_CACHE = False
+
+# Define the number of elastic analysis results kept in memory
+ANALYSIS_CACHE_SIZE = 128
+
+# Define the folder where elastic analysis results are stored on disk. None means results are only kept in memory.
+ANALYSIS_CACHE_DIRECTORY = None
+
+# Define the maximum size of all elastic analysis results stored on disk (byte)
+ANALYSIS_CACHE_DISK_LIMIT = 100 * 1024 ** 2
+
+# Define the name (or path) of OpenSees executable
+OPENSEES_EXECUTABLE = 'OpenSees'
+
+# Define the maximum number of OpenSees processes run concurrently (opensees_runner.py)
+OPENSEES_CONCURRENCY = os.cpu_count()
+
+# Define the wall-clock time limit of each OpenSees run (second). None means no limit.
+OPENSEES_TIMEOUT = None
+
+# Define the solver profile used by OpenSees for the elastic load cases
+# 'linear' -> loads are applied in one step, the banded SPD stiffness is factorized once and P-Delta is iterated
+# 'incremental' -> loads are applied in five steps using Newton algorithm (PerformLoadsAnalysis.tcl in baseline folder)
+ELASTIC_SOLVER_PROFILE = 'linear'
+
+# Define a boolean variable to determine whether one recorder (output file) is used for each quantity
+# True -> story drifts, node displacements, beam forces, and column forces of all stories are saved in one file each
+# False -> one output file for each story (or floor level)
+CONSOLIDATED_RECORDER = False
+
+# Define a boolean variable to determine whether the elastic load cases are run in parallel
+# True -> each load case (dead, live, earthquake, ...) is run in its own OpenSees process and subdirectory model
+# False -> all load cases are run in sequence by one OpenSees process
+PARALLEL_LOAD_CASE = False
+
+# Define a boolean variable to determine whether OpenSees is run in a persistent session (opensees_session.py)
+# True -> one OpenSees process is started per worker and reused for all analyses (no start-up for each analysis)
+# False -> a new OpenSees process is started for each analysis
+PERSISTENT_OPENSEES_SESSION = False
+
+# Define the wall-clock time limit of each command run in the persistent OpenSees session (second).
+# The session process is killed (and restarted for the next command) if it does not respond within the limit.
+# None means no limit (a session process which exits is still detected).
+OPENSEES_SESSION_TIMEOUT = 600
+
+# Define the folder where the elastic analysis models are generated and analyzed
+# None -> each building is analyzed in BuildingElasticModels/<building id> (the outputs are kept)
+# A path (e.g., '/dev/shm' which is a tmpfs) -> each run (building instance) creates its own scratch folder under it.
+# Concurrent designs of the same building thus never share .tcl and output files.
+ELASTIC_SCRATCH_DIRECTORY = None
+
 # #########################################################################
 #           Open the section database and store it as a global variable   #
 # #########################################################################
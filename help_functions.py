@@ -260,6 +260,21 @@ def calculate_seismic_force(base_shear, floor_weight, floor_height, k):
     return seismic_force, story_shear
 
 
+def superpose_gravity_earthquake(dead, live, earthquake, SDS, earthquake_factor):
+    """
+    This function is used to obtain the response under gravity and earthquake loads: (1.2+0.2SDS)D + 0.5L + E
+    by superposing the responses under dead, live, and earthquake loads.
+    Please note that the P-Delta interaction between gravity loads and lateral displacements is neglected.
+    :param dead: an array which denotes the response (story drift or member forces) under dead load
+    :param live: an array which denotes the response under live load
+    :param earthquake: an array which denotes the response under the seismic force for strength
+    :param SDS: a scalar, design spectral response acceleration at short period
+    :param earthquake_factor: a scalar, ratio between the seismic force for drift and the seismic force for strength
+    :return: an array which denotes the response under gravity and earthquake loads
+    """
+    return (1.2 + 0.2*SDS)*dead + 0.5*live + earthquake_factor*earthquake
+
+
 def find_section_candidate(target_depth, section_database):
     """
     This function is used to find all possible section sizes that satisfies the user-specified depth.
@@ -324,6 +339,19 @@ def search_section_property(target_size, section_database):
         sys.exit(1)
 
 
+def tcl_section_property(target_size, section_database):
+    """
+    This function is used to express the section property as a Tcl list, which replaces the "SectionProperty"
+    procedure that searches the "Database.csv" file in OpenSees.
+    :param target_size: a string which defines section size, e.g. 'W14X500'
+    :param section_database: a dataframe read from SMF_Section_Property.csv in "Library" folder
+    :return: a string which includes size, d, A, bf, tw, tf, Ix, Iy, Zx, Zy, ry, and J (in this order) as a Tcl list
+    """
+    section_info = search_section_property(target_size, section_database)
+    section_property = [section_info[key] for key in ['d', 'A', 'bf', 'tw', 'tf', 'Ix', 'Iy', 'Zx', 'Zy', 'ry', 'J']]
+    return '[list %s %s]' % (target_size, ' '.join(repr(float(value)) for value in section_property))
+
+
 def decrease_member_size(candidate, current_size):
     """
     This function is used to decrease the member size one step downward
@@ -523,3 +551,33 @@ def increase_member_size(candidate, current_size):
         # This means the largest candidate still fails to satisfy the requirement
         sys.stderr.write('The upper bound for depth initialization is too small!\n')
     return candidate[candidate_pool_index - 1]
+
+
+def search_sufficient_member_size(candidate, current_size, required_property, section_database):
+    """
+    This function is used to increase the member size directly to the smallest candidate that satisfies the required
+    section properties, instead of one step upward.
+    :param candidate: a list of strings which defines the possible sizes (in descending order)
+    :param current_size: a string which denotes current member size
+    :param required_property: a dictionary whose keys are the headers of section database (e.g., 'A' or 'Zx') or 'Aw'
+                              (shear area d*tw), and values are the required quantities
+    :param section_database: a dataframe read from "Library" SMF_Section_Property.csv
+    :return: a string which denotes the member size after upscaling
+    """
+    # Only the sizes larger than current one are considered
+    larger_size = candidate[:candidate.index(current_size)]
+    if not larger_size:
+        return increase_member_size(candidate, current_size)
+    section = section_database.set_index('section size').loc[larger_size]
+    sufficient = np.ones(len(larger_size), dtype=bool)
+    for name, quantity in required_property.items():
+        if name == 'Aw':
+            value = section['d'] * section['tw']
+        else:
+            value = section[name]
+        sufficient &= np.array(value >= quantity)
+    # Use the largest size if none of the candidates is sufficient
+    if not np.any(sufficient):
+        return larger_size[0]
+    # The last sufficient size in the candidate list is the smallest one
+    return larger_size[np.where(sufficient)[0][-1]]
@@ -31,18 +31,27 @@ start_time = time.time()
 # for id in range(int(start_id), int(end_id), int(step_id)):
 #     building_id = 'Building_' + str(id)
 #     print("Design for building ID = ", building_id)
-#     seismic_design(building_id, base_directory)
+#     engine = seismic_design(building_id, base_directory)
+#     if engine.status != 'completed':
+#         print("Design for building ID = %s is not completed (%s): %s" % (building_id, engine.status, engine.message))
 # ********************* Revision Ends Here *******************************
 
 # ********************* Single Building Case Ends Here *******************
 IDs = [1]
+# Record the buildings whose design is terminated: {building_id: (status, message)}
+failed_designs = {}
 for id in IDs:
     building_id = 'Building_' + str(id)
     print("Design for Building ID = ", building_id)
-    seismic_design(building_id, base_directory)
+    engine = seismic_design(building_id, base_directory)
+    if engine.status != 'completed':
+        failed_designs[building_id] = (engine.status, engine.message)
 
 # ********************* Single Building Case Ends Here *******************
 
+for building_id, (status, message) in failed_designs.items():
+    print("Design for Building ID = %s is not completed (%s): %s" % (building_id, status, message))
+
 end_time = time.time()
 
 print("Running time is: %s seconds" % round(end_time - start_time, 2))
\ No newline at end of file
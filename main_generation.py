@@ -38,7 +38,7 @@ for id in IDs:
     model_generation(building_id, base_directory)
 
 ##########################################################################
-#                Run Models in Sequence (not Parallel)                   #
+#                Run Models in Parallel                                  #
 ##########################################################################
 
 # # Define building IDs for running analysis
@@ -54,15 +54,12 @@ for id in IDs:
 # # DynamicAnalysis is not recommended to run on your own PC as it is better
 # # to run a supercomputer.
 # analysis_type = 'PushoverAnalysis'
-# # Loop over each building model and perform the desired analysis
-# for id in IDs:
-#     # The folder where models are stored
-#     building_id = 'Building_' + str(id)
-#     # The target folder for current analysis_type
-#     target_model = base_directory / 'BuildingNonlinearModels' / building_id / analysis_type
-#     # Change the working directory to that model folder
-#     os.chdir(target_model)
-#     # Display which model you are analyzing
-#     print('Current model is: ', building_id)
-#     # Run OpenSees.exe file
-#     os.system('OpenSees Model.tcl')
\ No newline at end of file
+# # The target folders of all building models for current analysis_type
+# target_models = [base_directory / 'BuildingNonlinearModels' / ('Building_' + str(id)) / analysis_type for id in IDs]
+# # Run OpenSees.exe for all models: at most OPENSEES_CONCURRENCY models are run at the same time
+# from opensees_runner import run_opensees_batch
+# results = run_opensees_batch(target_models, check=False)
+# # Display the models which are not analyzed successfully
+# for result in results:
+#     if result.return_code != 0 or result.timed_out:
+#         print('Analysis is not completed: ', result.directory)
\ No newline at end of file
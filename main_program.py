@@ -12,7 +12,6 @@
 
 import sys
 import time
-import os
 import pickle
 
 from seismic_design import seismic_design
@@ -23,6 +22,7 @@ from global_variables import SECTION_DATABASE
 from global_variables import COLUMN_DATABASE
 from global_variables import BEAM_DATABASE
 from model_generation import model_generation
+from opensees_runner import run_opensees_batch
 
 # Count the starting time of the main program
 start_time = time.time()
@@ -32,24 +32,22 @@ IDs = [0]
 for id in IDs:
     building_id = 'Building_' + str(id)
     print("Design for Building ID = ", id)
-    seismic_design(building_id, base_directory)
+    engine = seismic_design(building_id, base_directory)
+    if engine.status != 'completed':
+        # The design is not accomplished: no nonlinear model is generated for this building
+        print("Design for Building ID = %i is not completed (%s): %s. Model generation and analyses are skipped."
+              % (id, engine.status, engine.message))
+        continue
     # ******************* Nonlinear Model Generation Starts Here ******
     print("Model generation for Building ID = ", id)
     model_generation(building_id, base_directory)
-    # ******************* Perform Eigen Value Analysis ****************
-    print("Eigen Value Analysis for Building ID = ", id)
-    analysis_type = 'EigenValueAnalysis'
-    target_model = base_directory / 'BuildingNonlinearModels' / building_id / analysis_type
-    os.chdir(target_model)
-    os.system('OpenSees Model.tcl')
-    # ******************* Perform Nonlinear Pushover Analysis *********
-    print("Pushover Analysis for Building ID = ", id)
-    analysis_type = 'PushoverAnalysis'
-    target_model = base_directory / 'BuildingNonlinearModels' / building_id / analysis_type
-    os.chdir(target_model)
-    os.system('OpenSees Model.tcl')
-
-print("The design, model construction, and analysis for Building ID = %i has been accomplished." % id)
+    # ******************* Perform Eigen Value and Nonlinear Pushover Analyses ******
+    # These two analyses are independent and thus run concurrently
+    print("Eigen Value and Pushover Analyses for Building ID = ", id)
+    target_models = [base_directory / 'BuildingNonlinearModels' / building_id / analysis_type
+                     for analysis_type in ['EigenValueAnalysis', 'PushoverAnalysis']]
+    run_opensees_batch(target_models)
+    print("The design, model construction, and analysis for Building ID = %i has been accomplished." % id)
 
 end_time = time.time()
 print("Running time is: %s seconds" % round(end_time - start_time, 2))
\ No newline at end of file
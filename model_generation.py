@@ -1,7 +1,6 @@
 # This file creates a function that is called by "main_generation.py" to perform nonlinear model generation
 
 
-import os
 import pickle
 
 from nonlinear_analysis import NonlinearAnalysis
@@ -12,16 +11,16 @@ def model_generation(building_id, base_directory):
     #                       Load Building Design Result                      #
     ##########################################################################
 
-    # Change the directory to the folder where the design results are stored
-    os.chdir(base_directory / 'BuildingData' / building_id)
+    # The folder where the design results are stored
+    building_data_directory = base_directory / 'BuildingData' / building_id
     # Load all design results (stored as .pkl files)
-    with open('construction_building.pkl', 'rb') as file:
+    with open(building_data_directory / 'construction_building.pkl', 'rb') as file:
         building = pickle.load(file)
-    with open('construction_column_set.pkl', 'rb') as file:
+    with open(building_data_directory / 'construction_column_set.pkl', 'rb') as file:
         column_set = pickle.load(file)
-    with open('construction_beam_set.pkl', 'rb') as file:
+    with open(building_data_directory / 'construction_beam_set.pkl', 'rb') as file:
         beam_set = pickle.load(file)
-    with open('construction_connection_set.pkl', 'rb') as file:
+    with open(building_data_directory / 'construction_connection_set.pkl', 'rb') as file:
         connection_set = pickle.load(file)
 
     ##########################################################################
@@ -36,7 +35,7 @@ def model_generation(building_id, base_directory):
     # Define path to folder where the baseline .tcl files for nonlinear analysis are stored
     building.directory['baseline files nonlinear'] = base_directory / 'BaselineTclFiles' / 'NonlinearAnalysis'
     # Define path to folder where the building data (.csv) are saved
-    building.directory['building data'] = base_directory / 'BuildingData' / building_id
+    building.directory['building data'] = building_data_directory
     # Define path to folder where the generated elastic analysis OpenSees model is saved
     building.directory['building elastic model'] = base_directory / 'BuildingElasticModels' / building_id
     # Define path to folder where the generated nonlinear analysis OpenSees model is saved
@@ -6,6 +6,13 @@ import os
 import sys
 import shutil
 
+from help_functions import tcl_section_property
+from opensees_session import get_opensees_session
+from opensees_runner import run_opensees
+from opensees_runner import OpenSeesError
+from global_variables import SECTION_DATABASE
+from global_variables import PERSISTENT_OPENSEES_SESSION
+
 # #########################################################################
 #              Generate Nonlinear OpenSees model (write .tcl files)       #
 # #########################################################################
@@ -56,15 +63,11 @@ class NonlinearAnalysis(object):
             sys.stderr.write('EigenValueAnalys, PushoverAnalysis, DynamicAnalysis')
             sys.exit(99)
 
-        # Change the working directory to the target building folder
-        if not os.path.exists(building.directory['building nonlinear model']):
-            os.makedirs(building.directory['building nonlinear model'])
-        os.chdir(building.directory['building nonlinear model'])
-        # Change the working directory to the desired folder (EigenValueAnalysis, PushoverAnalysis, or DynamicAnalysis)
-        target_folder = building.directory['building nonlinear model'] / analysis_type
-        if not os.path.exists(target_folder):
-            os.makedirs(target_folder)
-        os.chdir(target_folder)
+        # All .tcl files are written into the desired folder under the target building folder:
+        # EigenValueAnalysis, PushoverAnalysis, or DynamicAnalysis. The working directory of the process is not changed.
+        self.directory = building.directory['building nonlinear model'] / analysis_type
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
 
         # Call methods to write .tcl files for the building
         # Nonlinear model for different purpose might require different .tcl files (different methods)
@@ -105,7 +108,7 @@ class NonlinearAnalysis(object):
         :param beam_set: a list[x][z] and each element is a class defined in "beam_component.py"
         :return: a .tcl file
         """
-        with open('DefineNodes2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineNodes2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define all nodes \n")  # Introduce the file usage
             tclfile.write("# Units: inch\n\n\n")  # Explain the units
 
@@ -191,7 +194,7 @@ class NonlinearAnalysis(object):
         :param building: a class defined in "building_information.py"
         :return: a .tcl file
         """
-        with open('DefineFixities2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineFixities2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define the fixity at all column bases \n\n\n")
             tclfile.write("# Defining fixity at column base \n")
             for j in range(1, building.geometry['number of X bay']+2):
@@ -207,7 +210,7 @@ class NonlinearAnalysis(object):
         :return: a .tcl file
         """
         # Create a .tcl file to write floor constraint, i.e., equal DOF
-        with open('DefineFloorConstraint2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineFloorConstraint2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define floor constraint \n")
             tclfile.write("# Nodes at same floor level have identical lateral displacement\n")
             tclfile.write("# Select mid right node of each panel zone as the constrained node\n\n")
@@ -233,7 +236,7 @@ class NonlinearAnalysis(object):
         :return: a .tcl file
         """
         material_tag = 70001
-        with open('DefineBeamHingeMaterials2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineBeamHingeMaterials2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define beam hinge material models\n\n\n")
             for i in range(2, building.geometry['number of story']+2):  # i is floor level number (no beam on ground)
                 for j in range(1, building.geometry['number of X bay']+1):  # j is bay number (1 for leftmost bay)
@@ -276,7 +279,7 @@ class NonlinearAnalysis(object):
         :return: a .tcl file
         """
         material_tag = 60001
-        with open('DefineColumnHingeMaterials2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineColumnHingeMaterials2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define column hinge material models\n\n\n")
             for i in range(1, building.geometry['number of story']+1):  # i is story number (from 1)
                 for j in range(1, building.geometry['number of X bay']+2):  # j is pier number (1 for leftmost pier)
@@ -317,11 +320,12 @@ class NonlinearAnalysis(object):
         :param building: a class defined in "building_information.py" file
         :return: a .tcl file
         """
-        with open('DefineBeams2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineBeams2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define beam elements \n\n\n")
             tclfile.write("# Define beam section sizes \n")
             for i in range(2, building.geometry['number of story']+2):  # i is the floor level (from 2)
-                tclfile.write("set\tBeamLevel%i\t[SectionProperty %s];\n" % (i, building.member_size['beam'][i-2]))
+                section_property = tcl_section_property(building.member_size['beam'][i-2], SECTION_DATABASE)
+                tclfile.write("set\tBeamLevel%i\t%s;\n" % (i, section_property))
             tclfile.write("\n\n# Define beams \n")
             for i in range(2, building.geometry['number of story']+2):  # i is the floor level (from 2)
                 tclfile.write("# Level%i\n" % i)
@@ -352,21 +356,21 @@ class NonlinearAnalysis(object):
         :param building: a class defined in "building_information.py" file
         :return: a .tcl file
         """
-        with open('DefineColumns2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineColumns2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define columns \n\n\n")
 
             # Define exterior column sizes
             tclfile.write("# Define exterior column section sizes \n")
             for i in range(1, building.geometry['number of story']+1):  # i is story number
-                tclfile.write("set\tExteriorColumnStory%i\t[SectionProperty %s];\n"
-                              % (i, building.member_size['exterior column'][i-1]))
+                section_property = tcl_section_property(building.member_size['exterior column'][i-1], SECTION_DATABASE)
+                tclfile.write("set\tExteriorColumnStory%i\t%s;\n" % (i, section_property))
             tclfile.write("\n\n")
 
             # Define interior column sizes
             tclfile.write("# Define interior column section sizes \n")
             for i in range(1, building.geometry['number of story']+1):  # i is story number
-                tclfile.write("set\tInteriorColumnStory%i\t[SectionProperty %s];\n"
-                              % (i, building.member_size['interior column'][i-1]))
+                section_property = tcl_section_property(building.member_size['interior column'][i-1], SECTION_DATABASE)
+                tclfile.write("set\tInteriorColumnStory%i\t%s;\n" % (i, section_property))
 
             tclfile.write("\n\n# Define columns\n")
             for i in range(1, building.geometry['number of story']+1):  # i is story number
@@ -410,7 +414,7 @@ class NonlinearAnalysis(object):
         :param building: a class defined in "building_information.py" file
         :return: a .tcl file
         """
-        with open('DefineBeamHinges2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineBeamHinges2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define beam hinges \n\n\n")
 
             tclfile.write("# Define beam hinges using rotational spring with modified IMK material\n")
@@ -437,7 +441,7 @@ class NonlinearAnalysis(object):
         :param building: a class defined in "building_information.py" file
         :return: a .tcl file
         """
-        with open('DefineColumnHinges2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineColumnHinges2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file wil be used to define column hinges\n\n\n")
             for i in range(1, building.geometry['number of story']+1):  # i refers the story number
                     tclfile.write("# Column hinges at bottom of story%i\n" % i)
@@ -488,7 +492,7 @@ class NonlinearAnalysis(object):
         :param building: a class defined in "building_information.py" file
         :return: a .tcl file
         """
-        with open('DefineMasses2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineMasses2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define all nodal masses \n\n")
 
             # Write values for floor weights, tributary mass ratio, and nodal mass
@@ -519,7 +523,7 @@ class NonlinearAnalysis(object):
         :param building: a class defined in "building_information.py" file
         :return: a .tcl file
         """
-        with open('DefinePanelZoneElements.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefinePanelZoneElements.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define elements in panel zones \n\n")
             tclfile.write("# Procedure used to produce panel zone elements:\n")
             for i in range(2, building.geometry['number of story']+2):  # i refers to the floor level number
@@ -533,7 +537,7 @@ class NonlinearAnalysis(object):
 
     def write_panel_zone_springs(self, building, column_set, beam_set, connection_set):
         # Create a .tcl file that defines the springs involved in panel zones
-        with open('DefinePanelZoneSprings.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefinePanelZoneSprings.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define springs in panel zone \n\n")
             tclfile.write("# Procedure command:\n")
             tclfile.write("# rotPanelZone2D\teleID\tnodeR\tnodeC\tE\tFy\tdc\tbf_c\ttf_c\ttp\tdb\tRy\tas\n\n")
@@ -562,7 +566,7 @@ class NonlinearAnalysis(object):
 
     def write_gravity_load(self, building):
         # Create a .tcl file to write gravity load: 1.00 DL + 0.25 LL
-        with open('DefineGravityLoads2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineGravityLoads2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define expected gravity loads\n\n\n")
 
             # Assign the beam dead load values
@@ -623,7 +627,7 @@ class NonlinearAnalysis(object):
 
     def write_pushover_loading(self, building):
         # Create a .tcl file to write lateral pushover loading
-        with open('DefinePushoverLoading2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefinePushoverLoading2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define pushover loading\n\n\n")
             tclfile.write("pattern\tPlain\t200\tLinear\t{\n\n")
             tclfile.write("# Pushover pattern\n")
@@ -638,7 +642,7 @@ class NonlinearAnalysis(object):
 
     def write_base_reaction_recorder(self, building):
         # Create a .tcl file to write the recorders for base reactions
-        with open('DefineBaseReactionRecorders2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineBaseReactionRecorders2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define base node reaction recorders\n\n\n")
             tclfile.write("cd\t$baseDir/$dataDir/BaseReactions\n\n")
 
@@ -660,7 +664,7 @@ class NonlinearAnalysis(object):
 
     def write_beam_hinge_recorder(self, building):
         # Create a .tcl file to record beam hinge forces and deformation
-        with open('DefineBeamHingeRecorders2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineBeamHingeRecorders2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define beam hinge force-deformation recorders\n\n\n")
             tclfile.write("cd\t$baseDir/$dataDir/BeamHingeMoment\n\n")
 
@@ -687,7 +691,7 @@ class NonlinearAnalysis(object):
 
     def write_column_hinge_recorder(self, building):
         # Create a .tcl file to record column hinge forces and deformations
-        with open('DefineColumnHingeRecorders2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineColumnHingeRecorders2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define column hinge force-deformation recorders\n\n\n")
             tclfile.write("cd\t$baseDir/$dataDir/ColumnHingeMoment\n\n")
 
@@ -714,7 +718,7 @@ class NonlinearAnalysis(object):
 
     def write_beam_force_recorder(self, building):
         # Create a .tcl file to write beam element forces recorder for output
-        with open('DefineGlobalBeamForceRecorders2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineGlobalBeamForceRecorders2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define global beam force recorders\n\n\n")
             tclfile.write("cd\t$baseDir/$dataDir/GlobalBeamForces\n\n")
             tclfile.write("# X-Direction beam element global force recorders\n")
@@ -726,7 +730,7 @@ class NonlinearAnalysis(object):
 
     def write_column_force_recorder(self, building):
         # Create a .tcl file to write column element forces recorder for output
-        with open('DefineGlobalColumnForceRecorders2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineGlobalColumnForceRecorders2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define global column force recorders\n\n\n")
             tclfile.write("cd\t$baseDir/$dataDir/GlobalBeamForces\n\n")
             tclfile.write("# Column element global force recorders\n")
@@ -739,7 +743,7 @@ class NonlinearAnalysis(object):
 
     def write_node_displacement_recorder(self, building):
         # Create a .tcl file to write the node displacements recorder for output
-        with open('DefineNodeDisplacementRecorders2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineNodeDisplacementRecorders2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define node displacement recorders\n\n\n")
             tclfile.write("cd\t$baseDir/$dataDir/NodeDisplacements\n\n")
             for i in range(1, building.geometry['number of story']+2):
@@ -753,7 +757,7 @@ class NonlinearAnalysis(object):
 
     def write_story_drift_recorder(self, building, analysis_type):
         # Create a .tcl file to write story drift recorder for output
-        with open('DefineStoryDriftRecorders2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineStoryDriftRecorders2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define story drift recorders\n\n\n")
 
             if analysis_type == 'PushoverAnalysis':
@@ -788,7 +792,7 @@ class NonlinearAnalysis(object):
 
     def write_node_acceleration_recorder(self, building):
         # Create a .tcl file to record absolute node acceleration
-        with open('DefineNodeAccelerationRecorders2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineNodeAccelerationRecorders2DModel.tcl', 'w') as tclfile:
             tclfile.write("# Define node acceleration recorders\n\n\n")
             tclfile.write("cd $baseDir/$dataDir/EQ_$eqNumber/Scale_$scale/NodeAccelerations\n\n")
             for i in range(1, building.geometry['number of story']+2):
@@ -802,7 +806,7 @@ class NonlinearAnalysis(object):
 
     def write_damping(self, building):
         # Create a .tcl file to define damping for dynamic analysis
-        with open('DefineDamping2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineDamping2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define damping\n\n")
 
             tclfile.write("# A damping ratio of 2% is used for steel buildings\n")
@@ -845,7 +849,7 @@ class NonlinearAnalysis(object):
 
     def write_dynamic_analysis_parameters(self, building):
         # Create a .tcl file to define all parameters pertinent to dynamic analysis solver
-        with open('DefineDynamicAnalysisParameters2DModel.tcl', 'w') as tclfile:
+        with open(self.directory / 'DefineDynamicAnalysisParameters2DModel.tcl', 'w') as tclfile:
             tclfile.write("# This file will be used to define analysis parameters relevant to dynamic solver\n\n\n")
             tclfile.write("set\tNStories\t%i; \n" % building.geometry['number of story'])
             # The height shall be converted from ft to inch
@@ -869,16 +873,12 @@ class NonlinearAnalysis(object):
                               options: 'EigenValueAnalysis', 'PushoverAnalysis', 'DynamicAnalysis'
         :return:
         """
-        # Change the working directory to the folder where baseline .tcl files are stored
+        # The folder where baseline .tcl files are stored
         source_dir = building.directory['baseline files nonlinear'] / analysis_type
-        os.chdir(source_dir)
         # Copy all baseline .tcl files to building model directory
         for _, _, files in os.walk(source_dir):
             for file in files:
-                target_file = building.directory['building nonlinear model'] / analysis_type / file
-                shutil.copy(file, target_file)
-        # Remember to change the working directory to building model directory
-        os.chdir(building.directory['building nonlinear model'] / analysis_type)
+                shutil.copy(source_dir / file, self.directory / file)
 
         # Update necessary information in .tcl files for different analysis
         if analysis_type == 'EigenValueAnalysis':
@@ -891,26 +891,30 @@ class NonlinearAnalysis(object):
                 # This is to change the number of desired mode
                 new_mode = 'set nEigenL 3'
                 # Releast the equal DOF constraints for buildings with less than 3 stories
-                with open('Model.tcl', 'r') as file:
+                with open(self.directory / 'Model.tcl', 'r') as file:
                     content = file.read()
                 new_content = content.replace('source DefineFloorConstraint2DModel.tcl',
                                               '# source DefineFloorConstraint2DModel.tcl')
-                with open('Model.tcl', 'w') as file:
+                with open(self.directory / 'Model.tcl', 'w') as file:
                     file.write(new_content)
             # This is to change the node tag to record eigen vector
             old_string = '**EIGENVECTOR_NODE**'
             new_string = '1110'
             for floor in range(1, building.geometry['number of story']+1):
                 new_string += (' %i%i%i%i' % (1, floor+1, 1, 1))
-            with open('EigenValueAnalysis.tcl', 'r') as file:
+            with open(self.directory / 'EigenValueAnalysis.tcl', 'r') as file:
                 content = file.read()
             new_content = content.replace(old_mode, new_mode)
             new_content = new_content.replace(old_string, new_string)
-            with open('EigenValueAnalysis.tcl', 'w') as file:
+            with open(self.directory / 'EigenValueAnalysis.tcl', 'w') as file:
                 file.write(new_content)
 
             # Perform Eigen Analysis to obtain the periods which will be necessary for raleigh damping in dynamic part
-            os.system('OpenSees Model.tcl')
+            if PERSISTENT_OPENSEES_SESSION:
+                if not get_opensees_session().run(self.directory):
+                    raise OpenSeesError('OpenSees session failed to run Model.tcl in %s' % self.directory)
+            else:
+                run_opensees(self.directory)
 
         # Update pushover parameters contained Model.tcl when performing pushover analysis
         elif analysis_type == 'PushoverAnalysis':
@@ -918,11 +922,11 @@ class NonlinearAnalysis(object):
             old_string = ['**ControlNode**', '**ControlDOF**', '**DisplacementIncrement**', '**DisplacementMaximum**']
             new_string = ['%i%i%i%i' % (1, building.geometry['number of story']+1, 1, 1), '%i' % 1, '0.01',
                           '%.2f' % (0.1*building.geometry['floor height'][-1]*12)]  # DisplamentMaximum should be in inch.
-            with open('Model.tcl', 'r') as file:
+            with open(self.directory / 'Model.tcl', 'r') as file:
                 content = file.read()
             for indx in range(len(old_string)):
                 content = content.replace(old_string[indx], new_string[indx])
-            with open('Model.tcl', 'w') as file:
+            with open(self.directory / 'Model.tcl', 'w') as file:
                 file.write(content)
 
         # Update Model.tcl and RunIDA2DModel.tcl files for dynamic analysis
@@ -932,24 +936,22 @@ class NonlinearAnalysis(object):
             # The path to Eigen value analysis results
             periods_dir = building.directory['building nonlinear model'] / 'EigenValueAnalysis' / 'EigenAnalysisOutput'
             # Read the periods from .out files generated by Eigen value analysis
-            os.chdir(periods_dir)
-            periods = np.loadtxt('Periods.out')
+            periods = np.loadtxt(periods_dir / 'Periods.out')
             # Update period variables in Model.tcl
-            os.chdir(building.directory['building nonlinear model'] / analysis_type)
-            with open('Model.tcl', 'r') as file:
+            with open(self.directory / 'Model.tcl', 'r') as file:
                 content = file.read()
             content = content.replace(old_periods[0], str(periods[0]))  # First-mode period
             content = content.replace(old_periods[1], str(periods[2]))  # Third-mode period
             # Write the updated content into Model.tcl
-            with open('Model.tcl', 'w') as file:
+            with open(self.directory / 'Model.tcl', 'w') as file:
                 file.write(content)
             # Update dynamic parameters in RunIDA2DModel.tcl
-            with open('RunIDA2DModel.tcl', 'r') as file:
+            with open(self.directory / 'RunIDA2DModel.tcl', 'r') as file:
                 content = file.read()
             old_string = ['**NumberOfGroundMotions**', '**IntensityScales**', '**MCEScaleFactor**']
             new_string = [240, 100, 1.0]
             for indx in range(len(old_string)):
                 content = content.replace(old_string[indx], str(new_string[indx]))
             # Write the new content back into RunIDA2DModel.tcl
-            with open('RunIDA2DModel.tcl', 'w') as file:
+            with open(self.directory / 'RunIDA2DModel.tcl', 'w') as file:
                 file.write(content)
\ No newline at end of file
@@ -0,0 +1,189 @@
+# This file is used to define the functions to run OpenSees processes using asyncio
+# Independent models (in different folders) are run concurrently under a limit on the number of processes.
+# The output of each run is saved into a log file in the model folder and the wall-clock time of each run is limited.
+
+import asyncio
+import collections
+import os
+import subprocess
+import sys
+import time
+
+from global_variables import OPENSEES_EXECUTABLE
+from global_variables import OPENSEES_CONCURRENCY
+from global_variables import OPENSEES_TIMEOUT
+
+
+# #########################################################################
+#                  Define the result of one OpenSees run                  #
+# #########################################################################
+
+# directory: the folder where the model script is run
+# script: the name of model script
+# return_code: exit code of OpenSees process (None if it is killed due to timeout)
+# timed_out: a boolean variable which denotes whether the run exceeds the time limit
+# elapsed_time: wall-clock time of the run (second)
+# log_file: the file which saves the stdout and stderr of the run
+OpenSeesResult = collections.namedtuple('OpenSeesResult', ['directory', 'script', 'return_code', 'timed_out',
+                                                           'elapsed_time', 'log_file'])
+
+# Name of the log file saved in each model folder
+LOG_FILE = 'OpenSees.log'
+
+
+class OpenSeesError(Exception):
+    """
+    This class is the exception raised when OpenSees runs fail (non-zero exit code, timeout, or missing executable).
+    The failed runs are stored in "results" such that their log files can be inspected.
+    """
+
+    def __init__(self, message, results=()):
+        """
+        :param message: a string which describes the failure
+        :param results: a list of OpenSeesResult which are not completed successfully (empty for OpenSees sessions)
+        """
+        super(OpenSeesError, self).__init__(message)
+        self.results = results
+
+
+def describe_failure(result):
+    """
+    This function is used to describe why one OpenSees run fails.
+    :param result: an OpenSeesResult
+    :return: a string which denotes the reason (None if the run is successful)
+    """
+    if result.timed_out:
+        return 'killed after time limit'
+    elif result.return_code is None:
+        return 'not started, see %s' % result.log_file
+    elif result.return_code != 0:
+        return 'exit code %i, see %s' % (result.return_code, result.log_file)
+    return None
+
+
+def check_opensees_results(results):
+    """
+    This function is used to check the results of OpenSees runs.
+    :param results: a list of OpenSeesResult
+    :return: None. OpenSeesError is raised if any run is not completed successfully.
+    """
+    failed_results = [result for result in results if describe_failure(result) is not None]
+    if failed_results:
+        message = '; '.join('%s (%s)' % (result.directory, describe_failure(result)) for result in failed_results)
+        raise OpenSeesError('OpenSees runs failed: ' + message, failed_results)
+
+
+def run_coroutine(coroutine, async_function):
+    """
+    This function is used to run a coroutine to completion from synchronous code (Python 3.7 or above).
+    :param coroutine: the coroutine to be run
+    :param async_function: a string which is the name of the coroutine function that the caller should await instead
+                           if an event loop is already running in this thread
+    :return: the result of the coroutine. RuntimeError is raised if an event loop is already running in this thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    # asyncio.run cannot be nested in a running loop (e.g. Jupyter notebook or another coroutine)
+    coroutine.close()
+    raise RuntimeError('an event loop is already running in this thread, use "await %s(...)" instead'
+                       % async_function)
+
+
+# #########################################################################
+#                  Define coroutines to run OpenSees models               #
+# #########################################################################
+
+async def run_opensees_async(directory, script='Model.tcl', semaphore=None, timeout=OPENSEES_TIMEOUT):
+    """
+    This coroutine is used to run one OpenSees model, which is identical to "OpenSees Model.tcl" in the given directory.
+    :param directory: a string or pathlib.Path which denotes the folder where the .tcl files are saved
+    :param script: a string which is the name of model script
+    :param semaphore: an asyncio.Semaphore which limits the number of concurrent OpenSees processes
+    :param timeout: a scalar which denotes the wall-clock time limit (second). None means no limit.
+    :return: an OpenSeesResult
+    """
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(1)
+    log_file = os.path.join(directory, LOG_FILE)
+    async with semaphore:
+        start_time = time.time()
+        with open(log_file, 'w') as log:
+            try:
+                process = await asyncio.create_subprocess_exec(OPENSEES_EXECUTABLE, script, cwd=directory,
+                                                               stdout=log, stderr=subprocess.STDOUT)
+            except OSError as error:
+                # The executable is not found (or cannot be started): the run is recorded as failed
+                log.write('Cannot start %s: %s\n' % (OPENSEES_EXECUTABLE, error))
+                process = None
+            timed_out = False
+            return_code = None
+            if process is not None:
+                try:
+                    return_code = await asyncio.wait_for(process.wait(), timeout)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+                    timed_out = True
+        result = OpenSeesResult(directory, script, return_code, timed_out, time.time() - start_time, log_file)
+    if timed_out:
+        sys.stderr.write('OpenSees run in %s exceeds %.1f seconds and is killed\n' % (directory, timeout))
+    elif return_code is None:
+        sys.stderr.write('OpenSees run in %s cannot be started (see %s)\n' % (directory, log_file))
+    elif return_code != 0:
+        sys.stderr.write('OpenSees run in %s fails with exit code %i (see %s)\n' % (directory, return_code, log_file))
+    return result
+
+
+async def run_opensees_batch_async(directories, script='Model.tcl', concurrency=OPENSEES_CONCURRENCY,
+                                   timeout=OPENSEES_TIMEOUT):
+    """
+    This coroutine is used to run many independent OpenSees models concurrently.
+    :param directories: a list of folders where the .tcl files are saved
+    :param script: a string which is the name of model script (identical for all folders)
+    :param concurrency: an integer which denotes the maximum number of concurrent OpenSees processes
+    :param timeout: a scalar which denotes the wall-clock time limit of each run (second). None means no limit.
+    :return: a list of OpenSeesResult (in the same order as directories)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*[run_opensees_async(directory, script, semaphore, timeout)
+                                  for directory in directories])
+
+
+# #########################################################################
+#                  Define functions to be called by drivers               #
+# #########################################################################
+
+def run_opensees(directory, script='Model.tcl', timeout=OPENSEES_TIMEOUT, check=True):
+    """
+    This function is used to run one OpenSees model and wait for its completion.
+    :param directory: a string or pathlib.Path which denotes the folder where the .tcl files are saved
+    :param script: a string which is the name of model script
+    :param timeout: a scalar which denotes the wall-clock time limit (second). None means no limit.
+    :param check: a boolean variable. True means OpenSeesError is raised if the run fails.
+    :return: an OpenSeesResult. RuntimeError is raised if an event loop is running (await run_opensees_async instead).
+    """
+    result = run_coroutine(run_opensees_async(directory, script, timeout=timeout), 'run_opensees_async')
+    if check:
+        check_opensees_results([result])
+    return result
+
+
+def run_opensees_batch(directories, script='Model.tcl', concurrency=OPENSEES_CONCURRENCY, timeout=OPENSEES_TIMEOUT,
+                       check=True):
+    """
+    This function is used to run many independent OpenSees models concurrently and wait for all of them.
+    :param directories: a list of folders where the .tcl files are saved
+    :param script: a string which is the name of model script (identical for all folders)
+    :param concurrency: an integer which denotes the maximum number of concurrent OpenSees processes
+    :param timeout: a scalar which denotes the wall-clock time limit of each run (second). None means no limit.
+    :param check: a boolean variable. True means OpenSeesError is raised (after all runs finish) if any run fails.
+    :return: a list of OpenSeesResult (in the same order as directories). RuntimeError is raised if an event loop is
+             running (await run_opensees_batch_async instead).
+    """
+    results = run_coroutine(run_opensees_batch_async(directories, script, concurrency, timeout),
+                            'run_opensees_batch_async')
+    if check:
+        check_opensees_results(results)
+    return results
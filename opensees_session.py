@@ -0,0 +1,196 @@
+# This file is used to define a persistent OpenSees interpreter session
+# A long-lived OpenSees process is started once per worker (process or thread) and .tcl models are sourced through
+# stdin/stdout pipes, thus the interpreter start-up is not repeated for every elastic analysis.
+# A scripted stand-in (tests/opensees_stand_in.tcl, run by tclsh) is used to exercise the protocol in tests.
+
+import atexit
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+from opensees_runner import OpenSeesError
+from global_variables import OPENSEES_EXECUTABLE
+from global_variables import OPENSEES_SESSION_TIMEOUT
+
+
+# #########################################################################
+#                    Define constants used in the protocol                #
+# #########################################################################
+
+# Marker printed by the interpreter after each command, followed by the return code of the command
+SENTINEL = '__OPENSEES_SESSION_DONE__'
+
+# Name of the Tcl variable that stores the global variables defined before any model is sourced
+BASELINE_GLOBALS = '__session_globals'
+
+
+# #########################################################################
+#                Define a class to talk with OpenSees process             #
+# #########################################################################
+
+class OpenSeesSession(object):
+    """
+    This class starts one OpenSees process and reuses it for many analyses. It includes the following methods:
+    (1) start the OpenSees process and record the global Tcl variables of a fresh interpreter
+    (2) execute a Tcl command and wait for the sentinel marker
+    (3) run a model script in a given directory after clearing the previous model and global variables
+    (4) close the OpenSees process
+    """
+
+    def __init__(self, executable=OPENSEES_EXECUTABLE, timeout=OPENSEES_SESSION_TIMEOUT):
+        """
+        This function is used to start the OpenSees process.
+        :param executable: a string which is the name (or path) of the OpenSees executable
+        :param timeout: a scalar which denotes the wall-clock time limit of each command (second). None means no limit.
+        """
+        self.executable = executable
+        self.timeout = timeout
+        # Process which owns the session: a forked worker must not use (or close) the OpenSees process of its parent
+        self.pid = os.getpid()
+        self.process = None
+        self.output = None
+        self.start()
+
+    def start(self):
+        # Start the interpreter: Tcl reads the commands from stdin when no script is given
+        try:
+            self.process = subprocess.Popen([self.executable], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                            stderr=subprocess.STDOUT, universal_newlines=True, bufsize=1)
+        except OSError as error:
+            raise OpenSeesError('Cannot start OpenSees session %s: %s' % (self.executable, error))
+        # The output lines are read by a thread such that waiting for the sentinel can be limited in time
+        # None is put into the queue once the process closes its output (exits)
+        self.output = queue.Queue()
+        reader = threading.Thread(target=read_output, args=(self.process.stdout, self.output), daemon=True)
+        reader.start()
+        # Variables defined afterwards (by the models) will be removed before each run
+        self.execute('set\t%s\t[info globals]' % BASELINE_GLOBALS)
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def execute(self, command):
+        """
+        This method is used to execute a Tcl command in the OpenSees process.
+        OpenSeesError is raised if the process exits or does not respond within the time limit. The process is then
+        restarted for the next command.
+        :param command: a string which is the Tcl script to be evaluated
+        :return: a boolean variable which denotes whether the command is executed successfully,
+                 and a list of strings which includes the output lines of the command
+        """
+        if not self.is_alive():
+            self.start()
+        # Errors are caught in Tcl such that the interpreter survives a failed analysis
+        try:
+            self.process.stdin.write('set\t__session_status\t[catch {\n%s\n} __session_message]\n' % command)
+            self.process.stdin.write('if {$__session_status} {puts $__session_message}\n')
+            self.process.stdin.write('puts "%s $__session_status"\n' % SENTINEL)
+            self.process.stdin.write('flush stdout\n')
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            # The process exits before the command is sent: the error is reported when its output is read
+            pass
+        # Read the output until the sentinel marker is found
+        output = []
+        deadline = None if self.timeout is None else time.time() + self.timeout
+        while True:
+            try:
+                line = self.output.get(timeout=None if deadline is None else max(deadline - time.time(), 0))
+            except queue.Empty:
+                self.kill()
+                raise OpenSeesError('OpenSees session does not respond within %.1f seconds' % self.timeout)
+            if line is None:
+                # The process exits before the sentinel is printed: it will be restarted for next command
+                self.process.wait()
+                return_code = self.process.returncode
+                self.process = None
+                raise OpenSeesError('OpenSees session exits (code %s) before the command is completed:\n%s'
+                                    % (return_code, '\n'.join(output)))
+            if SENTINEL in line:
+                # The prompt of interactive interpreter may precede the marker
+                prefix, status = line.rstrip('\n').split(SENTINEL)
+                if prefix.strip():
+                    output.append(prefix)
+                return status.strip() == '0', output
+            output.append(line.rstrip('\n'))
+
+    def run(self, directory, script='Model.tcl'):
+        """
+        This method is used to run a model script, which is identical to "OpenSees Model.tcl" in the given directory.
+        :param directory: a string or pathlib.Path which denotes the folder where the .tcl files are saved
+        :param script: a string which is the name of the model script
+        :return: a boolean variable which denotes whether the model is analyzed successfully.
+                 OpenSeesError is raised if the process exits or does not respond within the time limit.
+        """
+        # Clear the model and the Tcl global variables (e.g., Tlist) defined in previous runs
+        command = 'foreach __name [info globals] {\n' \
+                  '\tif {[lsearch -exact $::%s $__name] < 0 && ![string match __session* $__name]} {\n' \
+                  '\t\tunset -nocomplain ::$__name\n' \
+                  '\t}\n' \
+                  '}\n' % BASELINE_GLOBALS
+        command += 'wipe all\n'
+        command += 'cd {%s}\n' % directory
+        command += 'source {%s}' % script
+        success, output = self.execute(command)
+        for line in output:
+            sys.stdout.write(line + '\n')
+        if not success:
+            sys.stderr.write('OpenSees session failed to run %s in %s\n' % (script, directory))
+        return success
+
+    def kill(self):
+        # Kill the OpenSees process which does not respond: it will be restarted for next command
+        if self.process is not None:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def close(self):
+        # Terminate the OpenSees process (only by the process which starts it)
+        if self.pid != os.getpid():
+            return
+        if self.is_alive():
+            self.process.stdin.write('exit\n')
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+
+def read_output(stream, output):
+    """
+    This function is used to read the output lines of OpenSees process (run in a thread of the session).
+    :param stream: the stdout of OpenSees process
+    :param output: a queue.Queue into which the lines are put. None is put once the process closes its output.
+    """
+    for line in stream:
+        output.put(line)
+    output.put(None)
+
+
+# #########################################################################
+#          Define a function to obtain the session of current worker      #
+# #########################################################################
+
+# Sessions are stored per thread since a session serves one command at a time through its pipes.
+# The process id is checked as well such that forked workers start their own OpenSees process.
+SESSIONS = threading.local()
+
+
+def get_opensees_session():
+    """
+    This function is used to obtain the OpenSees session of the current thread in the current process (worker).
+    The session is started at the first call and closed when the process exits.
+    :return: a class defined in this file
+    """
+    session = getattr(SESSIONS, 'session', None)
+    if session is None or session.pid != os.getpid():
+        session = OpenSeesSession()
+        SESSIONS.session = session
+        atexit.register(session.close)
+    return session
@@ -0,0 +1,82 @@
+# This file is used to define the functions to read OpenSees recorder outputs
+# Only the final record (the last analysis step) of each output file is used in the elastic analysis.
+# Thus only the end of a text file is parsed.
+
+import numpy as np
+import os
+
+
+# #########################################################################
+#                  Define constants used to read the files                #
+# #########################################################################
+
+# Number of bytes read each time from the end of a text file
+BLOCK_SIZE = 4096
+
+
+# #########################################################################
+#           Define functions to read the final record of outputs          #
+# #########################################################################
+
+def read_last_text_record(file_name):
+    """
+    This function is used to read the last line of a text recorder output without parsing the whole file.
+    :param file_name: a string or pathlib.Path which denotes the output file
+    :return: a vector which includes all values in the last line
+    """
+    with open(file_name, 'rb') as file:
+        file.seek(0, os.SEEK_END)
+        position = file.tell()
+        content = b''
+        # Read the file backwards until a complete line is found
+        while position > 0:
+            size = min(BLOCK_SIZE, position)
+            position -= size
+            file.seek(position)
+            content = file.read(size) + content
+            lines = content.rstrip().split(b'\n')
+            if len(lines) > 1 or (position == 0 and lines[0]):
+                return np.array(lines[-1].split(), dtype=float)
+    return np.array([])
+
+
+def read_last_records(file_names, number_of_column):
+    """
+    This function is used to read the last records of many recorder outputs (e.g., one file for each story).
+    :param file_names: a list of output files
+    :param number_of_column: an integer which denotes the number of values in each record (including time)
+    :return: a matrix whose rows are the last records of the files
+    """
+    last_records = np.zeros([len(file_names), number_of_column])
+    for i, file_name in enumerate(file_names):
+        last_records[i, :] = read_last_text_record(file_name)
+    return last_records
+
+
+# #########################################################################
+#             Define functions to read consolidated recorder outputs      #
+# #########################################################################
+
+def consolidated_column_map(number_of_row, number_of_value):
+    """
+    This function is used to define the column map of a consolidated recorder output, which records the values of
+    all stories (or floor levels) in one file: time, values of row 1, values of row 2, ...
+    :param number_of_row: an integer which denotes the number of stories (or floor levels) in the output
+    :param number_of_value: an integer which denotes the number of values for each story (or floor level)
+    :return: a matrix whose i-th row includes the column indices of the values of i-th story (or floor level)
+    """
+    return np.arange(1, 1 + number_of_row*number_of_value).reshape(number_of_row, number_of_value)
+
+
+def read_consolidated_record(file_name, column_map, number_of_column=None):
+    """
+    This function is used to read the last record of a consolidated recorder output and arrange it by story.
+    :param file_name: a string or pathlib.Path which denotes the output file
+    :param column_map: a matrix obtained from consolidated_column_map function
+    :param number_of_column: an integer which denotes the number of values in each record (including time).
+                             Default value is the number of columns in the column map plus time.
+    :return: a matrix whose i-th row includes the values of i-th story (or floor level)
+    """
+    if number_of_column is None:
+        number_of_column = column_map.size + 1
+    return read_last_records([file_name], number_of_column)[0, column_map]
@@ -1,5 +1,5 @@
 """
-This file creates a function that is called by "main_design.py" to perform seismic design
+This file creates the seismic design engine and a function that is called by "main_design.py" to perform seismic design
 
 Developed by GUAN, XINGQUAN @ UCLA, March 29 2018
 Revised in Feb. 2019
@@ -12,379 +12,616 @@ Revised in Feb. 2019
 # Please add all the imported modules in the part below
 import copy
 import numpy as np
-import os
 import sys
 
 from building_information import Building
-from elastic_analysis import ElasticAnalysis
+from analysis_backend import get_analysis_backend
+from analysis_backend import AnalysisError
+from opensees_runner import OpenSeesError
 from elastic_output import ElasticOutput
 
 from global_variables import steel
 from global_variables import UPPER_LOWER_COLUMN_Zx
 from global_variables import RBS_STIFFNESS_FACTOR
 from global_variables import DRIFT_LIMIT
+from global_variables import DRIFT_OPTIMIZATION
+from global_variables import CAPACITY_TARGETED_SIZING
+from global_variables import ROUND_BASED_REPAIR
+from global_variables import MAXIMUM_REPAIR_ROUND
+from global_variables import INCREMENTAL_REBUILD
+from global_variables import ANALYSIS_BUDGET
+from global_variables import DESIGN_ANALYSIS_BACKEND
+from global_variables import VERIFICATION_ANALYSIS_BACKEND
 
 from design_helper import create_column_set
 from design_helper import create_beam_set
 from design_helper import create_connection_set
+from design_helper import update_design_set
 from design_helper import save_all_design_results
+from design_helper import required_column_property
+from design_helper import required_beam_property
+from design_helper import required_scwb_property
 
 ##########################################################################
 #                         Function Implementation                        #
 ##########################################################################
 
+def satisfy_drift_limit(building):
+    """
+    This function is used to check whether the story drifts of current elastic analysis satisfy the drift limit.
+    :param building: a class defined in "building_information.py" file.
+    :return: a boolean variable which denotes whether the drift limit is satisfied.
+    """
+    return np.max(building.elastic_response['story drift']) * building.elf_parameters['Cd'] * RBS_STIFFNESS_FACTOR \
+        <= DRIFT_LIMIT/building.elf_parameters['rho']
+
+
+def column_type_of(building, column_no):
+    """
+    This function is used to determine the type of column based on its location.
+    :param building: a class defined in "building_information.py" file.
+    :param column_no: an integer which denotes the column (or connection) number in one story (from 0 to bay #).
+    :return: a string which is either 'exterior column' or 'interior column'
+    """
+    if column_no == 0 or column_no == building.geometry['number of X bay']:
+        return 'exterior column'
+    return 'interior column'
+
+
+def collect_member_upscale(building, column_set, beam_set, connection_set, not_feasible_column, not_feasible_beam,
+                           not_feasible_connection):
+    """
+    This function is used to determine all member sizes to be upscaled in one round of round-based repair.
+    Members sharing one size (e.g., all interior columns in one story) are upscaled only once.
+    :param building: a class defined in "building_information.py" file.
+    :param column_set: a set of columns with M*N dimensions.
+    :param beam_set: a set of beams with M*N dimensions.
+    :param connection_set: a set of connections for the entire building.
+    :param not_feasible_column: a list of [story, column_no] obtained from create_column_set function.
+    :param not_feasible_beam: a list of [story, bay] obtained from create_beam_set function.
+    :param not_feasible_connection: a list of [story, connection_no] obtained from create_connection_set function.
+    :return: two dictionaries. The first one maps (story, type of column) to the required section properties of the
+             column. The second one maps story to the required section properties of the beam. The required section
+             properties are None when the size is increased one step upward.
+    """
+    column_upscale = {}
+    beam_upscale = {}
+
+    def add_upscale(upscale, key, required_property):
+        # Use the envelope of the requirements of all members sharing one size
+        if key not in upscale or upscale[key] is None:
+            upscale[key] = None if required_property is None else dict(required_property)
+        elif required_property is not None:
+            for name, quantity in required_property.items():
+                upscale[key][name] = max(upscale[key].get(name, 0), quantity)
+
+    # Columns not satisfying the strength requirement
+    for story, column_no in not_feasible_column:
+        required_property = None
+        if CAPACITY_TARGETED_SIZING:
+            required_property = required_column_property(column_set[story][column_no])
+        add_upscale(column_upscale, (story, column_type_of(building, column_no)), required_property)
+    # Beams not satisfying the strength requirement
+    for story, bay in not_feasible_beam:
+        required_property = None
+        if CAPACITY_TARGETED_SIZING:
+            required_property = required_beam_property(beam_set[story][bay])
+        add_upscale(beam_upscale, story, required_property)
+    # Connections not satisfying the shear or flexural strength requirement -> upscale the beam
+    # Connections not satisfying the strong-column-weak-beam requirement -> upscale the column
+    for story, connection_no in not_feasible_connection:
+        connection = connection_set[story][connection_no]
+        if not connection.is_feasible['shear strength'] or not connection.is_feasible['flexural strength']:
+            add_upscale(beam_upscale, story, None)
+        if not connection.is_feasible['SCWB']:
+            # Upscale the upper column if it is significantly smaller than the lower column
+            target_story = story
+            if story != building.geometry['number of story'] - 1 and \
+                    (column_set[story + 1][connection_no].section['Zx']
+                     < UPPER_LOWER_COLUMN_Zx * column_set[story][connection_no].section['Zx']):
+                target_story = story + 1
+            required_property = None
+            if CAPACITY_TARGETED_SIZING:
+                other_story = story + 1 if target_story == story else story
+                other_column = None
+                if other_story < building.geometry['number of story']:
+                    other_column = column_set[other_story][connection_no]
+                required_property = required_scwb_property(connection, column_set[target_story][connection_no],
+                                                           other_column, upper_column=(target_story != story))
+            add_upscale(column_upscale, (target_story, column_type_of(building, connection_no)), required_property)
+    return column_upscale, beam_upscale
 
-def seismic_design(building_id, base_directory):
-    # ************************************************************************
-    # ///////////////// Start Seismic Design /////////////////////////////////
-    # ************************************************************************
-    # Create an instance using "Building" class
-    building_1 = Building(building_id, base_directory)
 
+##########################################################################
+#                        Seismic Design Engine                           #
+##########################################################################
 
-    # Perform EigenValue Analysis only to obtain the period
-    _ = ElasticAnalysis(building_1, for_drift_only=False, for_period_only=True)
-    building_1.read_modal_period()
-    # Compute the seismic story forces based on modal period and CuTa
-    building_1.compute_seismic_force()
-
-    # Create an elastic analysis model for building instance above using "ElasticAnalysis" class
-    _ = ElasticAnalysis(building_1, for_drift_only=False, for_period_only=False)
-
-    # Read elastic analysis drift
-    building_1.read_story_drift()
+class DesignTermination(Exception):
+    """
+    This class is the exception raised when the design cannot proceed (e.g., the analysis budget is exhausted).
+    It is caught by SeismicDesignEngine such that the design is terminated without exiting the program.
+    """
+
+    def __init__(self, status, message):
+        """
+        :param status: a string which denotes the reason of termination (see SeismicDesignEngine)
+        :param message: a string which describes the termination
+        """
+        super(DesignTermination, self).__init__(message)
+        self.status = status
+        self.message = message
+
+
+class SeismicDesignEngine(object):
+    """
+    This class performs the seismic design of one building as a sequence of phases:
+    (1) drift optimization: decrease the member sizes such that the story drifts approach the drift limit
+    (2) member strength: upscale the columns and beams whose strengths are not sufficient
+    (3) connection: upscale the members connected to the joints which do not satisfy the connection checks
+    (4) construction connection: adjust the beams for constructability and repair the connections again
+    (5) construction verification: adjust the columns for constructability and check the construction design
+    (6) optimal verification: update the optimal design using the verification backend (if necessary)
+    (7) storage: save the optimal and construction design results
+    All elastic analyses are performed by the reanalyse method, which counts the analyses in each phase and terminates
+    the design once the analysis budget of the phase is exhausted.
+    The status of the design is:
+    'running' -> the design is not finished
+    'completed' -> all phases are finished and the design results are stored
+    'initial size insufficient' -> the initial member sizes do not satisfy the drift limit
+    'budget exhausted' -> the analysis budget of one phase is exhausted
+    'repair not converged' -> the members are not feasible after MAXIMUM_REPAIR_ROUND rounds of round-based repair
+    'geometry limits' -> a connection does not satisfy the geometry limits
+    'analysis failed' -> the elastic analysis results cannot be obtained (e.g., OpenSees fails or no results to replay)
+    """
+
+    # Name of each phase and the method performing it (in the order of execution)
+    # Each method returns the name of the next phase (None after the last phase)
+    PHASES = {'drift optimization': 'optimize_drift',
+              'member strength': 'repair_member_strength',
+              'connection': 'repair_optimal_connection',
+              'construction connection': 'repair_construction_connection',
+              'construction verification': 'verify_construction_design',
+              'optimal verification': 'verify_optimal_design',
+              'storage': 'store_design_results'}
+
+    def __init__(self, building_id, base_directory, analysis_budget=ANALYSIS_BUDGET):
+        """
+        This function is used to initialize the design engine.
+        :param building_id: a string which denotes the building ID, e.g., 'Building_1'
+        :param base_directory: a string or pathlib.Path which denotes the directory of the platform
+        :param analysis_budget: a dictionary which maps each phase to the maximum number of elastic analyses.
+                                None (or a missing phase) means no limit.
+        """
+        self.building_id = building_id
+        # Optimal design: its member sizes are the optimal design results
+        self.building = Building(building_id, base_directory)
+        self.elastic_demand = None
+        self.column_set = None
+        self.beam_set = None
+        self.connection_set = None
+        # Construction design: created after the beams are adjusted for constructability
+        self.construction_building = None
+        self.construction_demand = None
+        self.construction_column_set = None
+        self.construction_beam_set = None
+        self.construction_connection_set = None
+        # Define the elastic analysis backends used in the optimization loops and in the final verification
+        self.design_analysis = get_analysis_backend(DESIGN_ANALYSIS_BACKEND)
+        self.verification_analysis = get_analysis_backend(VERIFICATION_ANALYSIS_BACKEND)
+        # Number of elastic analyses performed in each phase and the corresponding budget
+        self.analysis_budget = analysis_budget
+        self.analysis_count = {phase: 0 for phase in self.PHASES}
+        self.phase = 'drift optimization'
+        self.status = 'running'
+        self.message = ''
+
+    def run(self):
+        """
+        This method is used to perform the phases one by one until the design is completed or terminated.
+        :return: a string which denotes the status of the design
+        """
+        try:
+            while self.phase is not None:
+                self.phase = getattr(self, self.PHASES[self.phase])()
+            self.status = 'completed'
+        except DesignTermination as termination:
+            self.status = termination.status
+            self.message = termination.message
+            sys.stderr.write('Design of %s is terminated in phase "%s": %s\n'
+                             % (self.building_id, self.phase, self.message))
+        finally:
+            # The construction design shares the scratch folder of the optimal design
+            self.building.cleanup()
+        print("Number of elastic analyses in each phase:", self.analysis_count)
+        return self.status
+
+    def reanalyse(self, building, for_drift_only=False, backend=None):
+        """
+        This method is used to perform the elastic analysis using the current member sizes, which updates the modal
+        period, seismic forces, and story drifts of the building.
+        :param building: a class defined in "building_information.py" file.
+        :param for_drift_only: a boolean variable. True means only the story drifts are required.
+        :param backend: a class defined in "analysis_backend.py" file. Default is the design backend.
+        :return: a class defined in "elastic_output.py" file, which includes the member demands.
+                 None if for_drift_only is True.
+        """
+        budget = self.analysis_budget.get(self.phase)
+        if budget is not None and self.analysis_count[self.phase] >= budget:
+            raise DesignTermination('budget exhausted', 'the analysis budget (%i) is exhausted' % budget)
+        self.analysis_count[self.phase] += 1
+        if backend is None:
+            backend = self.design_analysis
+        # Update the design period and thus the design seismic forces
+        try:
+            backend.analyze(building, for_drift_only=for_drift_only, for_period_only=False, update_seismic_force=True)
+        except (AnalysisError, OpenSeesError) as error:
+            raise DesignTermination('analysis failed', str(error))
+        # Synchronize the modal period and seismic story forces with those used in the analysis
+        building.read_modal_period()
+        building.compute_seismic_force()
+        building.read_story_drift()
+        if for_drift_only:
+            return None
+        # Extract the load output from elastic analysis and perform load combination
+        return ElasticOutput(building)
 
     # ************************************************************************
     # ///////////////// Optimize Member Size for Drift ///////////////////////
     # ************************************************************************
-    # Define iteration index denoting how many iteration it has be performed
-    iteration = 0
-    # Perform the optimization process
-    last_member = copy.deepcopy(building_1.member_size)
-    while np.max(building_1.elastic_response['story drift']) * building_1.elf_parameters['Cd'] * RBS_STIFFNESS_FACTOR \
-            <= DRIFT_LIMIT/building_1.elf_parameters['rho']:
-        print("Member size after optimization %i" % iteration)
-        print("Exterior column:", building_1.member_size['exterior column'])
-        print("Interior column:", building_1.member_size['interior column'])
-        print("Beam:", building_1.member_size['beam'])
-        print("Current story drifts: (%)")
-        print(building_1.elastic_response['story drift'] * building_1.elf_parameters['Cd'] * RBS_STIFFNESS_FACTOR * 100)
-        # Before optimization, record the size in the last step.
-        last_member = copy.deepcopy(building_1.member_size)
-        # Perform optimization
-        building_1.optimize_member_for_drift()
-        # Update the design period and thus the design seismic forces
-        _ = ElasticAnalysis(building_1, for_drift_only=False, for_period_only=True)
-        building_1.read_modal_period()
-        building_1.compute_seismic_force()
-        # Update the design story drifts
-        _ = ElasticAnalysis(building_1, for_drift_only=True, for_period_only=False)
-        building_1.read_story_drift()
-
-        iteration = iteration + 1
-    # Assign the last member size to building instance
-    building_1.member_size = copy.deepcopy(last_member)
-    # Add a check here: if the program does not go into previous while loop,
-    # probably the initial size is not strong enough ==> not necessary to go into following codes
-    if iteration == 0:
-        sys.stderr.write("Initial section size is not strong enough!")
-        sys.stderr.write("Please increase initial depth!")
-        sys.exit(99)
-
-    # *******************************************************************
-    # ///////////////// Check Column Strength ///////////////////////////
-    # *******************************************************************
-    # Create the elastic model using the last member size -> obtain period and seismic force first
-    _ = ElasticAnalysis(building_1, for_drift_only=False, for_period_only=True)
-    building_1.read_modal_period()
-    building_1.compute_seismic_force()
-    # Obtain the story drift using the last member size
-    _ = ElasticAnalysis(building_1, for_drift_only=False, for_period_only=False)
-    building_1.read_story_drift()
-    # Extract the load output from elastic analysis and perform load combination
-    elastic_demand = ElasticOutput(building_1)
-    # Check all columns to see whether they have enough strengths
-    # Initialize a list to store all column instances
-    column_set, not_feasible_column = create_column_set(building_1, elastic_demand, steel)
-
-
-    # *******************************************************************
-    # ///////// Revise Column to Satisfy Strength Requirement ///////////
-    # *******************************************************************
-    for story in range(0, building_1.geometry['number of story']):
-        for column_no in range(0, building_1.geometry['number of X bay'] + 1):
-            while not column_set[story][column_no].check_flag():
-                if column_no == 0 or column_no == building_1.geometry['number of X bay']:
-                    type_column = 'exterior column'
+    def optimize_drift(self):
+        # Perform EigenValue Analysis to obtain the period and then the elastic analysis using updated seismic forces
+        self.reanalyse(self.building)
+        if DRIFT_OPTIMIZATION == 'linear':
+            compliant = self.optimize_drift_linearly()
+        else:
+            # Bisect over the candidate lists: the number of analyses grows logarithmically with the candidate number
+            compliant = self.optimize_drift_by_bisection()
+        # If the initial sizes do not satisfy the drift limit ==> not necessary to go into following phases
+        if not compliant:
+            raise DesignTermination('initial size insufficient',
+                                    'Initial section size is not strong enough! Please increase initial depth!')
+        return 'member strength'
+
+    def optimize_drift_linearly(self):
+        """
+        This method is used to decrease the interior column in the story with the smallest drift one step at a time
+        until the drift limit is exceeded. Then the last compliant sizes are restored.
+        :return: a boolean variable which denotes whether the initial sizes satisfy the drift limit.
+        """
+        building = self.building
+        # Define iteration index denoting how many iteration it has be performed
+        iteration = 0
+        last_member = copy.deepcopy(building.member_size)
+        while satisfy_drift_limit(building):
+            print("Member size after optimization %i" % iteration)
+            print("Exterior column:", building.member_size['exterior column'])
+            print("Interior column:", building.member_size['interior column'])
+            print("Beam:", building.member_size['beam'])
+            print("Current story drifts: (%)")
+            print(building.elastic_response['story drift'] * building.elf_parameters['Cd'] * RBS_STIFFNESS_FACTOR * 100)
+            # Before optimization, record the size in the last step.
+            last_member = copy.deepcopy(building.member_size)
+            # Perform optimization
+            building.optimize_member_for_drift()
+            self.reanalyse(building, for_drift_only=True)
+            iteration = iteration + 1
+        # Assign the last member size to building instance
+        building.member_size = copy.deepcopy(last_member)
+        return iteration > 0
+
+    def optimize_drift_by_bisection(self):
+        """
+        This method is used to decrease the member sizes using bisection over the candidate lists:
+        (1) 'uniform': the interior columns in all stories are decreased by the same number of steps
+        (2) 'story': (1) is followed by a bisection on each story, starting from the story with the smallest drift
+        The beam and exterior column in each story are updated according to the interior column.
+        :return: a boolean variable which denotes whether the initial sizes satisfy the drift limit.
+                 The member sizes of the lightest compliant design are stored in building.member_size.
+        """
+        building = self.building
+        if not satisfy_drift_limit(building):
+            return False
+        number_of_story = building.geometry['number of story']
+        candidate = [building.element_candidate['interior column']['story %s' % (story+1)]
+                     for story in range(number_of_story)]
+        initial_member = copy.deepcopy(building.member_size)
+        initial_index = [candidate[story].index(initial_member['interior column'][story])
+                         for story in range(number_of_story)]
+        # Story drifts of the last compliant design
+        compliant_drift = np.array(building.elastic_response['story drift']).flatten()
+
+        def assign_index(index):
+            # Only the stories whose interior column is changed are updated, same as optimize_member_for_drift
+            building.member_size = copy.deepcopy(initial_member)
+            for story in range(number_of_story):
+                if index[story] != initial_index[story]:
+                    building.resize_member_for_drift(story, candidate[story][index[story]])
+
+        def bisect(step_index, maximum_step):
+            # Find the largest step satisfying the drift limit: step 0 is always compliant
+            nonlocal compliant_drift
+            lower = 0
+            upper = maximum_step + 1
+            while upper - lower > 1:
+                middle = (lower + upper) // 2
+                assign_index(step_index(middle))
+                self.reanalyse(building, for_drift_only=True)
+                print("Member size after optimization %i" % self.analysis_count[self.phase])
+                print("Interior column:", building.member_size['interior column'])
+                print("Current story drifts: (%)")
+                print(building.elastic_response['story drift'] * building.elf_parameters['Cd']
+                      * RBS_STIFFNESS_FACTOR * 100)
+                if satisfy_drift_limit(building):
+                    lower = middle
+                    compliant_drift = np.array(building.elastic_response['story drift']).flatten()
                 else:
-                    type_column = 'interior column'
-                building_1.upscale_column(story, type_column)
-                # Update the modal period and seismic forces
-                _ = ElasticAnalysis(building_1, for_drift_only=False, for_period_only=True)
-                building_1.read_modal_period()
-                building_1.compute_seismic_force()
-                # Re-perform the elastic analysis to obtain the updated demand
-                _ = ElasticAnalysis(building_1, for_drift_only=False, for_period_only=False)
-                building_1.read_story_drift()
-                elastic_demand = ElasticOutput(building_1)
-                # Re-construct the column objects
-                column_set, not_feasible_column = create_column_set(building_1, elastic_demand, steel)
-
+                    upper = middle
+            return lower
+
+        # Decrease all stories by the same number of steps (limited by the smallest candidate)
+        step = bisect(lambda k: [min(initial_index[story] + k, len(candidate[story]) - 1)
+                                 for story in range(number_of_story)],
+                      max(len(candidate[story]) - 1 - initial_index[story] for story in range(number_of_story)))
+        current_index = [min(initial_index[story] + step, len(candidate[story]) - 1)
+                         for story in range(number_of_story)]
+        # Decrease each story further while the other stories are fixed
+        if DRIFT_OPTIMIZATION == 'story':
+            for target_story in np.argsort(compliant_drift, kind='stable'):
+                base_index = list(current_index)
+                step = bisect(lambda k: [base_index[story] + k if story == target_story else base_index[story]
+                                         for story in range(number_of_story)],
+                              len(candidate[target_story]) - 1 - base_index[target_story])
+                current_index[target_story] = base_index[target_story] + step
+        # Assign the lightest compliant sizes to building instance
+        assign_index(current_index)
+        return True
 
     # *******************************************************************
-    # ///////////////// Check Beam Strength /////////////////////////////
+    # ///////// Revise Member to Satisfy Strength Requirement ///////////
     # *******************************************************************
-    # Initialize a list to store all beam instances
-    beam_set, not_feasible_beam = create_beam_set(building_1, elastic_demand, steel)
-
-
-    # *******************************************************************
-    # ////////// Revise Beam to Satisfy Strength Requirement ////////////
-    # *******************************************************************
-    for story in range(building_1.geometry['number of story']):
-        for bay in range(building_1.geometry['number of X bay']):
-            while not beam_set[story][bay].check_flag():
-                # Upscale the unsatisfied beam
-                building_1.upscale_beam(story)
-                # Update modal period and seismic forces
-                _ = ElasticAnalysis(building_1, for_drift_only=False, for_period_only=True)
-                building_1.read_modal_period()
-                building_1.compute_seismic_force()
-                # Re-perform the elastic analysis to obtain the updated demand
-                _ = ElasticAnalysis(building_1, for_drift_only=False, for_period_only=False)
-                building_1.read_story_drift()
-                elastic_demand = ElasticOutput(building_1)
-                # Re-construct the beam objects
-                beam_set, not_feasible_beam = create_beam_set(building_1, elastic_demand, steel)
-
-
-    # ********************************************************************
-    # ///////////////// Check Beam-Column Connection /////////////////////
-    # ********************************************************************
-    connection_set, not_feasible_connection = create_connection_set(building_1, column_set, beam_set, steel)
+    def repair_member_strength(self):
+        building = self.building
+        # Create the elastic model using the last member size -> obtain period and seismic force first
+        self.elastic_demand = self.reanalyse(building)
+        # Check all columns to see whether they have enough strengths
+        self.column_set, _ = create_column_set(building, self.elastic_demand, steel)
+        # Repair all failing columns, beams, and connections together in each round when round-based repair is used
+        # The one-at-a-time revisions are then skipped since all members are already feasible
+        if ROUND_BASED_REPAIR:
+            self.elastic_demand, self.column_set, self.beam_set, self.connection_set = \
+                self.repair_by_round(building, self.elastic_demand)
+            return 'connection'
+
+        # Revise column to satisfy strength requirement
+        for story in range(building.geometry['number of story']):
+            for column_no in range(building.geometry['number of X bay'] + 1):
+                while not self.column_set[story][column_no].check_flag():
+                    # Estimate the required section properties when capacity-targeted sizing is used
+                    required_property = None
+                    if CAPACITY_TARGETED_SIZING:
+                        required_property = required_column_property(self.column_set[story][column_no])
+                    building.upscale_column(story, column_type_of(building, column_no), required_property)
+                    self.elastic_demand = self.reanalyse(building)
+                    # Re-construct the column objects
+                    self.column_set, _ = create_column_set(building, self.elastic_demand, steel, self.column_set)
+
+        # Check beam strength
+        self.beam_set, _ = create_beam_set(building, self.elastic_demand, steel)
+        # Revise beam to satisfy strength requirement
+        for story in range(building.geometry['number of story']):
+            for bay in range(building.geometry['number of X bay']):
+                while not self.beam_set[story][bay].check_flag():
+                    # Upscale the unsatisfied beam (to the required section properties in capacity-targeted sizing)
+                    required_property = None
+                    if CAPACITY_TARGETED_SIZING:
+                        required_property = required_beam_property(self.beam_set[story][bay])
+                    building.upscale_beam(story, required_property)
+                    self.elastic_demand = self.reanalyse(building)
+                    # Re-construct the beam objects
+                    self.beam_set, _ = create_beam_set(building, self.elastic_demand, steel, self.beam_set)
+        return 'connection'
+
+    def repair_by_round(self, building, elastic_demand, check_member=True):
+        """
+        This method is used to repair all members failing the checks in rounds: all of them are upscaled together and
+        the building is re-analyzed once per round, until all members are feasible.
+        :param building: a class defined in "building_information.py" file.
+        :param elastic_demand: a class defined in "elastic_output.py" file, which is obtained using current sizes.
+        :param check_member: a boolean variable which denotes whether the column and beam strength failures are
+                             repaired. False means only the connection failures are repaired.
+        :return: elastic_demand, column_set, beam_set, and connection_set after the repair
+        """
+        column_set, beam_set, connection_set = None, None, None
+        for repair_round in range(MAXIMUM_REPAIR_ROUND + 1):
+            previous_column_set, previous_beam_set = column_set, beam_set
+            column_set, not_feasible_column = create_column_set(building, elastic_demand, steel, previous_column_set)
+            beam_set, not_feasible_beam = create_beam_set(building, elastic_demand, steel, previous_beam_set)
+            connection_set, not_feasible_connection = create_connection_set(building, column_set, beam_set, steel,
+                                                                            connection_set, previous_column_set,
+                                                                            previous_beam_set)
+            if not check_member:
+                not_feasible_column = []
+                not_feasible_beam = []
+            column_upscale, beam_upscale = collect_member_upscale(building, column_set, beam_set, connection_set,
+                                                                  not_feasible_column, not_feasible_beam,
+                                                                  not_feasible_connection)
+            # All members are feasible: repair is completed
+            if not column_upscale and not beam_upscale:
+                return elastic_demand, column_set, beam_set, connection_set
+            if repair_round == MAXIMUM_REPAIR_ROUND:
+                break
+            print("Repair round %i: upscale %i column sizes and %i beam sizes"
+                  % (repair_round, len(column_upscale), len(beam_upscale)))
+            for (story, type_column), required_property in column_upscale.items():
+                building.upscale_column(story, type_column, required_property)
+            for story, required_property in beam_upscale.items():
+                building.upscale_beam(story, required_property)
+            elastic_demand = self.reanalyse(building)
+        raise DesignTermination('repair not converged',
+                                'Members are still not feasible after %i repair rounds!' % MAXIMUM_REPAIR_ROUND)
 
     # ********************************************************************
     # ///////// Revise Member to Satisfy Connection Requirement //////////
     # ********************************************************************
-    for story in range(building_1.geometry['number of story']):
-        for connection_no in range(building_1.geometry['number of X bay'] + 1):
-            while not connection_set[story][connection_no].is_feasible['geometry limits']:
+    def repair_optimal_connection(self):
+        # Check beam-column connection
+        self.connection_set, _ = create_connection_set(self.building, self.column_set, self.beam_set, steel)
+        self.elastic_demand, self.column_set, self.beam_set, self.connection_set = \
+            self.repair_connection(self.building, self.elastic_demand, self.column_set, self.beam_set,
+                                   self.connection_set)
+        return 'construction connection'
+
+    def repair_connection(self, building, elastic_demand, column_set, beam_set, connection_set,
+                          reference_column_set=None):
+        """
+        This method is used to upscale the members connected to the joints which do not satisfy the connection checks
+        one at a time. The building is re-analyzed after each upscale.
+        :param building: a class defined in "building_information.py" file.
+        :param elastic_demand: a class defined in "elastic_output.py" file, which is obtained using current sizes.
+        :param column_set: a set of columns with M*N dimensions.
+        :param beam_set: a set of beams with M*N dimensions.
+        :param connection_set: a set of connections for the entire building.
+        :param reference_column_set: a set of columns used to determine whether the upper or lower column is upscaled
+                                     when SCWB is not satisfied. Default is column_set.
+        :return: elastic_demand, column_set, beam_set, and connection_set after the repair
+        """
+        for story in range(building.geometry['number of story']):
+            for connection_no in range(building.geometry['number of X bay'] + 1):
                 # This would never be achieved since all beams and columns have been selected from a database that
                 # non-prequalified sizes have been removed.
-                pass
-            # For connection not satisfy the shear or flexural strength requirement -> upscale the beam
-            while (not connection_set[story][connection_no].is_feasible['shear strength']) \
-                    or (not connection_set[story][connection_no].is_feasible['flexural strength']):
-                # Upscale the unsatisfied beam
-                building_1.upscale_beam(story)
-                # Update the modal period and seismic forces
-                _ = ElasticAnalysis(building_1, for_drift_only=False, for_period_only=True)
-                building_1.read_modal_period()
-                building_1.compute_seismic_force()
-                # Re-perform the elastic analysis to obtain the updated demand
-                _ = ElasticAnalysis(building_1, for_drift_only=False, for_period_only=False)
-                building_1.read_story_drift()
-                elastic_demand = ElasticOutput(building_1)
-                # Re-construct the beam objects
-                beam_set, _ = create_beam_set(building_1, elastic_demand, steel)
-                # Re-construct the column objects
-                column_set, _ = create_column_set(building_1, elastic_demand, steel)
-                # Re-construct the connection objects
-                connection_set, _ = create_connection_set(building_1, column_set, beam_set, steel)
-            # For connection not satisfy the strong-column-weak beam -> upscale the column
-            while not connection_set[story][connection_no].is_feasible['SCWB']:
-                # Not feasible connection -> go into loop
-                # Determine which story should upscale
-                # If it is roof connection which does not satisfy SCWB, we can only upscale top story column
-                # because no column exists upper than roof.
-                if story == building_1.geometry['number of story'] - 1:
+                if not connection_set[story][connection_no].is_feasible['geometry limits']:
+                    raise DesignTermination('geometry limits', 'connection_%s%s does not satisfy the geometry limits'
+                                            % (story, connection_no))
+                # For connection not satisfy the shear or flexural strength requirement -> upscale the beam
+                while (not connection_set[story][connection_no].is_feasible['shear strength']) \
+                        or (not connection_set[story][connection_no].is_feasible['flexural strength']):
+                    # Upscale the unsatisfied beam
+                    building.upscale_beam(story)
+                    elastic_demand = self.reanalyse(building)
+                    # Re-construct the column, beam, and connection objects
+                    column_set, beam_set, connection_set = \
+                        update_design_set(building, elastic_demand, steel, column_set, beam_set, connection_set)
+                # For connection not satisfy the strong-column-weak beam -> upscale the column
+                while not connection_set[story][connection_no].is_feasible['SCWB']:
+                    # Determine which story should upscale
+                    # If it is roof connection which does not satisfy SCWB, we can only upscale top story column
+                    # because no column exists upper than roof.
+                    # If it is not roof connection: we need to see whether upper column is significantly smaller than
+                    # lower column. If that's the case, we should pick up the smaller upper column to upscale.
+                    reference = column_set if reference_column_set is None else reference_column_set
                     target_story = story
-                # If it is not roof connection: we need to see whether upper column is significantly smaller than
-                # lower column. If that's the case, we should pick up the smaller upper column to upscale.
-                else:
-                    if (column_set[story + 1][connection_no].section['Zx']
-                            < UPPER_LOWER_COLUMN_Zx * column_set[story][connection_no].section['Zx']):
+                    if story != building.geometry['number of story'] - 1 and \
+                            (reference[story + 1][connection_no].section['Zx']
+                             < UPPER_LOWER_COLUMN_Zx * reference[story][connection_no].section['Zx']):
                         target_story = story + 1
-                    else:
-                        target_story = story
-                # Upscale the unsatisfied column on the determined story
-                if connection_no == 0 or connection_no == building_1.geometry['number of X bay']:
-                    type_column = 'exterior column'
-                else:
-                    type_column = 'interior column'
-                building_1.upscale_column(target_story, type_column)
-                # Update modal period and seismic forces
-                _ = ElasticAnalysis(building_1, for_drift_only=False, for_period_only=True)
-                building_1.read_modal_period()
-                building_1.compute_seismic_force()
-                # Re-perform the elastic analysis to obtain the updated demand
-                _ = ElasticAnalysis(building_1, for_drift_only=False, for_period_only=False)
-                building_1.read_story_drift()
-                elastic_demand = ElasticOutput(building_1)
-                # Re-construct the column objects since the demands are updated and columns are adjusted
-                column_set, _ = create_column_set(building_1, elastic_demand, steel)
-                # Re-construct the beam objects
-                beam_set, _ = create_beam_set(building_1, elastic_demand, steel)
-                # Re-construct the connection-objects
-                connection_set, _ = create_connection_set(building_1, column_set, beam_set, steel)
-
+                    # Estimate the required section properties when capacity-targeted sizing is used
+                    required_property = None
+                    if CAPACITY_TARGETED_SIZING:
+                        other_story = story + 1 if target_story == story else story
+                        other_column = None
+                        if other_story < building.geometry['number of story']:
+                            other_column = column_set[other_story][connection_no]
+                        required_property = required_scwb_property(connection_set[story][connection_no],
+                                                                   column_set[target_story][connection_no],
+                                                                   other_column, upper_column=(target_story != story))
+                    # Upscale the unsatisfied column on the determined story
+                    building.upscale_column(target_story, column_type_of(building, connection_no), required_property)
+                    elastic_demand = self.reanalyse(building)
+                    # Re-construct the column, beam, and connection objects since the demands are updated and
+                    # columns are adjusted
+                    column_set, beam_set, connection_set = \
+                        update_design_set(building, elastic_demand, steel, column_set, beam_set, connection_set)
+        return elastic_demand, column_set, beam_set, connection_set
 
     # ********************************************************************
     # /////// Revise Beam Member to Consider Constructability ////////////
     # ********************************************************************
-    # After performing all checks, finalize the design by considering constructability
-    # building_1.constructability()
-    # Adjust beam for constructability
-    building_1.constructability_beam()
-    # Define a new building object to copy the construction size into member size
-    building_2 = copy.deepcopy(building_1)
-    building_2.member_size = copy.deepcopy(building_1.construction_size)
-    # Update modal period and seismic forces
-    _ = ElasticAnalysis(building_2, for_drift_only=False, for_period_only=True)
-    building_2.read_modal_period()
-    building_2.compute_seismic_force()
-    # Perform elastic analysis for member sizes after adjustment for constructability
-    _ = ElasticAnalysis(building_2, for_drift_only=False, for_period_only=False)
-    building_2.read_story_drift()
-    # Read elastic analysis results
-    elastic_demand_2 = ElasticOutput(building_2)
-
-    # Construct new beam objects after considering constructability
-    construction_beam_set, not_feasible_beam = create_beam_set(building_2, elastic_demand_2, steel)
-
-    # Construct new column objects after considering constructability
-    construction_column_set, not_feasible_column = create_column_set(building_2, elastic_demand_2, steel)
-
-
-    # ********************************************************************
-    # /// Revise Column to SCWB  after Adjusting Beam Constructability ///
-    # ********************************************************************
-
-    construction_connection_set, not_feasible_construction_connection = \
-        create_connection_set(building_2, construction_column_set, construction_beam_set, steel)
-
-    # Revise column sizes for new construction connection because of SCWB
-    for story in range(building_2.geometry['number of story']):
-        for connection_no in range(building_1.geometry['number of X bay'] + 1):
-            while not construction_connection_set[story][connection_no].is_feasible['geometry limits']:
-                # This would never be achieved as all beams and columns have been selected from a database that
-                # non-prequalified sizes have been removed.
-                pass
-            # For connection not satisfy the shear or flexural strength requirement -> upscale the beam
-            while ((not construction_connection_set[story][connection_no].is_feasible['shear strength'])
-                   or (not construction_connection_set[story][connection_no].is_feasible['flexural strength'])):
-                # Upscale the unsatisfied beam
-                building_2.upscale_beam(story)
-                # Update modal period and seismic forces
-                _ = ElasticAnalysis(building_2, for_drift_only=False, for_period_only=True)
-                building_2.read_modal_period()
-                building_2.compute_seismic_force()
-                # Re-perform the elastic analysis to obtain the updated demand
-                _ = ElasticAnalysis(building_2, for_drift_only=False, for_period_only=False)
-                building_2.read_story_drift()
-                elastic_demand_2 = ElasticOutput(building_2)
-                # Re-construct the beam objects
-                construction_beam_set, _ = create_beam_set(building_2, elastic_demand_2, steel)
-                # Re-construct the column objects
-                construction_column_set, _ = create_column_set(building_2, elastic_demand_2, steel)
-                # Re-construct the connection objects
-                construction_connection_set, _ = create_connection_set(building_2, elastic_demand_2, steel)
-            # For connection not satisfy the strong-column-weak beam -> upscale the column
-            while not construction_connection_set[story][connection_no].is_feasible['SCWB']:
-                # Not feasible connection -> go into loop
-                # Determine which story should upscale
-                # If it is roof connection which does not satisfy SCWB, we can only upscale top story column
-                # because no column exists upper than roof.
-                if story == building_2.geometry['number of story'] - 1:
-                    target_story = story
-                # If it is not roof connection: we need to see whether upper column is significantly smaller than lower
-                # column. If that's the case, we should pick up the smaller upper column to upscale.
-                else:
-                    if (column_set[story + 1][connection_no].section['Zx']
-                            < UPPER_LOWER_COLUMN_Zx * column_set[story][connection_no].section['Zx']):
-                        target_story = story + 1
-                    else:
-                        target_story = story
-                # Upscale the unsatisfied column on the determined story
-                if connection_no == 0 or connection_no == building_2.geometry['number of X bay']:
-                    type_column = 'exterior column'
-                else:
-                    type_column = 'interior column'
-                building_2.upscale_column(target_story, type_column)
-                # Update modal period and seismic forces
-                _ = ElasticAnalysis(building_2, for_drift_only=False, for_period_only=True)
-                building_2.read_modal_period()
-                building_2.compute_seismic_force()
-                # Re-perform the elastic analysis to obtain the updated demand
-                _ = ElasticAnalysis(building_2, for_drift_only=False, for_period_only=False)
-                building_2.read_story_drift()
-                elastic_demand_2 = ElasticOutput(building_2)
-                # Re-construct the column objects
-                construction_column_set, _ = create_column_set(building_2, elastic_demand_2, steel)
-                # Re-construct the beam objects
-                construction_beam_set, _ = create_beam_set(building_2, elastic_demand_2, steel)
-                # Re-construct the connection objects
-                construction_connection_set, _ = \
-                    create_connection_set(building_2, construction_column_set, construction_beam_set, steel)
-
+    def repair_construction_connection(self):
+        # Adjust beam for constructability
+        self.building.constructability_beam()
+        # Define a new building object to copy the construction size into member size
+        building = copy.deepcopy(self.building)
+        building.member_size = copy.deepcopy(self.building.construction_size)
+        self.construction_building = building
+        elastic_demand = self.reanalyse(building)
+        # Construct new beam, column, and connection objects after considering constructability
+        beam_set, _ = create_beam_set(building, elastic_demand, steel)
+        column_set, _ = create_column_set(building, elastic_demand, steel)
+        connection_set, _ = create_connection_set(building, column_set, beam_set, steel)
+        # Revise column sizes for new construction connection because of SCWB
+        # Repair all failing connections together in each round when round-based repair is used
+        if ROUND_BASED_REPAIR:
+            elastic_demand, column_set, beam_set, connection_set = \
+                self.repair_by_round(building, elastic_demand, check_member=False)
+        # The upper or lower column to be upscaled is determined using the optimal design
+        self.construction_demand, self.construction_column_set, self.construction_beam_set, \
+            self.construction_connection_set = \
+            self.repair_connection(building, elastic_demand, column_set, beam_set, connection_set, self.column_set)
+        return 'construction verification'
 
     # ********************************************************************
     # ////////////// Revise Column to for Constructability  //////////////
     # ********************************************************************
-
-    # building_1.member_size is optimal design results.
-    # building_1.construction_size is after adjusting beam for constructability.
-    # building_2.member_size is firstly the same as building_1.construction_size
-    # then consider the SCWB requirement to update column based on construction beam
-    # building_2.construction_size is consider column constructability, which is construction sizes.
-    # To facilitate elastic analysis, building_3 is created.
-    # building_3.member_size is final construction results.
-
-    # All construction sizes have been stored in building_3
-    building_2.constructability_column()
-    building_3 = copy.deepcopy(building_2)
-    building_3.member_size = copy.deepcopy(building_2.construction_size)
-    # Update modal period and seismic forces
-    _ = ElasticAnalysis(building_3, for_drift_only=False, for_period_only=True)
-    building_3.read_modal_period()
-    building_3.compute_seismic_force()
-
-    # Perform elastic analysis for construction sizes
-    _ = ElasticAnalysis(building_3, for_drift_only=False, for_period_only=False)
-    building_3.read_story_drift()
-    # Obtain the elastic response
-    elastic_demand_3 = ElasticOutput(building_3)
-
-    # Re-create column, beam, and connection objects after adjusting the column
-    construction_column_set, not_feasible_construction_column = create_column_set(building_3, elastic_demand_3, steel)
-    construction_beam_set, not_feasible_construction_beam = create_beam_set(building_3, elastic_demand_3, steel)
-    construction_connection_set, not_feasible_construction_connection = \
-        create_connection_set(building_3, construction_column_set, construction_beam_set, steel)
-
+    def verify_construction_design(self):
+        # self.building.member_size is optimal design results.
+        # self.building.construction_size is after adjusting beam for constructability.
+        # self.construction_building.member_size is firstly the same as self.building.construction_size
+        # then consider the SCWB requirement to update column based on construction beam
+        # self.construction_building.construction_size is consider column constructability, which is construction
+        # sizes. It is then copied into self.construction_building.member_size, which is final construction results.
+        building = self.construction_building
+        building.constructability_column()
+        building.member_size = copy.deepcopy(building.construction_size)
+        self.construction_demand = self.reanalyse(building, backend=self.verification_analysis)
+        # Re-create column, beam, and connection objects after adjusting the column
+        self.construction_column_set, _ = create_column_set(building, self.construction_demand, steel)
+        self.construction_beam_set, _ = create_beam_set(building, self.construction_demand, steel)
+        self.construction_connection_set, _ = \
+            create_connection_set(building, self.construction_column_set, self.construction_beam_set, steel)
+        # Check column width greater than beam
+        for story in range(0, building.geometry['number of story']):
+            for col_no in range(0, building.geometry['number of X bay']+1):
+                if self.construction_column_set[story][col_no].section['bf'] \
+                        < self.construction_beam_set[story][0].section['bf']:
+                    print("Column width in Story %i is less than beam" % story)
+        return 'optimal verification'
 
     # ********************************************************************
-    # //////////// Check Column Width Greater than Beam //////////////////
+    # ///////////////// Verify Optimal Design ////////////////////////////
     # ********************************************************************
-    for story in range(0, building_3.geometry['number of story']):
-        for col_no in range(0, building_3.geometry['number of X bay']+1):
-            if construction_column_set[story][col_no].section['bf'] < construction_beam_set[story][0].section['bf']:
-                print("Column width in Story %i is less than beam" % story)
+    def verify_optimal_design(self):
+        building = self.building
+        # The optimal design is re-analyzed if it is obtained using a different backend from the verification
+        if self.verification_analysis.name != self.design_analysis.name:
+            self.elastic_demand = self.reanalyse(building, backend=self.verification_analysis)
+        elif not INCREMENTAL_REBUILD:
+            return 'storage'
+        # Re-create all objects such that the demands are obtained using the verification backend and the connections
+        # reused in incremental rebuild are checked using the current demands (the saved sets are never reused ones)
+        self.column_set, _ = create_column_set(building, self.elastic_demand, steel)
+        self.beam_set, _ = create_beam_set(building, self.elastic_demand, steel)
+        self.connection_set, _ = create_connection_set(building, self.column_set, self.beam_set, steel)
+        return 'storage'
 
     # ********************************************************************
     # ///////////////// Store Design Results /////////////////////////////
     # ********************************************************************
-    # building_1: all optimal design results
-    # building_3: construction design results
-
-    # Change the working directory to building data
-    os.chdir(building_1.directory['building data'])
+    def store_design_results(self):
+        # All design results are saved in the folder of building data
+        save_all_design_results(self.building, self.column_set, self.beam_set, self.connection_set, False)
+        save_all_design_results(self.construction_building, self.construction_column_set, self.construction_beam_set,
+                                self.construction_connection_set, True)
+        return None
 
-    # Change the working directory to building data
-    os.chdir(building_1.directory['building data'])
 
-    save_all_design_results(building_1, column_set, beam_set, connection_set, False)
-    save_all_design_results(building_3, construction_column_set, construction_beam_set, construction_connection_set,
-                            True)
-
-    # Go back to base directory
-    os.chdir(base_directory)
+def seismic_design(building_id, base_directory):
+    """
+    This function is used to perform the seismic design of one building using SeismicDesignEngine.
+    The design is terminated (without exiting the program) if it cannot proceed, see the status of the engine.
+    :param building_id: a string which denotes the building ID, e.g., 'Building_1'
+    :param base_directory: a string or pathlib.Path which denotes the directory of the platform
+    :return: a class defined in this file, which includes the design status and the number of analyses in each phase
+    """
+    engine = SeismicDesignEngine(building_id, base_directory)
+    engine.run()
+    return engine
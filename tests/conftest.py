@@ -0,0 +1,5 @@
+# This file is used to configure the tests: the modules of the platform are imported from the parent folder
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
@@ -0,0 +1,23 @@
+#!/bin/sh
+# This file is a scripted stand-in of the OpenSees interpreter used to test the persistent session protocol
+# (opensees_session.py) without OpenSees. It reads Tcl commands from stdin and evaluates them in the global scope,
+# the same as the OpenSees interpreter does when no script is given. The line below restarts this file using tclsh \
+exec tclsh "$0" "$@"
+
+# OpenSees commands used by the session protocol (no model is built by the stand-in)
+proc wipe {args} {}
+
+namespace eval ::stand_in {
+    variable command ""
+}
+
+# Read the commands line by line and evaluate each complete command
+while {[gets stdin ::stand_in::line] >= 0} {
+    append ::stand_in::command $::stand_in::line "\n"
+    if {[info complete $::stand_in::command]} {
+        if {[catch {uplevel #0 $::stand_in::command} ::stand_in::message]} {
+            puts $::stand_in::message
+        }
+        set ::stand_in::command ""
+    }
+}
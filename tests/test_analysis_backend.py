@@ -0,0 +1,76 @@
+# This file is used to test the analysis backends (analysis_backend.py) and the design procedure driven by them
+# The deterministic StandIn backend replaces OpenSees such that the complete design can be run locally.
+
+import shutil
+
+import numpy as np
+import pytest
+
+import seismic_design
+from analysis_backend import AnalysisError
+from analysis_backend import CachedBackend
+from analysis_backend import StandInBackend
+from analysis_backend import get_analysis_backend
+from analysis_cache import AnalysisCache
+from building_information import Building
+from global_variables import base_directory
+
+# Files written by the design procedure into the folder of building data
+DESIGN_RESULT_FILE = ['OptimalSize.csv', 'ConstructionSize.csv']
+
+
+@pytest.fixture
+def design_directory(tmp_path):
+    # Copy the input data of Building_0 such that the design results are not written into the repository
+    shutil.copytree(base_directory / 'BuildingData' / 'Building_0', tmp_path / 'BuildingData' / 'Building_0')
+    return tmp_path
+
+
+def test_stand_in_backend_results(design_directory):
+    building = Building('Building_0', design_directory)
+    results = StandInBackend().analyze(building, update_seismic_force=True)
+    assert set(results) == {'EigenValue', 'DeadLoad', 'LiveLoad', 'EarthquakeLoad', 'GravityEarthquake'}
+    number_of_story = building.geometry['number of story']
+    assert results['EigenValue']['period'][0] > 0
+    assert results['GravityEarthquake']['story drift'].shape == (number_of_story, 1)
+    assert np.all(results['GravityEarthquake']['story drift'] > 0)
+    # The stand-in backend is deterministic
+    again = StandInBackend().analyze(Building('Building_0', design_directory), update_seismic_force=True)
+    for load_type in results:
+        for quantity in results[load_type]:
+            assert np.array_equal(results[load_type][quantity], again[load_type][quantity])
+
+
+def test_stand_in_backend_drives_seismic_design(design_directory, monkeypatch):
+    monkeypatch.setattr(seismic_design, 'DESIGN_ANALYSIS_BACKEND', 'StandIn')
+    monkeypatch.setattr(seismic_design, 'VERIFICATION_ANALYSIS_BACKEND', 'StandIn')
+    engine = seismic_design.seismic_design('Building_0', design_directory)
+    assert engine.status == 'completed', engine.message
+    assert engine.phase is None
+    assert engine.analysis_count['drift optimization'] > 0
+    for file_name in DESIGN_RESULT_FILE:
+        assert (design_directory / 'BuildingData' / 'Building_0' / file_name).exists()
+
+
+def test_analysis_budget_terminates_design(design_directory, monkeypatch):
+    monkeypatch.setattr(seismic_design, 'DESIGN_ANALYSIS_BACKEND', 'StandIn')
+    monkeypatch.setattr(seismic_design, 'VERIFICATION_ANALYSIS_BACKEND', 'StandIn')
+    engine = seismic_design.SeismicDesignEngine('Building_0', design_directory,
+                                                analysis_budget={'drift optimization': 1})
+    assert engine.run() == 'budget exhausted'
+    assert engine.analysis_count['drift optimization'] == 1
+
+
+def test_replay_miss_terminates_design(design_directory, monkeypatch):
+    monkeypatch.setattr(seismic_design, 'DESIGN_ANALYSIS_BACKEND', 'StandIn')
+    engine = seismic_design.SeismicDesignEngine('Building_0', design_directory)
+    # Replay from an empty cache: no recorded results
+    engine.design_analysis = CachedBackend(cache=AnalysisCache(directory=design_directory / 'cache'), name='OpenSees')
+    with pytest.raises(AnalysisError):
+        engine.design_analysis.analyze(engine.building)
+    assert engine.run() == 'analysis failed'
+
+
+def test_unknown_backend_raises():
+    with pytest.raises(ValueError):
+        get_analysis_backend('Unknown')
@@ -0,0 +1,42 @@
+# This file is used to test the cache of elastic analysis results (analysis_cache.py)
+
+import os
+
+import numpy as np
+import pytest
+
+import analysis_cache
+from analysis_cache import AnalysisCache
+from analysis_cache import hash_analysis_input
+from building_information import Building
+from global_variables import base_directory
+
+
+@pytest.fixture
+def building():
+    return Building('Building_0', base_directory)
+
+
+@pytest.mark.parametrize('setting, value', [('ACCIDENTAL_TORSION', 1.0), ('PERIOD_FOR_DRIFT_LIMIT', False),
+                                            ('RBS_STIFFNESS_FACTOR', 1.0), ('SECTION_DATABASE_DIGEST', 'changed'),
+                                            ('CACHE_VERSION', 0)])
+def test_key_depends_on_settings(building, monkeypatch, setting, value):
+    key = hash_analysis_input(building, False, False, True, 'Native')
+    monkeypatch.setattr(analysis_cache, setting, value)
+    assert hash_analysis_input(building, False, False, True, 'Native') != key
+
+
+def test_key_depends_on_member_size(building):
+    key = hash_analysis_input(building, False, False, True, 'Native')
+    assert hash_analysis_input(building, False, False, True, 'Native') == key
+    building.member_size['beam'][0] = 'W24X55'
+    assert hash_analysis_input(building, False, False, True, 'Native') != key
+
+
+def test_disk_entries_are_shared_and_atomic(tmp_path):
+    results = {'EigenValue': {'period': np.array([1.0])}}
+    AnalysisCache(directory=tmp_path).put('key', results)
+    # Only the final entry is left in the folder (no temporary file)
+    assert os.listdir(tmp_path) == ['key.pickle']
+    cached = AnalysisCache(directory=tmp_path).get('key')
+    assert np.array_equal(cached['EigenValue']['period'], results['EigenValue']['period'])
@@ -0,0 +1,41 @@
+# This file is used to test the reuse of column and beam objects in incremental rebuild (design_helper.py)
+
+import pytest
+
+from beam_component import Beam
+from column_component import Column
+from design_helper import is_member_unchanged
+from global_variables import steel
+
+
+def assert_identical_member(member, expected):
+    for attribute in ['demand', 'strength', 'is_feasible', 'demand_capacity_ratio', 'plastic_hinge']:
+        assert getattr(member, attribute) == pytest.approx(getattr(expected, attribute), rel=1e-12)
+    assert member.check_flag() == expected.check_flag()
+
+
+def test_updated_column_is_identical_to_new_column():
+    # The web limit of W24X55 is exceeded under the larger axial demand (it depends on the axial demand)
+    column = Column('W24X55', 10.0, 20.0, 300.0, -150.0, 13.0, 13.0, steel)
+    assert column.check_flag()
+    column.update_demand(300.0, 25.0, 200.0, -250.0, steel)
+    expected = Column('W24X55', 300.0, 25.0, 200.0, -250.0, 13.0, 13.0, steel)
+    assert not expected.is_feasible['web limit']
+    assert_identical_member(column, expected)
+
+
+def test_updated_beam_is_identical_to_new_beam():
+    beam = Beam('W24X55', 20.0, 50.0, 1000.0, -900.0, steel)
+    assert beam.check_flag()
+    beam.update_demand(60.0, 1200.0, -1300.0, steel)
+    assert_identical_member(beam, Beam('W24X55', 20.0, 60.0, 1200.0, -1300.0, steel))
+
+
+def test_member_is_reused_only_for_small_demand_changes():
+    column = Column('W24X55', 10.0, 20.0, 300.0, -150.0, 13.0, 13.0, steel)
+    column.check_flag()
+    demand = {'axial': 10.0, 'shear': 20.0, 'moment bottom': 300.0, 'moment top': -150.0}
+    assert is_member_unchanged(column, 'W24X55', demand, tolerance=0.01)
+    assert not is_member_unchanged(column, 'W24X62', demand, tolerance=0.01)
+    assert not is_member_unchanged(column, 'W24X55', dict(demand, axial=10.2), tolerance=0.01)
+    assert not is_member_unchanged(None, 'W24X55', demand, tolerance=0.01)
@@ -0,0 +1,169 @@
+# This file is used to test the in-process elastic solver (elastic_solver.py)
+# The reference results are the OpenSees outputs of Building_0 stored in BuildingElasticModels/Building_0.
+
+import copy
+import re
+import threading
+
+import numpy as np
+import pytest
+import scipy.linalg
+
+import elastic_solver
+from building_information import Building
+from elastic_output import read_member_force
+from elastic_solver import FrameModel
+from elastic_solver import NativeElasticAnalysis
+from elastic_solver import StiffnessFactorization
+from elastic_solver import batch_elastic_analysis
+from elastic_solver import factorize_stiffness
+from elastic_solver import get_factorization_cache
+from elastic_solver import LOAD_TYPE
+from global_variables import ACCIDENTAL_TORSION
+from global_variables import base_directory
+
+# Member sizes of the model whose OpenSees outputs are stored (see DefineColumns2DModel.tcl and DefineBeams2DModel.tcl)
+STORED_MEMBER_SIZE = {'beam': ['W30X148', 'W30X148', 'W27X94'],
+                      'exterior column': ['W14X311', 'W14X311', 'W14X132'],
+                      'interior column': ['W14X311', 'W14X311', 'W14X159']}
+
+
+@pytest.fixture
+def stored_building():
+    """
+    Building_0 with the member sizes and lateral loads of the stored OpenSees model.
+    The stored lateral loads (DefineEarthquakeLaterLoads2DModel.tcl) are used for both strength and drift.
+    """
+    building = Building('Building_0', base_directory)
+    building.member_size = copy.deepcopy(STORED_MEMBER_SIZE)
+    with open(building.directory['building elastic model'] / 'DefineEarthquakeLaterLoads2DModel.tcl', 'r') as file:
+        lateral_load = re.search(r'set\s+LateralLoad\s+\[list\s+([^\]]*)\]', file.read()).group(1)
+    # The solver applies (story force / number of LFRS * ACCIDENTAL_TORSION) on the frame
+    story_force = np.array(lateral_load.split(), dtype=float) \
+        / ACCIDENTAL_TORSION * building.geometry['number of X LFRS']
+    building.seismic_force_for_strength = {'lateral story force': story_force, 'base shear': 1.0}
+    building.seismic_force_for_drift = {'lateral story force': story_force, 'base shear': 1.0}
+    return building
+
+
+def is_close(actual, expected, tolerance, absolute_tolerance=1e-12):
+    # Differences are compared with the largest value such that the (nearly) zero entries are not amplified
+    # Drifts under gravity loads are numerically zero: they are compared using the absolute tolerance
+    difference = np.max(np.abs(np.asarray(actual) - np.asarray(expected)))
+    return difference <= tolerance * np.max(np.abs(expected)) + absolute_tolerance
+
+
+def test_native_analysis_matches_stored_opensees_outputs(stored_building):
+    # Reference results are read before the in-process results are stored into the building
+    reference = {}
+    for load_type in LOAD_TYPE:
+        column_force, beam_force = read_member_force(stored_building, load_type)
+        reference[load_type] = {'story drift': stored_building.read_story_drift_file(load_type),
+                                'column force': column_force, 'beam force': beam_force}
+    NativeElasticAnalysis(stored_building)
+    for load_type in LOAD_TYPE:
+        for quantity in ['story drift', 'column force', 'beam force']:
+            # OpenSees outputs are written with six significant digits
+            assert is_close(stored_building.analysis_results[load_type][quantity],
+                            reference[load_type][quantity], 1e-5), (load_type, quantity)
+
+
+def test_native_period_matches_stored_opensees_output(stored_building):
+    # The stored file name is in lower case (written on a case-insensitive file system)
+    period_file = next((stored_building.directory['building elastic model'] / 'EigenAnalysis').glob('[Pp]eriods.out'))
+    period = np.loadtxt(period_file, ndmin=1)
+    NativeElasticAnalysis(stored_building, for_period_only=True)
+    assert stored_building.analysis_results['EigenValue']['period'][0] == pytest.approx(period[0], rel=1e-5)
+
+
+def test_low_rank_update_matches_refactorization(stored_building, monkeypatch):
+    # The changed DOFs of one member group exceed the default ratio in this three-story building
+    monkeypatch.setattr(elastic_solver, 'LOW_RANK_DOF_RATIO', 1.0)
+    model = FrameModel(stored_building)
+    factorization = StiffnessFactorization(model)
+    # Change the beams and interior columns of the top story
+    stored_building.member_size['beam'][-1] = 'W24X55'
+    stored_building.member_size['interior column'][-1] = 'W14X82'
+    new_model = FrameModel(stored_building)
+    assert factorization.is_compatible(new_model)
+    assert factorization.update(new_model)
+    assert factorization.update_dof is not None
+    right_hand_side = np.random.default_rng(0).standard_normal([new_model.number_of_dof, 3])
+    expected = scipy.linalg.cho_solve(scipy.linalg.cho_factor(new_model.assemble(new_model.element_stiffness())),
+                                      right_hand_side)
+    assert is_close(factorization.solve(right_hand_side), expected, 1e-8)
+
+
+def test_low_rank_update_rejects_large_change(stored_building):
+    factorization = StiffnessFactorization(FrameModel(stored_building))
+    for member in STORED_MEMBER_SIZE:
+        stored_building.member_size[member] = ['W14X82'] * len(STORED_MEMBER_SIZE[member])
+    assert not factorization.update(FrameModel(stored_building))
+
+
+def test_factorization_cache_is_per_thread(stored_building, monkeypatch):
+    monkeypatch.setattr(elastic_solver, 'LOW_RANK_UPDATE', True)
+    model = FrameModel(stored_building)
+    factorization = factorize_stiffness(model, 'per thread')
+    assert get_factorization_cache()['per thread'] is factorization
+    other_thread = {}
+    thread = threading.Thread(target=lambda: other_thread.update(get_factorization_cache()))
+    thread.start()
+    thread.join()
+    assert 'per thread' not in other_thread
+
+
+@pytest.mark.parametrize('member', ['beam', 'interior column', 'exterior column'])
+@pytest.mark.parametrize('quantity', ['Ix', 'A'])
+def test_design_sensitivity_matches_finite_difference(stored_building, member, quantity):
+    model = FrameModel(stored_building)
+    sensitivity = model.design_sensitivity(stored_building)
+    attribute = {'Ix': 'element_inertia', 'A': 'element_area'}[quantity]
+    for story, index in enumerate(model.member_group()[member]):
+        response = []
+        step = 1e-4 * getattr(model, attribute)[index[0]]
+        for sign in [1, -1]:
+            perturbed = copy.deepcopy(model)
+            # A different key is used such that the factorization of the unperturbed model is not updated
+            perturbed.UID = 'finite difference'
+            getattr(perturbed, attribute)[index] += sign * step
+            drift = perturbed.analyze(stored_building, ['GravityEarthquake'])['GravityEarthquake']['story drift']
+            response.append((drift[:, 0], perturbed.modal_period(stored_building)[0]))
+        drift_derivative = (response[0][0] - response[1][0]) / (2*step)
+        period_derivative = (response[0][1] - response[1][1]) / (2*step)
+        drift_scale = np.max(np.abs(sensitivity['story drift'][member][quantity]))
+        period_scale = np.max(np.abs(sensitivity['period'][member][quantity]))
+        assert np.max(np.abs(sensitivity['story drift'][member][quantity][:, story] - drift_derivative)) \
+            < 1e-3 * drift_scale + 1e-15
+        assert abs(sensitivity['period'][member][quantity][story] - period_derivative) < 1e-3 * period_scale + 1e-15
+
+
+@pytest.mark.parametrize('superpose', [False, True])
+def test_batch_analysis_matches_single_building_analysis(stored_building, monkeypatch, superpose):
+    monkeypatch.setattr(elastic_solver, 'SUPERPOSE_GRAVITY_EARTHQUAKE', superpose)
+    # Three designs with identical topology: the stored design and two with smaller beams
+    building_list = [stored_building]
+    for beam_size in ['W27X94', 'W24X76']:
+        building = copy.deepcopy(stored_building)
+        building.member_size['beam'] = [beam_size] * len(STORED_MEMBER_SIZE['beam'])
+        building_list.append(building)
+    reference_list = [copy.deepcopy(building) for building in building_list]
+    for reference in reference_list:
+        NativeElasticAnalysis(reference, for_period_only=True)
+        NativeElasticAnalysis(reference)
+    batch_elastic_analysis(building_list, for_period_only=True)
+    batch_elastic_analysis(building_list)
+    for building, reference in zip(building_list, reference_list):
+        assert building.analysis_results['EigenValue']['period'][0] \
+            == pytest.approx(reference.analysis_results['EigenValue']['period'][0], rel=1e-10)
+        for load_type in LOAD_TYPE:
+            for quantity, value in reference.analysis_results[load_type].items():
+                assert is_close(building.analysis_results[load_type][quantity], value, 1e-8)
+
+
+def test_batch_analysis_rejects_different_topology(stored_building):
+    other = copy.deepcopy(stored_building)
+    other.geometry['number of X bay'] += 1
+    other.member_size['beam'] = ['W27X94'] * len(STORED_MEMBER_SIZE['beam'])
+    with pytest.raises(ValueError):
+        batch_elastic_analysis([stored_building, other])
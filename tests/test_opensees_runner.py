@@ -0,0 +1,58 @@
+# This file is used to test the functions which run OpenSees processes (opensees_runner.py)
+# The Python interpreter replaces the OpenSees executable: each "Model.tcl" below is a short Python script.
+
+import asyncio
+import sys
+
+import pytest
+
+import opensees_runner
+from opensees_runner import OpenSeesError
+from opensees_runner import run_opensees
+from opensees_runner import run_opensees_async
+from opensees_runner import run_opensees_batch
+
+
+@pytest.fixture(autouse=True)
+def python_executable(monkeypatch):
+    monkeypatch.setattr(opensees_runner, 'OPENSEES_EXECUTABLE', sys.executable)
+
+
+def write_model(directory, content):
+    # Write a model script into the given folder and return the folder
+    directory.mkdir(exist_ok=True)
+    (directory / 'Model.tcl').write_text(content)
+    return directory
+
+
+def test_batch_runs_all_models_and_reports_failures(tmp_path):
+    directories = [write_model(tmp_path / 'pass', 'print("done")'),
+                   write_model(tmp_path / 'fail', 'import sys\nsys.exit(3)'),
+                   write_model(tmp_path / 'slow', 'import time\ntime.sleep(30)')]
+    results = run_opensees_batch(directories, concurrency=2, timeout=2, check=False)
+    assert [result.return_code for result in results[:2]] == [0, 3]
+    assert results[2].timed_out
+    assert (tmp_path / 'pass' / opensees_runner.LOG_FILE).read_text().strip() == 'done'
+    with pytest.raises(OpenSeesError) as error:
+        opensees_runner.check_opensees_results(results)
+    assert [result.directory for result in error.value.results] == directories[1:]
+
+
+def test_missing_executable_is_reported(tmp_path, monkeypatch):
+    monkeypatch.setattr(opensees_runner, 'OPENSEES_EXECUTABLE', str(tmp_path / 'missing'))
+    with pytest.raises(OpenSeesError):
+        run_opensees(write_model(tmp_path / 'model', ''))
+
+
+def test_running_event_loop_is_rejected(tmp_path):
+    directory = write_model(tmp_path / 'model', 'print("done")')
+
+    async def caller():
+        with pytest.raises(RuntimeError, match='await run_opensees_async'):
+            run_opensees(directory)
+        with pytest.raises(RuntimeError, match='await run_opensees_batch_async'):
+            run_opensees_batch([directory])
+        # The coroutine should be awaited instead
+        return await run_opensees_async(directory)
+
+    assert asyncio.run(caller()).return_code == 0
@@ -0,0 +1,77 @@
+# This file is used to test the persistent OpenSees session protocol (opensees_session.py)
+# The scripted stand-in "opensees_stand_in.tcl" (run by tclsh) replaces the OpenSees interpreter.
+
+import pathlib
+import shutil
+
+import pytest
+
+from opensees_runner import OpenSeesError
+from opensees_session import OpenSeesSession
+
+STAND_IN = str(pathlib.Path(__file__).resolve().parent / 'opensees_stand_in.tcl')
+
+pytestmark = pytest.mark.skipif(shutil.which('tclsh') is None, reason='tclsh is required by the OpenSees stand-in')
+
+
+@pytest.fixture
+def session():
+    session = OpenSeesSession(STAND_IN, timeout=5)
+    yield session
+    session.close()
+
+
+def write_model(directory, content):
+    # Write a model script into the given folder and return the folder
+    directory.mkdir(exist_ok=True)
+    (directory / 'Model.tcl').write_text(content)
+    return directory
+
+
+def test_sentinel_returns_output_and_status(session):
+    success, output = session.execute('puts first\nputs second')
+    assert success
+    assert output == ['first', 'second']
+
+
+def test_run_clears_globals_of_previous_model(session, tmp_path):
+    first = write_model(tmp_path / 'first', 'set Tlist 1\nputs [pwd]\n')
+    second = write_model(tmp_path / 'second', 'puts [info exists Tlist]\n')
+    assert session.run(first)
+    success, output = session.execute('puts [info exists Tlist]')
+    assert success and output == ['1']
+    assert session.run(second)
+    success, output = session.execute('puts [info exists Tlist]')
+    assert success and output == ['0']
+
+
+def test_error_is_reported_and_session_survives(session, tmp_path):
+    process = session.process
+    assert not session.run(write_model(tmp_path / 'error', 'error "analysis failed"\n'))
+    assert session.process is process and session.is_alive()
+    assert session.run(write_model(tmp_path / 'ok', 'puts done\n'))
+
+
+def test_exit_raises_and_session_restarts(session, tmp_path):
+    process = session.process
+    with pytest.raises(OpenSeesError):
+        session.run(write_model(tmp_path / 'exit', 'puts partial\nexit 3\n'))
+    assert not session.is_alive()
+    assert session.run(write_model(tmp_path / 'ok', 'puts done\n'))
+    assert session.process is not process
+
+
+def test_timeout_kills_and_session_restarts(tmp_path):
+    session = OpenSeesSession(STAND_IN, timeout=0.5)
+    try:
+        with pytest.raises(OpenSeesError):
+            session.run(write_model(tmp_path / 'hang', 'after 10000\n'))
+        assert not session.is_alive()
+        assert session.run(write_model(tmp_path / 'ok', 'puts done\n'))
+    finally:
+        session.close()
+
+
+def test_missing_executable_raises(tmp_path):
+    with pytest.raises(OpenSeesError):
+        OpenSeesSession(str(tmp_path / 'OpenSees'))